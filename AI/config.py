@@ -23,9 +23,62 @@ class Settings(BaseSettings):
     MONGO_DB_URL: str
     REDIS_HOST:str
     REDIS_PORT: int
-    CACHE_TYPE:str
+    CACHE_TYPE:str # 캐시 전략: "redis_semantic" | "two_tier_semantic"(프로세스 내부 캐시 + Redis)
     LLM_MODEL:str
     EMBEDDING_MODEL:str
+    EMBEDDING_CACHE_SIZE: int = 1024 # 로컬 LRU에 보관할 질문 임베딩 개수
+    EMBEDDING_CACHE_TTL: int = 60 * 60 * 24 * 7 # Redis 공유 임베딩 캐시 만료 시간(초)
+    EMBEDDING_REQUESTS_PER_MINUTE: int = 60 # 문서 임베딩 시 분당 허용 요청(배치) 수
+    EMBEDDING_MAX_CONCURRENCY: int = 4 # 동시에 진행할 임베딩 배치 수
+    EMBEDDING_BATCH_SIZE: int = 50 # 시작 배치 크기 (요청 한도에 따라 자동 조절)
+    EMBEDDING_MAX_RETRIES: int = 5 # 429/5xx 오류 시 최대 재시도 횟수
+    BM25_INDEX_PATH: Optional[str] = "data/bm25_index.json" # BM25 인덱스 저장 경로 (비우면 저장하지 않음)
+    BM25_TOKENIZER: str = "char_ngram" # BM25 토크나이저: "char_ngram"(한국어 문자 n-gram) | "whitespace"
+    BM25_NGRAM_SIZE: int = 2 # char_ngram 토크나이저의 n-gram 글자 수
+    INGEST_BATCH_SIZE: int = 200 # 문서 수집 시 한 번에 파싱/청킹하여 임베딩 단계로 넘길 문단/QA 수
+    INGEST_PIPELINE_DEPTH: int = 2 # 임베딩을 기다리며 미리 준비해 둘 최대 배치 수
+    CHUNK_WORKERS: int = 0 # 청킹에 사용할 프로세스 수 (0이면 프로세스 풀 없이 스레드에서 청킹, -1이면 CPU 코어 수)
+    CHUNK_SHARD_SIZE: int = 50 # 청킹 프로세스 하나에 한 번에 넘길 문서 수
+    INGEST_JOB_DIR: str = "data/ingest_jobs" # 백그라운드 수집 작업의 업로드 파일 보관 경로 (모든 워커가 접근 가능해야 함)
+    INGEST_JOB_LEASE_TTL: int = 60 # 수집 작업 실행 리스 만료 시간(초, 워커 종료 시 이 시간 뒤 다른 워커가 이어서 실행)
+    INGEST_JOB_POLL_INTERVAL: float = 2.0 # 수집 작업 대기열 확인 주기(초)
+    INGEST_JOB_RESULT_TTL: int = 60 * 60 * 24 * 7 # 끝난 수집 작업 상태 보관 시간(초)
+    INGEST_JOB_MAX_ATTEMPTS: int = 3 # 수집 작업 최대 실행 횟수 (워커가 반복해서 죽는 작업은 이 횟수를 넘으면 실패 처리)
+    INDEX_REFRESH_INTERVAL: int = 10 # 다른 워커가 교체한 벡터 DB 컬렉션 버전을 확인하는 주기(초)
+    RETRIEVER_TIMEOUT: float = 3.0 # 하이브리드 검색 시 검색기 하나당 최대 대기 시간(초)
+    RETRIEVER_FUSION: str = "rrf" # 검색 결과 결합 방식: "rrf" | "weighted_sum" | "score_normalized"
+    RETRIEVER_TOP_N: int = 3 # 결합 후 LLM에 전달할 문서 개수
+    RRF_K: int = 60 # RRF 순위 상수
+    VECTOR_SEARCH_K: int = 4 # 벡터 검색에서 가져올 문서 개수
+    VECTOR_SEARCH_WEIGHT: float = 1.0 # 결과 결합 시 벡터 검색 가중치
+    BM25_SEARCH_K: int = 4 # BM25 검색에서 가져올 문서 개수
+    BM25_SEARCH_WEIGHT: float = 1.0 # 결과 결합 시 BM25 검색 가중치
+    RETRIEVAL_CACHE_SIZE: int = 512 # 검색 결과 캐시에 보관할 최대 질문 수 (0이면 사용 안 함)
+    RETRIEVAL_CACHE_TTL: int = 600 # 검색 결과 캐시 유효 시간(초)
+    SEMANTIC_CACHE_THRESHOLD: float = 0.97 # 시맨틱 캐시 적중 및 동일 질문 판단에 사용할 코사인 유사도
+    SEMANTIC_CACHE_MAX_ENTRIES: int = 10000 # 시맨틱 캐시 최대 항목 수
+    SEMANTIC_CACHE_MAX_BYTES: int = 256 * 1024 * 1024 # 시맨틱 캐시 최대 크기(질문+답변+벡터 바이트)
+    SEMANTIC_CACHE_TTL: int = 60 * 60 * 24 * 7 # 시맨틱 캐시 항목 만료 시간(초, 적중 시 연장)
+    SEMANTIC_CACHE_EVICTION: str = "last_hit" # 용량 초과 시 제거 기준: "last_hit" | "hit_count"
+    SEMANTIC_CACHE_GC_INTERVAL: int = 300 # 이전 코퍼스 버전 캐시 항목 정리 주기(초)
+    SEMANTIC_CACHE_LOCAL_SIZE: int = 256 # two_tier_semantic: 프로세스 내부에 보관할 자주 적중하는 질문 수
+    SEMANTIC_CACHE_LOCAL_TTL: int = 300 # two_tier_semantic: 프로세스 내부 캐시 항목 유효 시간(초)
+    SEMANTIC_CACHE_LOCAL_HIT_FLUSH_INTERVAL: float = 5.0 # two_tier_semantic: 프로세스 내부 캐시 적중 횟수를 Redis에 기록하는 주기(초)
+    SINGLE_FLIGHT_DISTRIBUTED: bool = False # True이면 Redis 리스로 워커 간에도 동일 질문 요청을 합침
+    SINGLE_FLIGHT_LEASE_TTL: int = 30 # 워커 간 리스 만료 시간(초)
+    SINGLE_FLIGHT_WAIT_TIMEOUT: float = 30.0 # 다른 워커의 답변 생성을 기다릴 최대 시간(초)
+    WRITE_BEHIND_ENABLED: bool = True # True이면 대화 기록/캐시 저장을 응답 후 백그라운드에서 일괄 처리
+    WRITE_BEHIND_QUEUE_SIZE: int = 1000 # 저장 대기 큐 최대 크기 (가득 차면 요청이 대기)
+    WRITE_BEHIND_BATCH_SIZE: int = 100 # 한 번에 저장할 최대 작업 수
+    WRITE_BEHIND_FLUSH_INTERVAL: float = 0.5 # 배치를 채우기 위해 기다릴 최대 시간(초)
+    WRITE_BEHIND_SPOOL_PATH: Optional[str] = "data/chat_spool.jsonl" # 저장 실패한 대화 기록 보관 파일 (시작 시 재저장)
+    FEEDBACK_BUFFER_ENABLED: bool = True # True이면 참조 문서 피드백을 Redis에 모았다가 벡터 DB에 주기적으로 일괄 반영
+    FEEDBACK_FLUSH_INTERVAL: int = 10 # 피드백을 벡터 DB에 반영하는 주기(초)
+    CHAT_HISTORY_CACHE_SESSIONS: int = 1000 # 최근 대화를 캐시할 최대 세션 수 (0이면 사용 안 함)
+    CHAT_HISTORY_CACHE_TURNS: int = 20 # 세션마다 캐시할 최근 대화 수
+    CHAT_HISTORY_CACHE_TTL: int = 300 # 세션 대화 캐시 유효 시간(초)
+    QA_DIRECT_THRESHOLD: Optional[float] = 0.9 # 벡터 검색 1위 QA 데이터의 유사도가 이 값 이상이면 LLM 없이 등록된 답변으로 응답 (비우면 사용 안 함)
+    QA_DIRECT_TEMPLATE: Optional[str] = None # QA 답변을 바로 응답할 때 사용할 템플릿 ({answer}, {question}, {matched_question} 사용 가능)
 
 # 설정 객체 생성 (다른 파일에서 import하여 사용)
 settings = Settings()
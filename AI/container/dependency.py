@@ -1,41 +1,65 @@
 from functools import lru_cache
+from typing import List, Optional
 
 import redis
 from fastapi import Depends, Request
 from fastapi import HTTPException
 from fastapi.logger import logger
 from langchain_community.llms.huggingface_endpoint import HuggingFaceEndpoint
-from langchain_community.retrievers import BM25Retriever
 from langchain_core.language_models import BaseLanguageModel
 from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.retrievers import BaseRetriever
 from langchain_google_genai import ChatGoogleGenerativeAI
-from redis.commands.search.field import TextField, VectorField
+from redis.commands.search.field import TextField, VectorField, TagField
+from redis.asyncio import Redis
+from redis.asyncio.lock import Lock
 from redis.commands.search.index_definition import IndexDefinition, IndexType
-from redis.lock import Lock
 
 from config import settings
 from database.chat.chat_strategy.chat_store_strategy import ChatStrategy
 from database.chat.chat_strategy.langchain_mongo_repository import MongoChatStrategy
 from database.chat.repository import ChatRepository
+from database.chat.session_history_cache import SessionHistoryCache
 from database.vector.repository import VectorRepository
 from database.vector.vector_strategy.chroma_vector import ChromaVector
 from database.vector.vector_strategy.pg_vector_store import PGVectorStore
 from database.vector.vector_strategy.vector_store_strategy import VectorStoreStrategy
 from exception.model.exceptions import CustomException
 from service.cache.cache_strategy import CacheStrategy
+from service.cache.corpus_version import CorpusVersion
 from service.cache.redis_semantic_cache import RedisSemanticCache
+from service.cache.single_flight import SingleFlight
+from service.cache.two_tier_semantic_cache import TwoTierSemanticCache
 from service.chat_service import ChatService
 from service.chunk.chunk_strategy.chunk_strategy import ChunkStrategy
+from service.chunk.chunk_strategy.parallel_chunk_strategy import ParallelChunkStrategy
 from service.chunk.chunk_strategy.recursive_character_splitter import RecursiveCharacterSplitter
 from service.chunk.service import ChunkService
 from service.data.data_processor import DataProcessor
+from service.embedding.embedding_scheduler import EmbeddingScheduler
+from service.embedding.embedding_strategy.cached_embedding import CachedEmbedding
 from service.embedding.embedding_strategy.embedding_strategy import EmbeddingStrategy
 from service.embedding.embedding_strategy.google_gemini_embedding import GoogleGeminiEmbedding
 from service.embedding.service import EmbeddingService
+from service.ingestion.ingestion_job_manager import IngestionJobManager
 from service.langchain.prompt import create_prompt
+from service.persistence.feedback_buffer import FeedbackBuffer
+from service.persistence.write_behind_queue import WriteBehindQueue
 from service.rag_service import RAGService
 from service.retriever.bm25_manager import BM25Manager
 from service.retriever.document_retriever import DocumentRetriever
+from service.retriever.fusion_strategy.fusion_strategy import FusionStrategy
+from service.retriever.fusion_strategy.rrf_fusion import RRFFusion
+from service.retriever.fusion_strategy.score_normalized_fusion import ScoreNormalizedFusion
+from service.retriever.fusion_strategy.weighted_sum_fusion import WeightedSumFusion
+from service.retriever.index_version import IndexVersion
+from service.retriever.retrieval_cache import RetrievalCache
+from service.retriever.source_strategy.bm25_source import BM25Source
+from service.retriever.source_strategy.retrieval_source import RetrievalSource
+from service.retriever.source_strategy.vector_source import VectorSource
+from service.retriever.tokenizer_strategy.char_ngram_tokenizer import CharNgramTokenizer
+from service.retriever.tokenizer_strategy.tokenizer_strategy import TokenizerStrategy
+from service.retriever.tokenizer_strategy.whitespace_tokenizer import WhitespaceTokenizer
 
 
 # ----------------------------------------------------------------
@@ -44,10 +68,25 @@ from service.retriever.document_retriever import DocumentRetriever
 
 @lru_cache
 def get_chunk_strategy() -> ChunkStrategy:
-    return RecursiveCharacterSplitter(chunk_size=500, chunk_overlap=100)
+    chunk_strategy = RecursiveCharacterSplitter(chunk_size=500, chunk_overlap=100)
+    if settings.CHUNK_WORKERS == 0:
+        return chunk_strategy
+    # 대용량 업로드의 청킹을 여러 프로세스로 분산 (-1이면 CPU 코어 수만큼)
+    return ParallelChunkStrategy(
+        chunk_strategy,
+        max_workers=settings.CHUNK_WORKERS if settings.CHUNK_WORKERS > 0 else None,
+        shard_size=settings.CHUNK_SHARD_SIZE,
+    )
+
 
-async def get_embedding_strategy() -> EmbeddingStrategy:
-    return GoogleGeminiEmbedding(model_name=settings.EMBEDDING_MODEL, api_key=settings.GENAI_API_KEY)
+def get_embedding_scheduler(embedding_strategy: EmbeddingStrategy) -> EmbeddingScheduler:
+    return EmbeddingScheduler(
+        embedding_strategy=embedding_strategy,
+        requests_per_minute=settings.EMBEDDING_REQUESTS_PER_MINUTE,
+        max_concurrency=settings.EMBEDDING_MAX_CONCURRENCY,
+        batch_size=settings.EMBEDDING_BATCH_SIZE,
+        max_retries=settings.EMBEDDING_MAX_RETRIES,
+    )
 
 def get_llm() -> BaseLanguageModel:
     """설정에 따라 적절한 LLM을 생성하여 반환합니다."""
@@ -67,8 +106,36 @@ def get_llm() -> BaseLanguageModel:
     else:
         raise ValueError(f"지원하지 않는 LLM 타입입니다: {settings.LLM_TYPE}")
 
-def get_redis() -> redis.Redis:
-    return redis.Redis(host=settings.REDIS_HOST, port=settings.REDIS_PORT, decode_responses=False)
+def get_redis() -> Redis:
+    # 요청 경로에서 이벤트 루프를 막지 않도록 redis.asyncio 클라이언트를 사용합니다.
+    return Redis(host=settings.REDIS_HOST, port=settings.REDIS_PORT, decode_responses=False)
+
+def get_corpus_version(
+    cache_client: Redis = Depends(get_redis)
+) -> CorpusVersion:
+    # 코퍼스 버전은 Redis에 저장되므로 모든 워커가 같은 버전을 공유합니다.
+    return CorpusVersion(cache_client)
+
+@lru_cache
+def get_bm25_tokenizer() -> TokenizerStrategy:
+    if settings.BM25_TOKENIZER == "char_ngram":
+        return CharNgramTokenizer(n=settings.BM25_NGRAM_SIZE)
+    elif settings.BM25_TOKENIZER == "whitespace":
+        return WhitespaceTokenizer()
+    else:
+        raise ValueError(f"지원하지 않는 토크나이저 타입입니다: {settings.BM25_TOKENIZER}")
+
+async def get_embedding_strategy(
+    cache_client: Redis = Depends(get_redis)
+) -> EmbeddingStrategy:
+    # 반복되는 질문은 네트워크 호출 없이 응답하도록 로컬 LRU + Redis 캐시로 감싸서 반환합니다.
+    return CachedEmbedding(
+        embedding_strategy=GoogleGeminiEmbedding(model_name=settings.EMBEDDING_MODEL, api_key=settings.GENAI_API_KEY),
+        model_name=settings.EMBEDDING_MODEL,
+        redis_client=cache_client,
+        max_size=settings.EMBEDDING_CACHE_SIZE,
+        ttl_seconds=settings.EMBEDDING_CACHE_TTL,
+    )
 
 
 def get_chat_db_strategy() -> ChatStrategy:
@@ -80,22 +147,28 @@ async def get_vector_store_strategy(
     if settings.VECTOR_DB_TYPE == "pgvector":
         return PGVectorStore(connection_string=settings.PGVECTOR_DB_URL, embedding_strategy=embedding_strategy)
     elif settings.VECTOR_DB_TYPE == "chroma":
-        return ChromaVector(host=settings.CHROMA_HOST, port=settings.CHROMA_PORT, embedding_strategy=embedding_strategy)
+        return ChromaVector(
+            host=settings.CHROMA_HOST,
+            port=settings.CHROMA_PORT,
+            embedding_strategy=embedding_strategy,
+            embedding_scheduler=get_embedding_scheduler(embedding_strategy),
+        )
     else:
         raise ValueError(f"지원하지 않는 DB 타입입니다: {settings.VECTOR_DB_TYPE}")
 
 
-def get_cache_strategy(
-        cache_client: redis.Redis = Depends(get_redis),
-        embedding_model: EmbeddingStrategy = Depends(get_embedding_strategy)
+async def get_cache_strategy(
+        cache_client: Redis = Depends(get_redis),
+        embedding_model: EmbeddingStrategy = Depends(get_embedding_strategy),
+        corpus_version: CorpusVersion = Depends(get_corpus_version)
 ) -> CacheStrategy:
     """
     설정에 따라 캐시 전략 객체를 생성하고, 필요한 인프라(인덱스)를 설정합니다.
     여러 워커가 동시에 인덱스를 생성하는 문제를 방지하기 위해 Lock을 사용합니다.
     """
-    if settings.CACHE_TYPE == "redis_semantic":
+    if settings.CACHE_TYPE in ("redis_semantic", "two_tier_semantic"):
         # 1. 인덱스 생성을 위한 정보 준비
-        test_embedding = embedding_model.embed_query("test")
+        test_embedding = await embedding_model.aembed_query("test")
         embedding_dim = len(test_embedding)
         # 모델 임베딩을 자동으로 변환하기 위한 과정 Gemini embedding의 경우 3072이므로 3072입력하면 되듯이 간단한 임베딩 테스트를 통한 차원 확인
 
@@ -107,16 +180,17 @@ def get_cache_strategy(
         # 분산 락 설정
         lock_name = "llm_rag_cache_lock"
         try:
-            with Lock(cache_client, lock_name, timeout=15): #Lock을 획득한 경우에만 캐시 생성이 가능
+            async with Lock(cache_client, lock_name, timeout=15): #Lock을 획득한 경우에만 캐시 생성이 가능
                 # 2. 인덱스 존재 여부 확인 및 생성
                 try:
-                    cache_client.ft(index_name).info()
+                    await cache_client.ft(index_name).info()
                 #     llg_rag_cache_idx인덱스 정보를 요청한다.
                 except redis.exceptions.ResponseError:
                     logger.info(f"--- Redis 시맨틱 캐시 인덱스 '{index_name}' 생성을 시작합니다.(캐시 인덱스 정보 존재하지 않음) ---")
                     schema = (
                         TextField("question", as_name="question"),
                         TextField("answer", as_name="answer"),
+                        TagField("corpus_version", as_name="corpus_version"),
                         VectorField("question_vector", "HNSW", {
                             "TYPE": "FLOAT32",
                             "DIM": embedding_dim,
@@ -128,19 +202,41 @@ def get_cache_strategy(
                     # HNSW는 데이터를 찾는 데 사용되는 효율적 알고리즘
                     definition = IndexDefinition(prefix=[doc_prefix], index_type=IndexType.HASH)
                     # 해당 인덱스가 rag_cache: 로 시작하는 것만 관리하도록 한정
-                    cache_client.ft(index_name).create_index(fields=schema, definition=definition)
+                    await cache_client.ft(index_name).create_index(fields=schema, definition=definition)
                     logger.info(f"✅ Redis 시맨틱 캐시 인덱스 '{index_name}' 생성 완료")
+                else:
+                    # 코퍼스 버전 필드가 없던 기존 인덱스에는 필드를 추가 (이미 있으면 Duplicate field 오류)
+                    try:
+                        await cache_client.ft(index_name).alter_schema_add([TagField("corpus_version", as_name="corpus_version")])
+                        logger.info(f"✅ Redis 시맨틱 캐시 인덱스 '{index_name}'에 corpus_version 필드를 추가했습니다.")
+                    except redis.exceptions.ResponseError:
+                        pass
         except Exception as e:
             logger.info(f"락 획득 또는 인덱스 생성 중 오류 발생: {e}")
             raise CustomException(status_code=501, message=str(e), reason="레디스 생성 오류", field="redis")
 
         # 3. 준비된 인프라를 바탕으로 캐시 전략 객체 반환
-        return RedisSemanticCache(
+        redis_cache = RedisSemanticCache(
             redis_client=cache_client,
             embedding_model=embedding_model,
             embedding_dim=embedding_dim,
-            similarity_threshold = 0.97, #코사인 유사도 값
+            similarity_threshold = settings.SEMANTIC_CACHE_THRESHOLD, #코사인 유사도 값
+            max_entries=settings.SEMANTIC_CACHE_MAX_ENTRIES,
+            max_bytes=settings.SEMANTIC_CACHE_MAX_BYTES,
+            ttl_seconds=settings.SEMANTIC_CACHE_TTL,
+            eviction_policy=settings.SEMANTIC_CACHE_EVICTION,
+            corpus_version=corpus_version,
         )
+        if settings.CACHE_TYPE == "two_tier_semantic":
+            # 자주 적중하는 질문은 프로세스 내부 행렬에서 바로 응답하도록 Redis 캐시 앞에 1단계 캐시를 둡니다.
+            return TwoTierSemanticCache(
+                redis_cache,
+                corpus_version=corpus_version,
+                max_size=settings.SEMANTIC_CACHE_LOCAL_SIZE,
+                ttl_seconds=settings.SEMANTIC_CACHE_LOCAL_TTL,
+                hit_flush_interval=settings.SEMANTIC_CACHE_LOCAL_HIT_FLUSH_INTERVAL,
+            )
+        return redis_cache
     else:
         raise ValueError(f"지원하지 않는 캐시 타입입니다: {settings.CACHE_TYPE}")
 
@@ -153,10 +249,21 @@ async def get_vector_repository(
 ) -> VectorRepository:
     return VectorRepository(vector_store_strategy=vector_store_strategy)
 
+@lru_cache()
+def get_session_history_cache() -> Optional[SessionHistoryCache]:
+    if settings.CHAT_HISTORY_CACHE_SESSIONS <= 0:
+        return None
+    return SessionHistoryCache(
+        max_sessions=settings.CHAT_HISTORY_CACHE_SESSIONS,
+        max_turns=settings.CHAT_HISTORY_CACHE_TURNS,
+        ttl_seconds=settings.CHAT_HISTORY_CACHE_TTL,
+    )
+
 def get_chat_repository(
-    chat_strategy: ChatStrategy = Depends(get_chat_db_strategy)
+    chat_strategy: ChatStrategy = Depends(get_chat_db_strategy),
+    history_cache: Optional[SessionHistoryCache] = Depends(get_session_history_cache)
 ) -> ChatRepository:
-    return ChatRepository(chat_strategy=chat_strategy)
+    return ChatRepository(chat_strategy=chat_strategy, history_cache=history_cache)
 
 
 # ----------------------------------------------------------------
@@ -191,7 +298,7 @@ def get_bm25_manager(request: Request) -> BM25Manager:
 
 async def get_bm25_retriever(
     bm25_manager: BM25Manager = Depends(get_bm25_manager)
-) -> BM25Retriever:
+) -> BaseRetriever:
     retriever = bm25_manager.retriever
     if retriever is None:
         # 문서가 없어 retriever가 생성되지 않았을 경우의 예외 처리
@@ -203,11 +310,60 @@ async def get_bm25_retriever(
 
 
 
-async def get_document_retriever(
+@lru_cache
+def get_fusion_strategy() -> FusionStrategy:
+    if settings.RETRIEVER_FUSION == "rrf":
+        return RRFFusion(k=settings.RRF_K)
+    elif settings.RETRIEVER_FUSION == "weighted_sum":
+        return WeightedSumFusion()
+    elif settings.RETRIEVER_FUSION == "score_normalized":
+        return ScoreNormalizedFusion()
+    else:
+        raise ValueError(f"지원하지 않는 검색 결과 결합 방식입니다: {settings.RETRIEVER_FUSION}")
+
+async def get_retrieval_sources(
     vector_repository: VectorRepository = Depends(get_vector_repository),
         bm25_manager: BM25Manager = Depends(get_bm25_manager)
+) -> List[RetrievalSource]:
+    # 새로운 검색기를 추가하려면 RetrievalSource를 구현하여 이 목록에 등록합니다.
+    return [
+        VectorSource(vector_repository, k=settings.VECTOR_SEARCH_K, weight=settings.VECTOR_SEARCH_WEIGHT),
+        BM25Source(bm25_manager, k=settings.BM25_SEARCH_K, weight=settings.BM25_SEARCH_WEIGHT),
+    ]
+
+def get_index_version(request: Request) -> IndexVersion:
+    """
+    lifespan에서 생성된 싱글톤 IndexVersion 인스턴스를 반환합니다.
+    """
+    return request.app.state.index_version
+
+def get_retrieval_cache(request: Request) -> Optional[RetrievalCache]:
+    """
+    lifespan에서 생성된 싱글톤 검색 결과 캐시를 반환합니다. (비활성화된 경우 None)
+    """
+    return request.app.state.retrieval_cache
+
+def create_retrieval_cache(index_version: IndexVersion) -> Optional[RetrievalCache]:
+    if settings.RETRIEVAL_CACHE_SIZE <= 0:
+        return None
+    return RetrievalCache(
+        index_version,
+        max_size=settings.RETRIEVAL_CACHE_SIZE,
+        ttl_seconds=settings.RETRIEVAL_CACHE_TTL,
+    )
+
+async def get_document_retriever(
+    sources: List[RetrievalSource] = Depends(get_retrieval_sources),
+        fusion_strategy: FusionStrategy = Depends(get_fusion_strategy),
+        retrieval_cache: Optional[RetrievalCache] = Depends(get_retrieval_cache)
 ) -> DocumentRetriever:
-    return DocumentRetriever(vector_repository=vector_repository, bm25_manager=bm25_manager)
+    return DocumentRetriever(
+        sources=sources,
+        fusion_strategy=fusion_strategy,
+        top_n=settings.RETRIEVER_TOP_N,
+        timeout=settings.RETRIEVER_TIMEOUT,
+        cache=retrieval_cache,
+    )
 
 @lru_cache()
 def get_prompt() -> ChatPromptTemplate:
@@ -218,6 +374,46 @@ def get_prompt() -> ChatPromptTemplate:
 # 5. 최종 서비스 조립 (Final Services)
 # ----------------------------------------------------------------
 
+def get_single_flight(
+    cache_client: Redis = Depends(get_redis)
+) -> SingleFlight:
+    # 분산 모드에서는 Redis 리스로 여러 워커 중 하나만 답변을 생성합니다.
+    return SingleFlight(
+        redis_client=cache_client if settings.SINGLE_FLIGHT_DISTRIBUTED else None,
+        similarity_threshold=settings.SEMANTIC_CACHE_THRESHOLD,
+        lease_ttl=settings.SINGLE_FLIGHT_LEASE_TTL,
+        wait_timeout=settings.SINGLE_FLIGHT_WAIT_TIMEOUT,
+    )
+
+def get_write_queue(request: Request) -> Optional[WriteBehindQueue]:
+    """
+    lifespan에서 생성된 싱글톤 write-behind 큐를 반환합니다. (비활성화된 경우 None)
+    """
+    return request.app.state.write_queue
+
+def create_write_queue(chat_repository: ChatRepository, cache_strategy: CacheStrategy) -> Optional[WriteBehindQueue]:
+    if not settings.WRITE_BEHIND_ENABLED:
+        return None
+    return WriteBehindQueue(
+        chat_repository,
+        cache_strategy,
+        max_size=settings.WRITE_BEHIND_QUEUE_SIZE,
+        batch_size=settings.WRITE_BEHIND_BATCH_SIZE,
+        flush_interval=settings.WRITE_BEHIND_FLUSH_INTERVAL,
+        spool_path=settings.WRITE_BEHIND_SPOOL_PATH,
+    )
+
+def get_feedback_buffer(request: Request) -> Optional[FeedbackBuffer]:
+    """
+    lifespan에서 생성된 싱글톤 피드백 버퍼를 반환합니다. (비활성화된 경우 None)
+    """
+    return request.app.state.feedback_buffer
+
+def create_feedback_buffer(cache_client: Redis, vector_repository: VectorRepository) -> Optional[FeedbackBuffer]:
+    if not settings.FEEDBACK_BUFFER_ENABLED:
+        return None
+    return FeedbackBuffer(cache_client, vector_repository, flush_interval=settings.FEEDBACK_FLUSH_INTERVAL)
+
 async def get_chat_service(
     retriever: DocumentRetriever = Depends(get_document_retriever),
     prompt: ChatPromptTemplate = Depends(get_prompt),
@@ -225,6 +421,10 @@ async def get_chat_service(
     chat_repository: ChatRepository = Depends(get_chat_repository),
     vector_repository: VectorRepository = Depends(get_vector_repository),
     cache_strategy: CacheStrategy = Depends(get_cache_strategy),
+    embedding_strategy: EmbeddingStrategy = Depends(get_embedding_strategy),
+    single_flight: SingleFlight = Depends(get_single_flight),
+    write_queue: Optional[WriteBehindQueue] = Depends(get_write_queue),
+    feedback_buffer: Optional[FeedbackBuffer] = Depends(get_feedback_buffer),
 ) -> ChatService:
     return ChatService(
         retriever=retriever,
@@ -232,19 +432,31 @@ async def get_chat_service(
         llm=llm,
         chat_repository=chat_repository,
         vector_repository=vector_repository,
-        cache_strategy=cache_strategy)
+        cache_strategy=cache_strategy,
+        embedding_strategy=embedding_strategy,
+        single_flight=single_flight,
+        qa_direct_threshold=settings.QA_DIRECT_THRESHOLD,
+        qa_direct_template=settings.QA_DIRECT_TEMPLATE,
+        write_queue=write_queue,
+        feedback_buffer=feedback_buffer)
 
 async def get_rag_service(
     chunk_service: ChunkService = Depends(get_chunk_service),
     embedding_service: EmbeddingService = Depends(get_embedding_service),
     data_processor: DataProcessor = Depends(get_data_processor),
-    vector_repository: VectorRepository = Depends(get_vector_repository)
+    vector_repository: VectorRepository = Depends(get_vector_repository),
+    index_version: IndexVersion = Depends(get_index_version),
+    corpus_version: CorpusVersion = Depends(get_corpus_version)
 ) -> RAGService:
     return RAGService(
         chunk_service=chunk_service,
         embedding_service=embedding_service,
         data_processor=data_processor,
         vector_repository=vector_repository,
+        index_version=index_version,
+        corpus_version=corpus_version,
+        batch_size=settings.INGEST_BATCH_SIZE,
+        pipeline_depth=settings.INGEST_PIPELINE_DEPTH,
     )
 
 
@@ -258,5 +470,24 @@ def get_singleton_chat_service(request: Request) -> ChatService:
 def get_singleton_rag_service(request: Request) -> RAGService:
     return request.app.state.rag_service
 
+def get_ingestion_job_manager(request: Request) -> IngestionJobManager:
+    return request.app.state.ingestion_job_manager
+
+def create_ingestion_job_manager(
+    cache_client: Redis,
+    rag_service: RAGService,
+    bm25_manager: BM25Manager,
+) -> IngestionJobManager:
+    return IngestionJobManager(
+        cache_client,
+        rag_service,
+        bm25_manager,
+        job_dir=settings.INGEST_JOB_DIR,
+        lease_ttl=settings.INGEST_JOB_LEASE_TTL,
+        poll_interval=settings.INGEST_JOB_POLL_INTERVAL,
+        result_ttl=settings.INGEST_JOB_RESULT_TTL,
+        max_attempts=settings.INGEST_JOB_MAX_ATTEMPTS,
+    )
+
 def get_bm25_manager(request: Request) -> BM25Manager:
     return request.app.state.bm25_manager
\ No newline at end of file
@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from datetime import datetime
 from typing import List, Dict, Any, Optional
 
 class ChatStrategy(ABC):
@@ -60,6 +61,38 @@ class ChatStrategy(ABC):
         """
         pass
 
+    @abstractmethod
+    def get_recent_history(
+        self,
+        session_id: str,
+        limit: int,
+        before: Optional[datetime] = None,
+        before_id: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        특정 세션의 최근 대화 `limit`개를 시간순으로 가져옵니다. (전체 기록을 읽지 않음)
+
+        Args:
+            session_id (str): 조회할 세션의 ID.
+            limit (int): 가져올 대화 수.
+            before (Optional[datetime]): 이 시각 이전의 대화만 가져옵니다. (이전 페이지 조회용 커서)
+            before_id (Optional[str]): 커서 대화의 ID. 주어지면 `before`와 같은 시각의 대화 중 이 ID보다 앞선 대화도 가져옵니다.
+
+        Returns:
+            List[Dict[str, Any]]: `to_turn` 형태의 대화 리스트.
+        """
+        pass
+
+    @abstractmethod
+    def to_turn(self, chat: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        저장된 채팅 문서를 API 응답용 대화(turn) 형태로 변환합니다.
+
+        Returns:
+            Dict[str, Any]: {"chat_id", "human", "ai", "feedback", "timestamp"(ISO 8601)}
+        """
+        pass
+
     @abstractmethod
     def update_feedback(self, chat_id: str, is_good: bool):
         """
@@ -81,4 +114,101 @@ class ChatStrategy(ABC):
         :return:
         :rtype:
         """
-        pass
\ No newline at end of file
+        pass
+
+    # ----------------------------------------------------------------
+    # 비동기(async) 변형
+    # 이벤트 루프를 막지 않도록 ChatService의 요청 경로에서는 아래 메서드를 사용합니다.
+    # ----------------------------------------------------------------
+
+    @abstractmethod
+    async def asave_chats(
+        self,
+        session_id: str,
+        human_message: str,
+        ai_message: str,
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """
+        `save_chats`의 비동기 버전입니다.
+
+        Returns:
+            str: 저장된 메시지의 고유 ID.
+        """
+        pass
+
+    @abstractmethod
+    def build_chat(
+        self,
+        session_id: str,
+        human_message: str,
+        ai_message: str,
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        저장할 채팅 문서를 구성합니다. 문서 ID는 저장 전에 미리 생성되므로, 나중에 일괄 저장하더라도 ID를 바로 응답할 수 있습니다.
+
+        Returns:
+            Dict[str, Any]: 저장할 채팅 문서. (고유 ID 포함)
+        """
+        pass
+
+    @abstractmethod
+    async def ainsert_chats(self, chats: List[Dict[str, Any]]) -> None:
+        """
+        `build_chat`으로 구성한 채팅 문서 여러 개를 한 번에 저장합니다.
+        이미 저장된 문서(같은 ID)는 건너뛰므로 같은 문서를 다시 저장해도 안전합니다.
+
+        Args:
+            chats (List[Dict[str, Any]]): 저장할 채팅 문서 리스트.
+        """
+        pass
+
+    @abstractmethod
+    async def aget_history(self, session_id: str) -> List[Dict[str, Any]]:
+        """
+        `get_history`의 비동기 버전입니다.
+
+        Returns:
+            List[Dict[str, Any]]: 해당 세션의 메시지 목록.
+        """
+        pass
+
+    @abstractmethod
+    async def aget_recent_history(
+        self,
+        session_id: str,
+        limit: int,
+        before: Optional[datetime] = None,
+        before_id: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        `get_recent_history`의 비동기 버전입니다.
+        """
+        pass
+
+    @abstractmethod
+    async def aupdate_feedback(self, chat_id: str, is_good: bool):
+        """
+        `update_feedback`의 비동기 버전입니다.
+        """
+        pass
+
+    @abstractmethod
+    async def afind_chat_history(self, chat_id: str):
+        """
+        `find_chat_history`의 비동기 버전입니다.
+        """
+        pass
+
+    async def aensure_indexes(self):
+        """
+        조회에 필요한 인덱스를 생성합니다. (애플리케이션 시작 시 호출) 필요한 구현체만 재정의합니다.
+        """
+        pass
+
+    async def aclose(self):
+        """
+        저장소 연결을 정리합니다. 필요한 구현체만 재정의합니다.
+        """
+        pass
@@ -3,7 +3,8 @@ from typing import Optional, Dict, Any, List
 
 from bson import ObjectId
 from fastapi.logger import logger
-from pymongo import MongoClient, ASCENDING
+from pymongo import MongoClient, AsyncMongoClient, ASCENDING, DESCENDING
+from pymongo.errors import BulkWriteError
 
 from database.chat.chat_strategy.chat_store_strategy import ChatStrategy
 
@@ -24,6 +25,14 @@ class MongoChatStrategy(ChatStrategy):
         # URI에 명시된 default database 자동 추출
         self.db = self.client.get_default_database()
         self.messages_collection = self.db["chats"]
+
+        # 요청 경로(이벤트 루프)에서 사용할 비동기 클라이언트
+        self.async_client = AsyncMongoClient(mongo_uri)
+        self.async_db = self.async_client.get_default_database()
+        self.async_messages_collection = self.async_db["chats"]
+        # 최근 대화 조회 시 반환할 필드만 가져옵니다.
+        self.turn_projection = {"interaction": 1, "feedback": 1, "timestamp": 1}
+        self.recent_history_sort = [("timestamp", DESCENDING), ("_id", DESCENDING)]
         logger.info(f"✅ MongoDB Chat Store 초기화 완료 (DB: {self.db.name})")
 
     def get_or_create_session(self, user_identifier: str) -> str:
@@ -53,28 +62,81 @@ class MongoChatStrategy(ChatStrategy):
         """
         한 번의 사용자-AI 상호작용을 MongoDB에 저장합니다.
         """
+        message_doc = self._build_message_doc(session_id, human_message, ai_message, metadata)
+        result = self.messages_collection.insert_one(message_doc)
+        return str(result.inserted_id)
+
+    async def asave_chats(
+            self,
+            session_id: str,
+            human_message: str,
+            ai_message: str,
+            metadata: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """
+        한 번의 사용자-AI 상호작용을 비동기 클라이언트로 MongoDB에 저장합니다.
+        """
+        message_doc = self._build_message_doc(session_id, human_message, ai_message, metadata)
+        result = await self.async_messages_collection.insert_one(message_doc)
+        return str(result.inserted_id)
+
+    def build_chat(
+            self,
+            session_id: str,
+            human_message: str,
+            ai_message: str,
+            metadata: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        저장할 채팅 문서를 구성합니다. ObjectId를 클라이언트에서 미리 생성합니다.
+        """
+        message_doc = self._build_message_doc(session_id, human_message, ai_message, metadata)
+        message_doc["_id"] = ObjectId()
+        return message_doc
+
+    async def ainsert_chats(self, chats: List[Dict[str, Any]]) -> None:
+        """
+        채팅 문서 여러 개를 insert_many 한 번으로 저장합니다. 이미 저장된 문서(중복 _id)는 무시합니다.
+        """
+        try:
+            await self.async_messages_collection.insert_many(chats, ordered=False)
+        except BulkWriteError as e:
+            # 재시도/스풀 재처리로 이미 저장된 문서는 중복 키 오류(11000)가 나므로 무시
+            errors = [error for error in e.details.get("writeErrors", []) if error.get("code") != 11000]
+            if errors or e.details.get("writeConcernErrors"):
+                raise
+
+    @staticmethod
+    def _build_message_doc(
+            session_id: str,
+            human_message: str,
+            ai_message: str,
+            metadata: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        MongoDB에 저장할 채팅 문서를 구성합니다.
+        """
         if metadata is None:
             metadata = {}
 
-        message_doc = {
+        # MongoDB는 밀리초까지만 저장하므로, 저장 전 문서(세션 캐시)와 DB의 시각이 같도록 밀리초로 맞춤
+        now = datetime.now(timezone.utc)
+        return {
             "session_id": session_id,
             "interaction": {
                 "human": human_message,
                 "ai": ai_message,
             },
             "metadata": metadata,  # 예: {'retrieved_source_ids': [...]}
-            "timestamp": datetime.now(timezone.utc)
+            "timestamp": now.replace(microsecond=now.microsecond // 1000 * 1000)
         }
-        result = self.messages_collection.insert_one(message_doc)
-        return str(result.inserted_id)
 
     def get_history(self, session_id: str) -> List[Dict[str, Any]]:
         """
         특정 세션의 전체 대화 기록을 시간순으로 정렬하여 가져옵니다.
         """
-        from bson import ObjectId
         messages = self.messages_collection.find(
-            {"session_id": ObjectId(session_id)}
+            {"session_id": session_id}  # session_id는 문자열로 저장됩니다.
         ).sort("timestamp", ASCENDING)
         # ObjectId를 문자열로 변환하여 반환 (JSON 직렬화 용이)
         history = []
@@ -84,6 +146,79 @@ class MongoChatStrategy(ChatStrategy):
             history.append(msg)
         return history
 
+    async def aget_history(self, session_id: str) -> List[Dict[str, Any]]:
+        """
+        특정 세션의 전체 대화 기록을 비동기로 시간순 정렬하여 가져옵니다.
+        """
+        cursor = self.async_messages_collection.find(
+            {"session_id": session_id}  # session_id는 문자열로 저장됩니다.
+        ).sort("timestamp", ASCENDING)
+        history = []
+        async for msg in cursor:
+            msg["_id"] = str(msg["_id"])
+            msg["session_id"] = str(msg["session_id"])
+            history.append(msg)
+        return history
+
+    @staticmethod
+    def _recent_history_filter(session_id: str, before: Optional[datetime], before_id: Optional[str]) -> Dict[str, Any]:
+        """(timestamp, _id) 순서에서 커서보다 앞선 대화만 조회하는 필터 (같은 시각의 대화는 _id로 구분)"""
+        query: Dict[str, Any] = {"session_id": session_id}
+        if before is not None and before_id is not None:
+            query["$or"] = [
+                {"timestamp": {"$lt": before}},
+                {"timestamp": before, "_id": {"$lt": ObjectId(before_id)}},
+            ]
+        elif before is not None:
+            query["timestamp"] = {"$lt": before}
+        return query
+
+    def get_recent_history(
+            self,
+            session_id: str,
+            limit: int,
+            before: Optional[datetime] = None,
+            before_id: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        (session_id, timestamp, _id) 인덱스로 최근 대화 `limit`개만 최신순으로 읽은 뒤 시간순으로 반환합니다.
+        """
+        cursor = self.messages_collection.find(
+            self._recent_history_filter(session_id, before, before_id), self.turn_projection
+        ).sort(self.recent_history_sort).limit(limit)
+        return [self.to_turn(msg) for msg in cursor][::-1]
+
+    async def aget_recent_history(
+            self,
+            session_id: str,
+            limit: int,
+            before: Optional[datetime] = None,
+            before_id: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        `get_recent_history`의 비동기 버전입니다.
+        """
+        cursor = self.async_messages_collection.find(
+            self._recent_history_filter(session_id, before, before_id), self.turn_projection
+        ).sort(self.recent_history_sort).limit(limit)
+        return [self.to_turn(msg) async for msg in cursor][::-1]
+
+    def to_turn(self, chat: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        채팅 문서를 API 응답용 대화 형태로 변환합니다. (MongoDB는 timezone 정보 없이 UTC로 반환하므로 UTC로 지정)
+        """
+        timestamp = chat["timestamp"]
+        if timestamp.tzinfo is None:
+            timestamp = timestamp.replace(tzinfo=timezone.utc)
+        interaction = chat.get("interaction", {})
+        return {
+            "chat_id": str(chat["_id"]),
+            "human": interaction.get("human"),
+            "ai": interaction.get("ai"),
+            "feedback": chat.get("feedback"),
+            "timestamp": timestamp.isoformat(),
+        }
+
     # 이 메서드는 ChatRepository 클래스 안에 있다고 가정합니다.
     def update_feedback(self, chat_id: str, is_good: bool) -> dict:
         """
@@ -110,3 +245,41 @@ class MongoChatStrategy(ChatStrategy):
         :rtype:
         """
         return self.messages_collection.find_one({"_id": ObjectId(chat_id)})
+
+    async def aupdate_feedback(self, chat_id: str, is_good: bool) -> dict:
+        """
+        `update_feedback`의 비동기 버전입니다.
+        :param chat_id: 채팅 메시지 ID
+        :param is_good: 피드백 (좋은 답변이면 True, 그렇지 않으면 False)
+        :return: 업데이트 전 채팅 문서(dict) 또는 문서가 없을 경우 None
+        """
+        feedback = "good" if is_good else "bad"
+
+        return await self.async_messages_collection.find_one_and_update(
+            {"_id": ObjectId(chat_id)},
+            {"$set": {"feedback": feedback}},
+        )
+
+    async def afind_chat_history(self, chat_id: str):
+        """
+        특정 채팅 문서를 비동기로 한개 가져옵니다.
+        """
+        return await self.async_messages_collection.find_one({"_id": ObjectId(chat_id)})
+
+    async def aensure_indexes(self):
+        """
+        세션별 최근 대화 조회용 (session_id, timestamp, _id) 복합 인덱스를 생성합니다. (같은 시각의 대화도 인덱스 순서로 정렬)
+        피드백 조회는 `_id` 기본 인덱스를 사용합니다. 이미 있으면 아무 작업도 하지 않습니다.
+        """
+        await self.async_messages_collection.create_index(
+            [("session_id", ASCENDING), *self.recent_history_sort],
+            name="session_id_timestamp_id",
+        )
+        logger.info("✅ MongoDB 채팅 인덱스 확인 완료")
+
+    async def aclose(self):
+        """
+        MongoDB 클라이언트 연결을 종료합니다. (lifespan 종료 시 호출)
+        """
+        await self.async_client.close()
+        self.client.close()
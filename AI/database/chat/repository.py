@@ -1,11 +1,20 @@
+from datetime import datetime
+from typing import Optional
+
 from fastapi.logger import logger
 
 from database.chat.chat_strategy.chat_store_strategy import ChatStrategy
+from database.chat.session_history_cache import SessionHistoryCache
 
 
 class ChatRepository:
-    def __init__(self, chat_strategy: ChatStrategy):
+    def __init__(self, chat_strategy: ChatStrategy, history_cache: Optional[SessionHistoryCache] = None):
+        """
+        :param chat_strategy: 채팅 저장소 전략
+        :param history_cache: 세션별 최근 대화 캐시 (없으면 매번 DB에서 조회)
+        """
         self.chat_repository = chat_strategy
+        self.history_cache = history_cache
 
     def save_chat(self, ai_message: str, human_message: str, session:str, metadata: dict):
         """
@@ -49,4 +58,118 @@ class ChatRepository:
         :return:
         :rtype:
         """
-        return self.chat_repository.find_chat_history(chat_id)
\ No newline at end of file
+        return self.chat_repository.find_chat_history(chat_id)
+
+    async def asave_chat(self, ai_message: str, human_message: str, session: str, metadata: dict):
+        """
+        채팅 메시지를 비동기로 저장합니다.
+        :param session: 채팅방 구분 아이디
+        :param human_message: 사람의 질문 내용
+        :param ai_message: AI의 답변 내용
+        :return: 저장된 채팅 메시지 ID
+        """
+        chat = self.chat_repository.build_chat(session, human_message, ai_message, metadata)
+        await self.chat_repository.ainsert_chats([chat])
+        self._append_to_history_cache(session, chat)
+        return str(chat["_id"])
+
+    def build_chat(self, ai_message: str, human_message: str, session: str, metadata: dict) -> dict:
+        """
+        저장할 채팅 문서를 구성합니다. (문서 ID는 미리 생성됨)
+        :param session: 채팅방 구분 아이디
+        :param human_message: 사람의 질문 내용
+        :param ai_message: AI의 답변 내용
+        :return: 저장할 채팅 문서
+        """
+        chat = self.chat_repository.build_chat(session, human_message, ai_message, metadata)
+        self._append_to_history_cache(session, chat, pending=True)
+        return chat
+
+    def discard_chat(self, chat: dict):
+        """
+        `build_chat`으로 구성했지만 저장하지 않게 된 채팅 문서를 세션 캐시에서 되돌립니다.
+        :param chat: `build_chat`으로 구성한 채팅 문서
+        """
+        if self.history_cache is not None and chat.get("session_id") is not None:
+            self.history_cache.discard(chat["session_id"], str(chat["_id"]))
+
+    def _append_to_history_cache(self, session: str, chat: dict, pending: bool = False):
+        """저장한(또는 저장 대기 중인) 대화를 세션 캐시에 추가합니다."""
+        if self.history_cache is not None and session is not None:
+            self.history_cache.append(session, self.chat_repository.to_turn(chat), pending=pending)
+
+    async def ainsert_chats(self, chats: list[dict]):
+        """
+        `build_chat`으로 구성한 채팅 문서 여러 개를 비동기로 한 번에 저장합니다.
+        :param chats: 저장할 채팅 문서 리스트
+        """
+        try:
+            return await self.chat_repository.ainsert_chats(chats)
+        finally:
+            # 저장에 실패한 대화는 스풀되므로 성공 여부와 관계없이 저장 대기 목록에서 제거
+            if self.history_cache is not None:
+                for chat in chats:
+                    self.history_cache.saved(chat.get("session_id"), str(chat["_id"]))
+
+    async def aget_history(self, session: str):
+        """
+        채팅 기록을 비동기로 가져옵니다.
+        :param session: 채팅방 구분 아이디
+        :return: 채팅 메시지 리스트
+        """
+        return await self.chat_repository.aget_history(session)
+
+    async def aget_recent_history(
+            self, session: str, limit: int, before: Optional[datetime] = None, before_id: Optional[str] = None
+    ) -> list[dict]:
+        """
+        세션의 최근 대화 `limit`개를 시간순으로 비동기로 가져옵니다.
+        첫 페이지(before 없음)는 세션 캐시에서 응답하고, 캐시에 없으면 DB에서 읽어 캐시를 채웁니다.
+        :param session: 채팅방 구분 아이디
+        :param limit: 가져올 대화 수
+        :param before: 이 시각 이전의 대화만 가져옵니다. (이전 페이지 커서)
+        :param before_id: 커서 대화의 ID. 같은 시각의 대화를 구분합니다.
+        :return: 대화 리스트
+        """
+        if before is not None or self.history_cache is None or limit > self.history_cache.max_turns:
+            return await self.chat_repository.aget_recent_history(session, limit, before, before_id)
+
+        cached = self.history_cache.get(session, limit)
+        if cached is not None:
+            return cached
+        # 아직 저장되지 않았거나 DB를 읽는 동안 추가된 대화도 합쳐서 채움 (write-behind 큐에 있는 대화 누락 방지)
+        buffer = self.history_cache.begin_fill(session)
+        try:
+            turns = await self.chat_repository.aget_recent_history(session, self.history_cache.max_turns)
+        except BaseException:
+            self.history_cache.abort_fill(session, buffer)
+            raise
+        return self.history_cache.finish_fill(session, buffer, turns)[-limit:]
+
+    def get_recent_history(self, session: str, limit: int):
+        """
+        세션의 최근 대화 `limit`개를 시간순으로 가져옵니다.
+        :param session: 채팅방 구분 아이디
+        :param limit: 가져올 대화 수
+        :return: 대화 리스트
+        """
+        return self.chat_repository.get_recent_history(session, limit)
+
+    async def aupdate_feedback(self, chat_id: str, is_good: bool):
+        """
+        채팅 메시지에 대한 피드백을 비동기로 업데이트합니다.
+        :param chat_id: 채팅 메시지 ID
+        :param is_good: 피드백 (좋은 답변이면 True, 그렇지 않으면 False)
+        """
+        logger.info(f"--- 채팅 ID {chat_id}에 대한 피드백 업데이트 시작 ---")
+        chat = await self.chat_repository.aupdate_feedback(chat_id, is_good)
+        if chat is not None and self.history_cache is not None:
+            self.history_cache.update_feedback(chat.get("session_id"), chat_id, "good" if is_good else "bad")
+        return chat
+
+    async def afind_chat_history(self, chat_id: str):
+        """
+        채팅 내역을 비동기로 한개 가져옵니다.
+        :param chat_id: 채팅 메시지 ID
+        """
+        return await self.chat_repository.afind_chat_history(chat_id)
@@ -0,0 +1,177 @@
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class SessionHistoryCache:
+    """
+    세션별 최근 대화(turn) N개를 보관하는 프로세스 내부 LRU + TTL 캐시입니다.
+
+    대화 기록의 첫 페이지(최근 N개) 조회는 DB를 거치지 않고 이 캐시에서 응답합니다.
+    대화가 저장되면 캐시된 세션에 새 대화를 바로 추가하므로, 조회 결과가 DB 저장 시점(write-behind)에 영향받지 않습니다.
+    캐시에 없는 세션은 다음 조회에서 DB의 최근 대화로 채웁니다.
+    이때 아직 DB에 저장되지 않은(write-behind 큐에 있는) 대화와 DB를 읽는 동안 추가된 대화를 함께 합쳐서 채웁니다.
+    """
+
+    def __init__(self, max_sessions: int = 1000, max_turns: int = 20, ttl_seconds: float = 300):
+        """
+        SessionHistoryCache를 초기화합니다.
+
+        Args:
+            max_sessions (int): 보관할 최대 세션 수. 초과하면 가장 오래 사용되지 않은 세션부터 제거합니다.
+            max_turns (int): 세션마다 보관할 최근 대화 수.
+            ttl_seconds (float): 세션 캐시의 유효 시간(초).
+        """
+        self.max_sessions = max_sessions
+        self.max_turns = max_turns
+        self.ttl_seconds = ttl_seconds
+        self._sessions: "OrderedDict[str, Tuple[float, List[Dict[str, Any]]]]" = OrderedDict()
+        # 아직 DB에 저장되지 않은 대화: 세션 ID -> {chat_id: 대화}
+        self._pending: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        # DB에서 채우는 중인 세션에 그동안 추가된 대화: 세션 ID -> 채우기마다 하나씩인 {chat_id: 대화}
+        self._fills: Dict[str, List[Dict[str, Dict[str, Any]]]] = {}
+
+        # 캐시 적중/실패 카운터
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, session_id: str, limit: int) -> Optional[List[Dict[str, Any]]]:
+        """
+        세션의 최근 대화 `limit`개를 시간순으로 반환합니다.
+
+        Args:
+            session_id (str): 대화 세션 ID.
+            limit (int): 가져올 대화 수.
+
+        Returns:
+            Optional[List[Dict[str, Any]]]: 최근 대화 리스트. 캐시에 없거나, 만료되었거나, 보관 개수보다 많이 요청하면 None.
+        """
+        entry = self._sessions.get(session_id)
+        if entry is None or entry[0] < time.monotonic() or limit > self.max_turns:
+            if entry is not None and entry[0] < time.monotonic():
+                del self._sessions[session_id]
+            self.misses += 1
+            return None
+
+        self._sessions.move_to_end(session_id)
+        self.hits += 1
+        return entry[1][-limit:]
+
+    def put(self, session_id: str, turns: List[Dict[str, Any]]):
+        """
+        DB에서 조회한 세션의 최근 대화(시간순)로 캐시를 채웁니다.
+
+        Args:
+            session_id (str): 대화 세션 ID.
+            turns (List[Dict[str, Any]]): 시간순으로 정렬된 최근 대화 리스트.
+        """
+        self._sessions[session_id] = (time.monotonic() + self.ttl_seconds, list(turns[-self.max_turns:]))
+        self._sessions.move_to_end(session_id)
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+
+    def begin_fill(self, session_id: str) -> Dict[str, Dict[str, Any]]:
+        """
+        DB에서 세션을 채우기 시작합니다. 반환한 버퍼에는 아직 저장되지 않은 대화와 DB를 읽는 동안 추가되는 대화가 모입니다.
+
+        Args:
+            session_id (str): 대화 세션 ID.
+
+        Returns:
+            Dict[str, Dict[str, Any]]: `finish_fill`/`abort_fill`에 넘길 버퍼.
+        """
+        buffer = dict(self._pending.get(session_id, {}))
+        self._fills.setdefault(session_id, []).append(buffer)
+        return buffer
+
+    def finish_fill(self, session_id: str, buffer: Dict[str, Dict[str, Any]], turns: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        DB에서 읽은 최근 대화에 버퍼의 대화를 합쳐 캐시를 채웁니다.
+
+        Args:
+            session_id (str): 대화 세션 ID.
+            buffer (Dict[str, Dict[str, Any]]): `begin_fill`이 반환한 버퍼.
+            turns (List[Dict[str, Any]]): DB에서 읽은 시간순 최근 대화 리스트.
+
+        Returns:
+            List[Dict[str, Any]]: 합쳐서 캐시에 넣은 시간순 최근 대화 리스트.
+        """
+        self.abort_fill(session_id, buffer)
+        saved_ids = {turn["chat_id"] for turn in turns}
+        merged = list(turns) + [turn for chat_id, turn in buffer.items() if chat_id not in saved_ids]
+        merged.sort(key=lambda turn: (turn["timestamp"], turn["chat_id"]))
+        self.put(session_id, merged)
+        return merged[-self.max_turns:]
+
+    def abort_fill(self, session_id: str, buffer: Dict[str, Dict[str, Any]]):
+        """DB 조회에 실패한 경우 등, 캐시를 채우지 않고 버퍼를 정리합니다."""
+        fills = self._fills.get(session_id)
+        if fills is None:
+            return
+        fills[:] = [fill for fill in fills if fill is not buffer]
+        if not fills:
+            del self._fills[session_id]
+
+    def saved(self, session_id: str, chat_id: str):
+        """`append(..., pending=True)`로 추가한 대화가 DB에 저장(또는 스풀)되었음을 기록합니다."""
+        pending = self._pending.get(session_id)
+        if pending is None:
+            return
+        pending.pop(chat_id, None)
+        if not pending:
+            del self._pending[session_id]
+
+    def discard(self, session_id: str, chat_id: str):
+        """저장되지 않게 된 대화(예: 저장 대기열에 넣기 전에 요청이 취소됨)를 캐시와 저장 대기 목록에서 제거합니다."""
+        self.saved(session_id, chat_id)
+        for buffer in self._fills.get(session_id, ()):
+            buffer.pop(chat_id, None)
+        entry = self._sessions.get(session_id)
+        if entry is not None:
+            entry[1][:] = [turn for turn in entry[1] if turn["chat_id"] != chat_id]
+
+    def append(self, session_id: str, turn: Dict[str, Any], pending: bool = False):
+        """
+        저장한 대화를 캐시된 세션에 추가합니다. 캐시에 없는 세션은 무시합니다. (일부 대화만으로 세션을 채우지 않음)
+        DB에서 채우는 중인 세션이면 채우기가 끝날 때 합쳐지도록 버퍼에도 넣습니다.
+
+        Args:
+            session_id (str): 대화 세션 ID.
+            turn (Dict[str, Any]): 추가할 대화.
+            pending (bool): 아직 DB에 저장되지 않은 대화인지 여부. True이면 `saved`가 호출될 때까지 이후의 채우기에도 합쳐집니다.
+        """
+        if pending:
+            self._pending.setdefault(session_id, {})[turn["chat_id"]] = turn
+        for buffer in self._fills.get(session_id, ()):
+            buffer[turn["chat_id"]] = turn
+
+        entry = self._sessions.get(session_id)
+        if entry is None:
+            return
+        turns = entry[1]
+        turns.append(turn)
+        del turns[:-self.max_turns]
+
+    def update_feedback(self, session_id: str, chat_id: str, feedback: str):
+        """캐시된 대화의 피드백 값을 갱신합니다."""
+        entry = self._sessions.get(session_id)
+        if entry is None:
+            return
+        for turn in entry[1]:
+            if turn["chat_id"] == chat_id:
+                turn["feedback"] = feedback
+
+    def get_stats(self) -> Dict[str, int | float]:
+        """
+        캐시 적중/실패 통계를 반환합니다.
+
+        Returns:
+            Dict[str, int | float]: 적중 수, 실패 수, 적중률, 캐시된 세션 수.
+        """
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "sessions": len(self._sessions),
+        }
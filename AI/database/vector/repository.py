@@ -1,8 +1,9 @@
-from typing import Optional, List
+from typing import Dict, Optional, List
 
 from fastapi.logger import logger
 
 from database.vector.vector_strategy.vector_store_strategy import VectorStoreStrategy
+from service.embedding.query_embedding import QueryEmbedding
 
 
 class VectorRepository:
@@ -21,6 +22,15 @@ class VectorRepository:
         self.vector_db.add_documents(documents)
         logger.info("--- 벡터 스토어에 문서 추가 완료 ---")
 
+    async def aadd_documents(self, documents):
+        """
+        벡터 스토어에 문서를 비동기로 임베딩하여 추가합니다.
+        :param documents: 추가할 문서들
+        """
+        logger.info("--- 벡터 스토어에 문서 추가 시작 ---")
+        await self.vector_db.aadd_documents(documents)
+        logger.info("--- 벡터 스토어에 문서 추가 완료 ---")
+
     def query(self, query_text: str, top_k: int = 5, source_type: Optional[str] = None):
         """
         벡터 스토어에서 쿼리로 유사 문서를 검색합니다.
@@ -38,6 +48,41 @@ class VectorRepository:
         #     logger.info(f"    메타데이터: {doc.metadata}")
         return results
 
+    async def aquery(
+            self,
+            query_text: str,
+            top_k: int = 5,
+            source_type: Optional[str] = None,
+            query_embedding: Optional[QueryEmbedding] = None,
+    ):
+        """
+        `query`의 비동기 버전입니다. 채팅 요청 경로에서 이벤트 루프를 막지 않도록 사용합니다.
+        :param query_text: 유사도를 비교할 사용자의 질문
+        :param top_k: 유사한 문서의 개수
+        :param source_type: 'qa' | 'paragraph' 중 선택 (없으면 모두 포함하여 검색)
+        :param query_embedding: 요청 단위로 공유되는 질문 임베딩. 주어지면 질문을 다시 임베딩하지 않고 벡터로 검색합니다.
+        :return: 유사한 문서의 데이터
+        """
+        if query_embedding is not None:
+            embedding = await query_embedding.aget()
+            return await self.vector_db.aquery_by_vector(embedding, k=top_k, source_type=source_type)
+        return await self.vector_db.aquery(query_text, k=top_k, source_type=source_type)
+
+    def get_ids(self, source_type: Optional[str] = None) -> List[str]:
+        """
+        벡터 스토어에 저장된 청크 ID 목록을 가져옵니다.
+        :param source_type: 'qa' | 'paragraph' 중 선택 (없으면 모든 청크)
+        :return: 청크 ID 리스트
+        """
+        return self.vector_db.get_ids(source_type=source_type)
+
+    def delete(self, ids: List[str]):
+        """
+        벡터 스토어에서 주어진 ID의 청크를 삭제합니다.
+        :param ids: 삭제할 청크 ID 리스트
+        """
+        self.vector_db.delete(ids)
+
     def get_all_documents(self):
         return self.vector_db.get_all_documents()
 
@@ -65,5 +110,54 @@ class VectorRepository:
         except Exception as e:
             return
 
+    async def afind_by_source_id(self, source_id: List[str], is_good: bool):
+        try:
+            await self.vector_db.afind_by_source_id(source_ids=source_id, is_good=is_good)
+        except Exception as e:
+            logger.info(f"🚨 VectorDB 피드백 업데이트 실패: {e}")
+            return
+
+    async def aapply_feedback(self, deltas: Dict[str, Dict[str, int]]) -> int:
+        """
+        소스 ID별 피드백 증가분을 벡터 DB에 한 번에 반영합니다.
+        실패하면 호출한 쪽(FeedbackBuffer)이 증가분을 되돌릴 수 있도록 예외를 그대로 전달합니다.
+        :param deltas: 소스 ID -> {"likes": 증가분, "dislikes": 증가분}
+        :return: 업데이트한 청크 수
+        """
+        return await self.vector_db.aapply_feedback(deltas)
+
+    @property
+    def version(self) -> str:
+        """검색에 사용 중인(또는 이 레포지토리가 가리키는) 컬렉션 버전"""
+        return self.vector_db.version
+
+    def count(self) -> int:
+        return self.vector_db.count()
+
+    def open_version(self, version: Optional[str] = None) -> "VectorRepository":
+        """
+        주어진 버전의 컬렉션을 가리키는 레포지토리를 반환합니다. 버전이 없으면 새 버전을 만듭니다.
+        :param version: 이어서 사용할 버전 이름 (없으면 새 버전)
+        :return: 해당 버전에 읽고 쓰는 레포지토리 (검색 중인 버전에는 영향 없음)
+        """
+        return VectorRepository(self.vector_db.open_version(version))
+
+    def activate_version(self, version: str) -> Optional[str]:
+        """
+        검색에 사용할 컬렉션 버전을 교체합니다.
+        :param version: 사용할 버전
+        :return: 교체 전 버전
+        """
+        return self.vector_db.activate_version(version)
+
+    def rollback_version(self) -> str:
+        return self.vector_db.rollback_version()
+
+    def refresh_version(self) -> bool:
+        return self.vector_db.refresh_version()
+
+    def collect_garbage(self) -> List[str]:
+        return self.vector_db.collect_garbage()
+
     def reset(self):
         self.vector_db.reset()
\ No newline at end of file
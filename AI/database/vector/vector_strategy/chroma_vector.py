@@ -1,5 +1,9 @@
 # strategies/chroma_vector.py
-from typing import List, Optional
+import asyncio
+import copy
+import time
+import uuid
+from typing import Dict, List, Optional, Tuple
 
 import chromadb
 from chromadb.errors import NotFoundError
@@ -8,29 +12,74 @@ from langchain_chroma import Chroma
 from langchain_core.documents import Document
 
 from database.vector.vector_strategy.vector_store_strategy import VectorStoreStrategy
+from service.embedding.embedding_scheduler import EmbeddingScheduler
 from service.embedding.embedding_strategy.embedding_strategy import EmbeddingStrategy
 
 
 class ChromaVector(VectorStoreStrategy):
-    def __init__(self, host: str, port: int, embedding_strategy: EmbeddingStrategy):
+    """
+    ChromaDB 벡터 저장소입니다.
+
+    문서 전체를 다시 수집할 때는 버전이 붙은 새 컬렉션(`langchain_v...`)에 저장한 뒤, 검증이 끝나면 사용할 컬렉션을 교체합니다. (blue/green)
+    현재/직전 버전 이름은 별칭 컬렉션(`langchain_alias`)의 메타데이터에 저장되므로 모든 워커가 같은 버전을 바라봅니다.
+    별칭이 없으면 기존 `langchain` 컬렉션을 그대로 사용합니다.
+    """
+
+    def __init__(
+            self,
+            host: str,
+            port: int,
+            embedding_strategy: EmbeddingStrategy,
+            embedding_scheduler: Optional[EmbeddingScheduler] = None,
+    ):
         """
         ChromaDB 서버에 연결하고 LangChain Chroma 래퍼를 초기화합니다.
         피드백 업데이트를 위해 네이티브 컬렉션 객체에도 접근합니다.
+
+        Args:
+            host (str): ChromaDB 서버 호스트.
+            port (int): ChromaDB 서버 포트.
+            embedding_strategy (EmbeddingStrategy): 쿼리/문서 임베딩에 사용할 전략.
+            embedding_scheduler (Optional[EmbeddingScheduler]): 문서 수집 시 대량 임베딩을 담당하는 스케줄러. 없으면 기본 설정으로 생성합니다.
         """
-        # 콜렉션 이름
-        self.collection_name = "langchain" #기본값 그대로 사용
+        # 콜렉션 이름 (버전 컬렉션은 `{base}_v...` 형식, 별칭 컬렉션은 `{base}_alias`)
+        self.base_collection_name = "langchain" #기본값 그대로 사용
+        self.alias_collection_name = f"{self.base_collection_name}_alias"
         # LangChain 래퍼가 사용할 클라이언트
         self.client = chromadb.HttpClient(host=host, port=port)
         
         # 임베딩 전략
         self.embedding_strategy = embedding_strategy
+        self.embedding_scheduler = embedding_scheduler or EmbeddingScheduler(embedding_strategy)
+
+        # LangChain의 Chroma 벡터스토어 래퍼 초기화 (별칭이 가리키는 버전 사용)
+        active, _ = self._read_alias()
+        self._bind(active or self.base_collection_name)
 
-        # LangChain의 Chroma 벡터스토어 래퍼 초기화
+    def _bind(self, collection_name: str):
+        """주어진 컬렉션을 사용하도록 LangChain 래퍼를 교체합니다. (참조 교체 한 번이므로 검색 중인 요청에 영향 없음)"""
         self.vectorstore = Chroma(
             client=self.client,
-            embedding_function=embedding_strategy,
-            collection_name= self.collection_name
+            embedding_function=self.embedding_strategy,
+            collection_name=collection_name
         )
+        self.collection_name = collection_name
+
+    def _alias_collection(self):
+        return self.client.get_or_create_collection(name=self.alias_collection_name, embedding_function=None)
+
+    def _read_alias(self) -> Tuple[Optional[str], Optional[str]]:
+        """별칭 컬렉션에서 (현재 버전, 직전 버전)을 읽습니다."""
+        metadata = self._alias_collection().metadata or {}
+        return metadata.get("active") or None, metadata.get("previous") or None
+
+    def _write_alias(self, active: str, previous: Optional[str]):
+        # Chroma 메타데이터는 None을 저장할 수 없으므로 빈 문자열로 저장
+        self._alias_collection().modify(metadata={"active": active, "previous": previous or ""})
+
+    @property
+    def version(self) -> str:
+        return self.collection_name
 
     def add_documents(self, chunks: List[Document]):
         """
@@ -39,15 +88,59 @@ class ChromaVector(VectorStoreStrategy):
         self.vectorstore.add_documents(documents=chunks)
         logger.info(f"💾 {len(chunks)}개의 문서를 ChromaDB에 저장 완료")
 
+    async def aadd_documents(self, chunks: List[Document]):
+        """
+        EmbeddingScheduler로 문서를 임베딩하고, 배치가 끝나는 대로 ChromaDB에 저장합니다.
+        임베딩과 저장이 배치 단위로 겹쳐 실행되므로 전체 임베딩이 끝날 때까지 기다리지 않습니다.
+        """
+        collection = self.vectorstore._collection
+        # 내용 기반 chunk_id가 있으면 그대로 Chroma ID로 사용 (증분 수집 시 변경 여부 비교에 사용)
+        ids = [chunk.metadata.get("chunk_id") or str(uuid.uuid4()) for chunk in chunks]
+
+        async def upsert_batch(start: int, end: int, embeddings: List[List[float]]):
+            await asyncio.to_thread(
+                collection.upsert,
+                ids=ids[start:end],
+                embeddings=embeddings,
+                documents=[chunk.page_content for chunk in chunks[start:end]],
+                metadatas=[chunk.metadata for chunk in chunks[start:end]],
+            )
+
+        await self.embedding_scheduler.embed_documents(
+            [chunk.page_content for chunk in chunks],
+            on_batch=upsert_batch,
+        )
+        logger.info(f"💾 {len(chunks)}개의 문서를 ChromaDB에 저장 완료")
+
     def query(self, query_text: str, k: int = 3, source_type: Optional[str] = None) -> list[tuple[Document, float]]:
         """유사도 검색을 수행하고 (문서, 점수) 튜플 리스트를 반환합니다."""
         # 기본 조건으로 Document.page_content의 유사도를 계산하여 반환합니다.
-        if source_type:
-            results = self.vectorstore.similarity_search_with_relevance_scores(query_text, k=k, source_type=source_type)
-        # logger.info(f"🔍 '{query_text}' 쿼리로 유사 문서 검색 완료")
-        else:
-            results = self.vectorstore.similarity_search_with_relevance_scores(query_text, k=k)
-        return results
+        search_filter = {"source_type": source_type} if source_type else None
+        return self.vectorstore.similarity_search_with_relevance_scores(query_text, k=k, filter=search_filter)
+
+    async def aquery(self, query_text: str, k: int = 3, source_type: Optional[str] = None) -> list[tuple[Document, float]]:
+        """
+        비동기 유사도 검색을 수행합니다.
+        쿼리 임베딩과 Chroma HTTP 호출이 이벤트 루프를 막지 않도록 LangChain의 비동기 API를 사용합니다.
+        """
+        search_filter = {"source_type": source_type} if source_type else None
+        return await self.vectorstore.asimilarity_search_with_relevance_scores(query_text, k=k, filter=search_filter)
+
+    async def aquery_by_vector(self, embedding: List[float], k: int = 3, source_type: Optional[str] = None) -> list[tuple[Document, float]]:
+        """
+        이미 계산된 질문 임베딩으로 유사도 검색을 수행하고 (문서, 점수) 튜플 리스트를 반환합니다.
+        `query`와 동일한 점수 체계를 유지하기 위해 Chroma가 반환한 거리를 LangChain의 relevance 점수로 변환합니다.
+        """
+        search_filter = {"source_type": source_type} if source_type else None
+        results = await asyncio.to_thread(
+            self.vectorstore.similarity_search_by_vector_with_relevance_scores,
+            embedding,
+            k=k,
+            filter=search_filter,
+        )
+        # Chroma는 거리(작을수록 유사)를 반환하므로 query()와 같은 relevance 점수(클수록 유사)로 변환
+        relevance_score_fn = self.vectorstore._select_relevance_score_fn()
+        return [(doc, relevance_score_fn(distance)) for doc, distance in results]
 
     def get_all_documents(self) -> List[Document]:
         """
@@ -61,39 +154,139 @@ class ChromaVector(VectorStoreStrategy):
             include=["metadatas", "documents"]
         )
 
+        # 증분 색인에서 사용할 수 있도록 chunk_id가 없는 문서(이전 방식으로 저장된 문서)는 Chroma ID를 chunk_id로 사용
         docs = [
-            Document(page_content=doc, metadata=meta)
-            for doc, meta in zip(data["documents"], data["metadatas"])
+            Document(page_content=doc, metadata={**(meta or {}), "chunk_id": (meta or {}).get("chunk_id", doc_id)})
+            for doc_id, doc, meta in zip(data["ids"], data["documents"], data["metadatas"])
         ]
         return docs
 
+    def get_ids(self, source_type: Optional[str] = None) -> List[str]:
+        """
+        컬렉션에 저장된 청크 ID 목록을 반환합니다. 본문과 임베딩은 가져오지 않습니다.
+        """
+        where = {"source_type": source_type} if source_type else None
+        return self.vectorstore._collection.get(where=where, include=[])["ids"]
+
+    def delete(self, ids: List[str]):
+        """
+        주어진 ID의 청크를 컬렉션에서 삭제합니다.
+        """
+        if not ids:
+            return
+        batch_size = self.client.get_max_batch_size()
+        for i in range(0, len(ids), batch_size):
+            self.vectorstore._collection.delete(ids=ids[i:i + batch_size])
+        logger.info(f"🗑️ {len(ids)}개의 청크를 ChromaDB에서 삭제 완료")
+
     def find_by_source_id(self, source_ids: List[str], is_good: bool):
-        # 네이티브 Chroma 컬렉션 직접 가져오기
-        collection = self.client.get_collection(name="langchain")
-        for source_id in source_ids:
-            results = collection.get(
-                where={"source_id": source_id},
-                limit=1 # _id의 값은 한개만 존재
-            )
-            if not results or not results['ids']:
-                chromadb.logger.info(f"  ❌ 문서를 찾지 못했습니다: {source_id}")
-                continue
-            doc_id = results['ids'][0]
-            current_metadata = results['metadatas'][0]
-            if is_good:
-                # 좋아요 필드 증가
-                current_metadata['likes'] = current_metadata.get('likes', 0) + 1
-                logger.info(f"  - ID '{doc_id}'의 'likes'를 {current_metadata['likes']}로 변경합니다.")
-            elif not is_good:
-                # 싫어요
-                current_metadata['dislikes'] = current_metadata.get('dislikes', 0) + 1
-                logger.info(f"  - ID '{doc_id}'의 'dislikes'를 {current_metadata['dislikes']}로 변경합니다.")
-            # 업데이트 수행
-            collection.update(
-                ids=[doc_id],
-                metadatas=[current_metadata]
-            )
-            logger.info("✅ 업데이트 완료!")
+        kind = "likes" if is_good else "dislikes"
+        self.apply_feedback({source_id: {kind: 1} for source_id in source_ids})
+
+    async def afind_by_source_id(self, source_ids: List[str], is_good: bool):
+        """
+        Chroma HttpClient는 동기 클라이언트이므로 스레드에서 실행하여 이벤트 루프를 막지 않습니다.
+        """
+        await asyncio.to_thread(self.find_by_source_id, source_ids, is_good)
+
+    def apply_feedback(self, deltas: Dict[str, Dict[str, int]]) -> int:
+        """
+        소스 ID별 피드백 증가분을 `$in` 조회 한 번과 일괄 update로 반영합니다. (소스 ID마다 get/update를 반복하지 않음)
+        """
+        if not deltas:
+            return 0
+        collection = self.vectorstore._collection
+        results = collection.get(
+            where={"source_id": {"$in": list(deltas)}},
+            include=["metadatas"],
+        )
+        if not results or not results['ids']:
+            logger.info(f"  ❌ 피드백을 반영할 문서를 찾지 못했습니다: {list(deltas)}")
+            return 0
+
+        metadatas = []
+        for metadata in results['metadatas']:
+            delta = deltas[metadata["source_id"]]
+            metadata['likes'] = metadata.get('likes', 0) + delta.get('likes', 0)
+            metadata['dislikes'] = metadata.get('dislikes', 0) + delta.get('dislikes', 0)
+            metadatas.append(metadata)
+
+        ids = results['ids']
+        batch_size = self.client.get_max_batch_size()
+        for i in range(0, len(ids), batch_size):
+            collection.update(ids=ids[i:i + batch_size], metadatas=metadatas[i:i + batch_size])
+        logger.info(f"✅ {len(ids)}개 청크의 피드백 업데이트 완료!")
+        return len(ids)
+
+    async def aapply_feedback(self, deltas: Dict[str, Dict[str, int]]) -> int:
+        return await asyncio.to_thread(self.apply_feedback, deltas)
+
+    def count(self) -> int:
+        return self.vectorstore._collection.count()
+
+    def open_version(self, version: Optional[str] = None) -> "ChromaVector":
+        """
+        주어진 버전의 컬렉션을 가리키는 ChromaVector를 반환합니다. 버전이 없으면 새 버전 컬렉션을 만듭니다.
+        클라이언트와 임베딩 스케줄러는 공유하며, 검색에 사용 중인 컬렉션은 바뀌지 않습니다.
+        """
+        version = version or f"{self.base_collection_name}_v{time.strftime('%Y%m%d%H%M%S')}_{uuid.uuid4().hex[:6]}"
+        staged = copy.copy(self)
+        staged._bind(version)
+        logger.info(f"🆕 컬렉션 버전 '{version}'을(를) 준비했습니다.")
+        return staged
+
+    def activate_version(self, version: str) -> Optional[str]:
+        """
+        별칭이 새 버전을 가리키도록 교체합니다. 교체 전 버전은 직전 버전으로 보관합니다.
+        """
+        self.client.get_collection(name=version)  # 존재하지 않는 버전으로 교체하지 않도록 확인
+        active, previous = self._read_alias()
+        active = active or self.collection_name
+        if active == version:
+            # 같은 버전을 다시 활성화하는 경우(작업 재실행 등) 직전 버전을 유지
+            self._bind(version)
+            return previous
+        self._write_alias(version, active)
+        self._bind(version)
+        logger.info(f"🔀 컬렉션 버전 교체: '{active}' -> '{version}'")
+        return active
+
+    def rollback_version(self) -> str:
+        active, previous = self._read_alias()
+        if not previous:
+            raise ValueError("롤백할 이전 컬렉션 버전이 없습니다.")
+        self.client.get_collection(name=previous)
+        self._write_alias(previous, active or self.collection_name)
+        self._bind(previous)
+        logger.info(f"⏪ 컬렉션 버전 롤백: '{active}' -> '{previous}'")
+        return previous
+
+    def refresh_version(self) -> bool:
+        active, _ = self._read_alias()
+        active = active or self.base_collection_name
+        if active == self.collection_name:
+            return False
+        self._bind(active)
+        logger.info(f"🔄 다른 워커가 교체한 컬렉션 버전 '{active}'을(를) 사용합니다.")
+        return True
+
+    def collect_garbage(self) -> List[str]:
+        """
+        현재/직전 버전을 제외한 `langchain`, `langchain_v...` 컬렉션을 삭제합니다.
+        """
+        active, previous = self._read_alias()
+        keep = {active or self.base_collection_name, previous}
+        # chromadb 버전에 따라 list_collections가 이름 또는 Collection 객체를 반환
+        names = [getattr(collection, "name", collection) for collection in self.client.list_collections()]
+        removed = []
+        for name in names:
+            is_version = name == self.base_collection_name or name.startswith(f"{self.base_collection_name}_v")
+            if is_version and name not in keep:
+                self.client.delete_collection(name=name)
+                removed.append(name)
+        if removed:
+            logger.info(f"🗑️ 이전 컬렉션 버전 삭제: {removed}")
+        return removed
 
     def reset(self):
         """
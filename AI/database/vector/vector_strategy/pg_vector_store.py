@@ -1,6 +1,8 @@
 # strategies/pg_vector_store.py
-from typing import List, Dict, Any
-from xml.dom.minidom import Document
+import asyncio
+from typing import List, Optional
+
+from langchain_core.documents import Document
 
 from fastapi.logger import logger
 from langchain_community.vectorstores import PGVector
@@ -22,5 +24,29 @@ class PGVectorStore(VectorStoreStrategy):
         self.vectorstore.add_documents(documents=chunks)
         logger.info("💾 PGVector에 저장 완료")
 
-    def query(self, query_text: str, k: int = 3) -> List[Dict[str, Any]]:
-        results = self.vectorstore.similarity_search_with_relevance_scores(query_text, k=k)
+    async def aadd_documents(self, chunks: List[Document]):
+        await self.vectorstore.aadd_documents(documents=chunks)
+        logger.info("💾 PGVector에 저장 완료")
+
+    def query(self, query_text: str, k: int = 3, source_type: Optional[str] = None) -> list[tuple[Document, float]]:
+        search_filter = {"source_type": source_type} if source_type else None
+        return self.vectorstore.similarity_search_with_relevance_scores(query_text, k=k, filter=search_filter)
+
+    async def aquery(self, query_text: str, k: int = 3, source_type: Optional[str] = None) -> list[tuple[Document, float]]:
+        search_filter = {"source_type": source_type} if source_type else None
+        return await self.vectorstore.asimilarity_search_with_relevance_scores(query_text, k=k, filter=search_filter)
+
+    async def aquery_by_vector(self, embedding: List[float], k: int = 3, source_type: Optional[str] = None) -> list[tuple[Document, float]]:
+        """
+        이미 계산된 질문 임베딩으로 검색하고 (문서, 점수) 튜플 리스트를 반환합니다.
+        PGVector는 거리를 반환하므로 `query`와 같은 relevance 점수(클수록 유사)로 변환합니다.
+        """
+        search_filter = {"source_type": source_type} if source_type else None
+        results = await asyncio.to_thread(
+            self.vectorstore.similarity_search_with_score_by_vector,
+            embedding,
+            k=k,
+            filter=search_filter,
+        )
+        relevance_score_fn = self.vectorstore._select_relevance_score_fn()
+        return [(doc, relevance_score_fn(distance)) for doc, distance in results]
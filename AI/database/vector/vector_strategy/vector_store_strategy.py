@@ -10,19 +10,126 @@ class VectorStoreStrategy(ABC):
         """문서(청크)를 저장소에 추가합니다."""
         pass
 
+    @abstractmethod
+    async def aadd_documents(self, chunks: List[Document]):
+        """문서(청크)를 비동기로 임베딩하여 저장소에 추가합니다."""
+        pass
+
     @abstractmethod
     def query(self, query_text: str, k: int = 3, source_type: Optional[str] = None) -> List[Dict[str, Any]]:
         """쿼리로 유사 문서를 검색합니다."""
         pass
 
+    @abstractmethod
+    async def aquery(self, query_text: str, k: int = 3, source_type: Optional[str] = None) -> List[Dict[str, Any]]:
+        """`query`의 비동기 버전입니다. 이벤트 루프를 막지 않고 유사 문서를 검색합니다."""
+        pass
+
+    @abstractmethod
+    async def aquery_by_vector(self, embedding: List[float], k: int = 3, source_type: Optional[str] = None) -> List[Dict[str, Any]]:
+        """미리 계산된 질문 임베딩으로 유사 문서를 검색합니다. (질문을 다시 임베딩하지 않습니다.)"""
+        pass
+
     @abstractmethod
     def get_all_documents(self) -> List[Document]:
         pass
 
+    @abstractmethod
+    def get_ids(self, source_type: Optional[str] = None) -> List[str]:
+        """저장된 청크 ID 목록을 반환합니다. source_type이 주어지면 해당 유형의 청크만 반환합니다."""
+        pass
+
+    @abstractmethod
+    def delete(self, ids: List[str]):
+        """주어진 ID의 청크를 삭제합니다."""
+        pass
+
     @abstractmethod
     def find_by_source_id(self, source_ids: List[str], is_good: bool):
         pass
 
+    @abstractmethod
+    async def afind_by_source_id(self, source_ids: List[str], is_good: bool):
+        """`find_by_source_id`의 비동기 버전입니다."""
+        pass
+
+    @abstractmethod
+    def apply_feedback(self, deltas: Dict[str, Dict[str, int]]) -> int:
+        """
+        소스 ID별 피드백 증가분을 한 번에 반영합니다.
+
+        Args:
+            deltas (Dict[str, Dict[str, int]]): 소스 ID -> {"likes": 증가분, "dislikes": 증가분}
+
+        Returns:
+            int: 업데이트한 청크 수.
+        """
+        pass
+
+    @abstractmethod
+    async def aapply_feedback(self, deltas: Dict[str, Dict[str, int]]) -> int:
+        """`apply_feedback`의 비동기 버전입니다."""
+        pass
+
     @abstractmethod
     def reset(self):
-        pass
\ No newline at end of file
+        pass
+
+    @property
+    @abstractmethod
+    def version(self) -> str:
+        """검색에 사용 중인(또는 이 객체가 가리키는) 컬렉션 버전 이름입니다."""
+        pass
+
+    @abstractmethod
+    def count(self) -> int:
+        """저장된 청크 수를 반환합니다."""
+        pass
+
+    @abstractmethod
+    def open_version(self, version: Optional[str] = None) -> "VectorStoreStrategy":
+        """
+        주어진 버전의 컬렉션을 가리키는 저장소를 반환합니다. 버전이 없으면 비어 있는 새 버전을 만듭니다.
+        반환된 저장소에 쓰더라도 `activate_version` 전까지 검색에는 영향이 없습니다.
+        """
+        pass
+
+    @abstractmethod
+    def activate_version(self, version: str) -> Optional[str]:
+        """
+        검색에 사용할 버전을 교체합니다. 이전 버전은 롤백을 위해 보관합니다.
+
+        Returns:
+            Optional[str]: 교체 전에 사용하던 버전.
+        """
+        pass
+
+    @abstractmethod
+    def rollback_version(self) -> str:
+        """
+        직전 버전으로 되돌립니다. 이전 버전이 없으면 ValueError를 발생시킵니다.
+
+        Returns:
+            str: 다시 사용하게 된 버전.
+        """
+        pass
+
+    @abstractmethod
+    def refresh_version(self) -> bool:
+        """
+        다른 워커가 버전을 교체했는지 확인하고, 바뀌었으면 새 버전을 가리키도록 갱신합니다.
+
+        Returns:
+            bool: 버전이 바뀌었으면 True.
+        """
+        pass
+
+    @abstractmethod
+    def collect_garbage(self) -> List[str]:
+        """
+        사용 중인 버전과 직전 버전을 제외한 이전 버전을 삭제합니다.
+
+        Returns:
+            List[str]: 삭제한 버전 목록.
+        """
+        pass
@@ -1,12 +1,38 @@
 # AI/lifespan.py
 
-from contextlib import asynccontextmanager
+import asyncio
+from contextlib import asynccontextmanager, suppress
 
 from fastapi import FastAPI
 from fastapi.logger import logger
 
 import container.dependency as deps
+from config import settings
+from database.vector.repository import VectorRepository
+from service.cache.cache_strategy import CacheStrategy
 from service.retriever.bm25_manager import BM25Manager
+from service.retriever.index_version import IndexVersion
+
+
+async def _cache_gc_loop(cache_strategy: CacheStrategy, interval: int):
+    """이전 코퍼스 버전으로 생성된 캐시 항목을 주기적으로 정리하는 백그라운드 작업"""
+    while True:
+        try:
+            await cache_strategy.collect_garbage()
+        except Exception as e:
+            logger.info(f"캐시 정리 중 오류 발생: {e}")
+        await asyncio.sleep(interval)
+
+
+async def _index_refresh_loop(vector_repository: VectorRepository, bm25_manager: BM25Manager, interval: int):
+    """다른 워커가 벡터 DB 컬렉션 버전을 교체(재수집/롤백)했으면 이 워커도 새 버전과 그 BM25 인덱스를 사용하도록 갱신하는 백그라운드 작업"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            if await asyncio.to_thread(vector_repository.refresh_version):
+                await bm25_manager.load_or_build(vector_repository.version)
+        except Exception as e:
+            logger.info(f"컬렉션 버전 확인 중 오류 발생: {e}")
 
 
 @asynccontextmanager
@@ -15,8 +41,8 @@ async def lifespan(app: FastAPI):
     logger.info("--- 애플리케이션 시작: 싱글톤 객체 생성 ---")
 
     # 1. 독립적인 무거운 객체들 먼저 생성
-    embedding_strategy = await deps.get_embedding_strategy()
     cache = deps.get_redis()
+    embedding_strategy = await deps.get_embedding_strategy(cache)
     llm = deps.get_llm()
     chat_db_strategy = deps.get_chat_db_strategy()
     prompt = deps.get_prompt() # 캐싱되므로 여기서 호출해도 무방
@@ -25,17 +51,37 @@ async def lifespan(app: FastAPI):
     vector_store_strategy = await deps.get_vector_store_strategy(embedding_strategy)
     vector_repository = await deps.get_vector_repository(vector_store_strategy)
 
+    # 인덱스(벡터 DB, BM25)가 바뀔 때마다 올라가는 버전 카운터 (검색 결과 캐시 무효화용)
+    index_version = IndexVersion()
+    retrieval_cache = deps.create_retrieval_cache(index_version)
+
     #BM25객체 생성
-    bm25_manager = BM25Manager(vector_repository)
-    await bm25_manager.update_retriever()
+    bm25_manager = BM25Manager(
+        vector_repository,
+        index_path=settings.BM25_INDEX_PATH,
+        tokenizer=deps.get_bm25_tokenizer(),
+        index_version=index_version,
+    )
+    await bm25_manager.load_or_build(vector_repository.version) # 저장된 인덱스가 있으면 벡터 DB 전체 조회 없이 복원
 
 
-    chat_repository = deps.get_chat_repository(chat_db_strategy)
+    await chat_db_strategy.aensure_indexes() # 세션별 최근 대화 조회용 인덱스
+    chat_repository = deps.get_chat_repository(chat_db_strategy, deps.get_session_history_cache())
     embedding_service = await deps.get_embedding_service(embedding_strategy)
 
 
-    retriever = await deps.get_document_retriever(vector_repository, bm25_manager)
-    cache_strategy = deps.get_cache_strategy(cache, embedding_strategy)
+    retrieval_sources = await deps.get_retrieval_sources(vector_repository, bm25_manager)
+    retriever = await deps.get_document_retriever(
+        sources=retrieval_sources,
+        fusion_strategy=deps.get_fusion_strategy(),
+        retrieval_cache=retrieval_cache,
+    )
+    corpus_version = deps.get_corpus_version(cache)
+    cache_strategy = await deps.get_cache_strategy(cache, embedding_strategy, corpus_version)
+    # 대화 기록/캐시 저장을 응답 후 일괄 처리하는 write-behind 큐 (비활성화 시 None)
+    write_queue = deps.create_write_queue(chat_repository, cache_strategy)
+    # 참조 문서 피드백을 모았다가 벡터 DB에 일괄 반영하는 버퍼 (비활성화 시 None)
+    feedback_buffer = deps.create_feedback_buffer(cache, vector_repository)
 
 
     # 3. 캐싱된 가벼운 객체들도 가져오기
@@ -44,13 +90,21 @@ async def lifespan(app: FastAPI):
 
     # 4. 최종 서비스 객체들 생성 및 app.state에 저장
     app.state.bm25_manager = bm25_manager
+    app.state.index_version = index_version
+    app.state.retrieval_cache = retrieval_cache
+    app.state.write_queue = write_queue
+    app.state.feedback_buffer = feedback_buffer
 
     app.state.rag_service = await deps.get_rag_service(
         chunk_service=chunk_service,
         embedding_service=embedding_service,
         data_processor=data_processor,
         vector_repository=vector_repository,
+        index_version=index_version,
+        corpus_version=corpus_version,
     )
+    # 문서 수집을 백그라운드 작업으로 실행하고 진행 상황을 Redis에 기록하는 관리자
+    app.state.ingestion_job_manager = deps.create_ingestion_job_manager(cache, app.state.rag_service, bm25_manager)
     app.state.chat_service = await deps.get_chat_service(
         retriever=retriever,
         prompt=prompt,
@@ -58,9 +112,41 @@ async def lifespan(app: FastAPI):
         chat_repository=chat_repository,
         vector_repository=vector_repository,
         cache_strategy=cache_strategy,
+        embedding_strategy=embedding_strategy,
+        single_flight=deps.get_single_flight(cache),
+        write_queue=write_queue,
+        feedback_buffer=feedback_buffer,
     )
 
     logger.info("--- ✅ 싱글톤 객체 생성 완료 ---")
+
+    # 5. 백그라운드 작업 시작
+    await cache_strategy.start()
+    if write_queue is not None:
+        await write_queue.start() # 이전 실행에서 스풀된 대화 기록을 먼저 재저장
+    if feedback_buffer is not None:
+        await feedback_buffer.start()
+    await app.state.ingestion_job_manager.start() # 이전 실행에서 끝나지 않은 수집 작업도 이어서 실행
+    cache_gc_task = asyncio.create_task(_cache_gc_loop(cache_strategy, settings.SEMANTIC_CACHE_GC_INTERVAL))
+    index_refresh_task = asyncio.create_task(
+        _index_refresh_loop(vector_repository, bm25_manager, settings.INDEX_REFRESH_INTERVAL)
+    )
+
     yield
     # ---  애플리케이션 종료 시 실행 ---
-    logger.info("--- 애플리케이션 종료 ---")
\ No newline at end of file
+    logger.info("--- 애플리케이션 종료 ---")
+    cache_gc_task.cancel()
+    index_refresh_task.cancel()
+    with suppress(asyncio.CancelledError):
+        await cache_gc_task
+    with suppress(asyncio.CancelledError):
+        await index_refresh_task
+    await app.state.ingestion_job_manager.aclose() # 실행 중인 수집 작업은 대기열에 남아 다음 시작 시 재개
+    if write_queue is not None:
+        await write_queue.aclose() # 남은 쓰기 작업 저장 (DB/Redis 연결을 닫기 전에)
+    if feedback_buffer is not None:
+        await feedback_buffer.aclose() # 남은 피드백 반영
+    chunk_service.chunk_strategy.close() # 청킹 프로세스 풀 종료
+    await cache_strategy.aclose()
+    await chat_db_strategy.aclose()
+    await cache.aclose()
\ No newline at end of file
@@ -1,6 +1,10 @@
 # routes/chat.py
-from fastapi import APIRouter, Depends, Request
+import json
+from typing import AsyncIterator, Optional
+
+from fastapi import APIRouter, Depends, Request, Query, HTTPException
 from fastapi.logger import logger
+from fastapi.responses import StreamingResponse
 
 from api_model.ChatDTO import RequestMessageDTO, RequestFeedbackDTO
 from api_model.response_models import SuccessResponse
@@ -38,6 +42,47 @@ async def chat_message(
         error_detail = ErrorDetail(reason="채팅 처리 중 오류가 발생했습니다.")
         return ErrorResponse(error=error_detail)
 
+@chat_router.post("/message/stream")
+async def chat_message_stream(
+    message_data: RequestMessageDTO,
+    request : Request,
+    chat_service: ChatService = Depends(get_singleton_chat_service)
+):
+    """
+    채팅 메세지를 받아 AI의 응답을 Server-Sent Events(SSE)로 스트리밍합니다.
+
+    답변 토큰은 `token` 이벤트로 생성되는 즉시 전송되며, 마지막 `done` 이벤트에 피드백에 사용할 `chat_id`가 담깁니다.
+    처리 중 오류가 발생하면 `error` 이벤트를 전송하고 스트림을 종료합니다.
+
+    Args:
+        message_data (RequestMessageDTO): 사용자가 전송하는 메세지입니다.
+        request (Request): 사용자의 IP를 로그에 저장하기 위한 용도입니다.
+        chat_service (ChatService): 채팅 관련 로직을 처리하는 객체, Depends를 통해 의존성 주입을 받습니다.
+
+    Returns:
+        StreamingResponse: `text/event-stream` 형식의 응답.
+    """
+    logger.info(f"Client IP: {request.client.host}")
+
+    async def event_stream() -> AsyncIterator[str]:
+        try:
+            async for event in chat_service.astream(question=message_data.message, session_id=message_data.sessionId):
+                yield _format_sse(event["event"], event["data"])
+        except Exception as e:
+            # 스트림이 시작된 뒤에는 상태 코드를 바꿀 수 없으므로 오류를 이벤트로 전달
+            logger.error(f"스트리밍 채팅 처리 중 오류: {e}")
+            yield _format_sse("error", {"message": "채팅 처리 중 오류가 발생했습니다."})
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},  # 프록시 버퍼링 방지
+    )
+
+def _format_sse(event: str, data: dict) -> str:
+    """이벤트 이름과 데이터를 SSE 메시지 형식으로 변환합니다."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
 @chat_router.post("/feedback", response_model=SuccessResponse)
 async def chat_feedback(
     message_data: RequestFeedbackDTO,
@@ -55,7 +100,7 @@ async def chat_feedback(
         SuccessResponse | ErrorResponse: 피드백 성공 여부를 반환합니다.
 
     """
-    is_success = chat_service.feedback(
+    is_success = await chat_service.feedback(
         chat_id=message_data.chatId,
         is_good=message_data.isGood
     )
@@ -63,4 +108,48 @@ async def chat_feedback(
         return SuccessResponse(result={"message": "피드백이 성공적으로 업데이트되었습니다."})
     else:
         error_detail = ErrorDetail(reason="피드백을 처리하는 중 서버 내부 오류가 발생했습니다.")
-        return ErrorResponse(error=error_detail)
\ No newline at end of file
+        return ErrorResponse(error=error_detail)
+
+@chat_router.get("/history", response_model=SuccessResponse)
+async def chat_history(
+    sessionId: str,
+    limit: int = Query(20, ge=1, le=100),
+    before: Optional[str] = None,
+    chat_service: ChatService = Depends(get_singleton_chat_service)
+):
+    """
+    세션의 최근 대화를 최신 페이지부터 커서 기반으로 조회합니다.
+
+    Args:
+        sessionId (str): 조회할 대화 세션 ID.
+        limit (int): 한 페이지에 가져올 대화 수 (1~100).
+        before (Optional[str]): 이전 페이지 커서. 이전 응답의 `next_cursor` 값을 그대로 전달합니다.
+        chat_service (ChatService): 대화 기록 조회 로직을 담고 있는 서비스 객체. 의존성 주입(Depends)을 통해 제공됩니다.
+
+    Returns:
+        SuccessResponse: 시간순 대화 리스트(`turns`)와 다음 페이지 커서(`next_cursor`)를 담아 반환합니다.
+
+    Raises:
+        HTTPException (status_code=400): 커서 형식이 올바르지 않은 경우 발생합니다.
+    """
+    try:
+        result = await chat_service.get_history(session_id=sessionId, limit=limit, before=before)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="올바르지 않은 커서입니다.")
+    return SuccessResponse(result=result)
+
+@chat_router.get("/cache/stats", response_model=SuccessResponse)
+async def chat_cache_stats(
+    chat_service: ChatService = Depends(get_singleton_chat_service)
+):
+    """
+    시맨틱 캐시의 현재 크기, 제거율, 적중률 등 통계를 반환합니다.
+
+    Args:
+        chat_service (ChatService): 캐시 전략을 가지고 있는 서비스 객체. 의존성 주입(Depends)을 통해 제공됩니다.
+
+    Returns:
+        SuccessResponse: 캐시 통계를 담아 반환합니다.
+    """
+    stats = await chat_service.cache_strategy.get_stats()
+    return SuccessResponse(result=stats)
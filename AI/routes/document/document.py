@@ -1,15 +1,17 @@
 import os
-import shutil
-import tempfile
+from itertools import chain
+from urllib.parse import quote
 
-from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, BackgroundTasks
-from fastapi.logger import logger
-from starlette.responses import FileResponse
+from fastapi import APIRouter, Depends, UploadFile, File, HTTPException
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import StreamingResponse
 
 from api_model.response_models import SuccessResponse
-from container.dependency import get_singleton_rag_service, get_data_processor, get_bm25_manager
+from container.dependency import get_data_processor, get_ingestion_job_manager, get_singleton_rag_service, get_bm25_manager
 from service.data.data_processor import DataProcessor
+from service.ingestion.ingestion_job_manager import IngestionJobManager
 from service.rag_service import RAGService
+from service.retriever.bm25_manager import BM25Manager
 
 document_router = APIRouter(prefix="/documents", tags=["documents"])
 
@@ -18,86 +20,117 @@ document_router = APIRouter(prefix="/documents", tags=["documents"])
 async def process_documents(
         qa_file: UploadFile = File(None),
         paragraph_file: UploadFile = File(None),
-        rag_service: RAGService = Depends(get_singleton_rag_service),
-        bm25_retriever = Depends(get_bm25_manager),
+        job_manager: IngestionJobManager = Depends(get_ingestion_job_manager),
+        incremental: bool = True,
 ):
     """
-    RAG 시 참고할 데이터를 입력받습니다. 두 파일 모두 필수는 아니지만, 적어도 하나의 파일은 존재해야 합니다.
+    RAG 시 참고할 데이터를 입력받아 문서 수집 작업을 등록합니다. 두 파일 모두 필수는 아니지만, 적어도 하나의 파일은 존재해야 합니다.
+    수집(파싱, 청킹, 임베딩, 저장)은 백그라운드에서 실행되며, 진행 상황은 `/documents/jobs/{job_id}`로 조회합니다.
     TODO 만약 같은 파일이 들어올 시 이전 데이터 자동으로 덮어씌우기 혹은 가장 최신 파일 이용할 수 있도록 하기
 
     Args:
         qa_file (UploadFile): 질의응답 파일 (질문 / 대답 이라는 열이 존재해야함), jsonl 형식의 파일로만 받을 수 있음, 필수 파라미터 아님
         paragraph_file (UploadFile): txt파일임. 한줄 띄어져 있으면 (\n\n) 다른 문단으로 간주하는 로직이 들어있음, 필수 파라미터 아님
-        rag_service (RAGService): 파일 처리 관련 로직이 들어있는 객체, dependency를 통해 주입받음
+        job_manager (IngestionJobManager): 수집 작업을 등록하고 실행하는 객체, dependency를 통해 주입받음
+        incremental (bool): True(기본값)이면 바뀐 청크만 임베딩하는 증분 수집, False이면 새 컬렉션 버전(`langchain_v<시각>`)에 전체를 다시 임베딩한 뒤
+            검증을 거쳐 벡터 DB와 BM25를 함께 교체합니다. 수집 중에도 검색은 기존 컬렉션을 그대로 사용하며, 교체 후 문제가 있으면 `/documents/rollback`으로 직전 버전으로 되돌릴 수 있습니다.
 
     Returns:
 
-        SuccessResponse | ErrorResponse: 피드백 성공 여부를 반환합니다.
+        SuccessResponse | ErrorResponse: 등록된 작업 ID와 상태를 반환합니다.
 
     """
-    # 파일 내용 읽기
-    qa_content_str = None
-    paragraph_content_str = None
-
-    if qa_file:
-        if not qa_file.filename.endswith(('.jsonl')):
-            raise HTTPException(status_code=400, detail="QA 파일은 .jsonl 형식이어야 합니다.")
+    has_qa = bool(qa_file and qa_file.size != 0)
+    has_paragraph = bool(paragraph_file and paragraph_file.size != 0)
 
-        qa_content_bytes = await qa_file.read()
-        qa_content_str = qa_content_bytes.decode('utf-8')
-        logger.info(f"QA 파일 읽기 완료: {qa_file.filename}")
+    if has_qa and not qa_file.filename.endswith(('.jsonl')):
+        raise HTTPException(status_code=400, detail="QA 파일은 .jsonl 형식이어야 합니다.")
 
-    if paragraph_file:
-        if not paragraph_file.filename.endswith(('.txt', '.md')):
-            raise HTTPException(status_code=400, detail="문단 파일은 .txt 형식이어야 합니다.")
-
-        paragraph_content_bytes = await paragraph_file.read()
-        paragraph_content_str = paragraph_content_bytes.decode('utf-8')
-        logger.info(f"문단 파일 읽기 완료: {paragraph_file.filename}")
+    if has_paragraph and not paragraph_file.filename.endswith(('.txt', '.md')):
+        raise HTTPException(status_code=400, detail="문단 파일은 .txt 형식이어야 합니다.")
 
     # 최소 하나의 파일은 제공되어야 함
-    if not qa_content_str and not paragraph_content_str:
+    if not has_qa and not has_paragraph:
         raise HTTPException(status_code=400, detail="최소 하나의 파일을 제공해야 합니다.")
 
-    # RAG 서비스를 통한 문서 처리
-    rag_service.process(
-        paragraph_data=paragraph_content_str,
-        paragraph_file_name = paragraph_file.filename,
-        qa_data=qa_content_str,
-        qa_file_name = qa_file.filename
+    # 업로드 파일을 작업 디렉터리에 저장하고 바로 반환합니다. (BM25 갱신까지 백그라운드 작업에서 처리)
+    job_id = await job_manager.submit(
+        paragraph_file=paragraph_file.file if has_paragraph else None,
+        paragraph_file_name=paragraph_file.filename if has_paragraph else None,
+        qa_file=qa_file.file if has_qa else None,
+        qa_file_name=qa_file.filename if has_qa else None,
+        incremental=incremental,
     )
 
-    # BM25객체 새로운 문서로 업데이트
-    await bm25_retriever.update_retriever()
+    return SuccessResponse(message="문서 수집 작업이 등록되었습니다.", result={"job_id": job_id, "status": "queued"})
+
 
-    return SuccessResponse()
+@document_router.get("/jobs/{job_id}")
+async def get_ingestion_job(
+        job_id: str,
+        job_manager: IngestionJobManager = Depends(get_ingestion_job_manager),
+):
+    """
+    문서 수집 작업의 진행 상황을 조회합니다.
 
-def cleanup_files(*paths):
-    """백그라운드에서 임시 파일들을 삭제하는 함수"""
-    for path in paths:
-        if path and os.path.exists(path):
-            os.remove(path)
+    Args:
+        job_id (str): `/documents/process`에서 반환된 작업 ID.
+        job_manager (IngestionJobManager): 수집 작업 상태를 조회하는 객체, dependency를 통해 주입받음
+
+    Returns:
+        SuccessResponse: 상태(queued/running/completed/failed), 단계, 전체/처리한 문서 수, 처리한 청크 수,
+                         추가/유지/삭제된 청크 수, 초당 처리 청크 수, 오류 메시지.
+    """
+    job = await job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="수집 작업을 찾을 수 없습니다.")
+    return SuccessResponse(result=job)
+
+@document_router.post("/rollback")
+async def rollback_documents(
+        rag_service: RAGService = Depends(get_singleton_rag_service),
+        bm25_manager: BM25Manager = Depends(get_bm25_manager),
+):
+    """
+    마지막 전체 재수집 이전의 컬렉션 버전으로 되돌립니다. 벡터 DB와 BM25 인덱스를 함께 교체합니다.
+    다른 워커는 컬렉션 버전 확인 주기(INDEX_REFRESH_INTERVAL)마다 되돌린 버전을 사용하게 됩니다.
+
+    Args:
+        rag_service (RAGService): 컬렉션 버전을 교체하는 객체, dependency를 통해 주입받음
+        bm25_manager (BM25Manager): BM25 인덱스를 교체하는 객체, dependency를 통해 주입받음
+
+    Returns:
+        SuccessResponse: 다시 사용하게 된 컬렉션 버전.
+
+    Raises:
+        HTTPException (status_code=409): 되돌릴 이전 버전이 없는 경우 발생합니다.
+    """
+    try:
+        version = await rag_service.rollback()
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    await bm25_manager.rollback(version)
+    return SuccessResponse(message="이전 컬렉션 버전으로 되돌렸습니다.", result={"version": version})
 
 
 @document_router.post("/upload", summary="QA 파일을 JSONL로 변환하여 다운로드")
 async def to_jsonl(
         file: UploadFile = File(..., description=".xlsx 또는 .csv 형식의 QA 파일"),
-        background_tasks: BackgroundTasks = None,
         data_processor: DataProcessor = Depends(get_data_processor),
 ):
     """
-    TODO 추후 리팩토링 예정, 임시파일 사용이 아닌 스트리밍 방식으로 수정 예정
     업로드된 QA 파일(.xlsx, .csv)을 JSONL 형식으로 변환하여 사용자에게 다운로드합니다.
 
-    이 엔드포인트는 파일을 서버에 임시 저장하고 변환한 후, 응답이 완료되면 백그라운드에서 임시 파일을 자동으로 삭제합니다.
+    업로드 파일을 임시 파일로 복사하지 않고 청크 단위로 읽어 변환하며, 변환된 JSONL은 StreamingResponse로 바로 전송합니다.
+    필수 컬럼, CSV 인코딩 등 형식 오류는 첫 청크를 변환할 때 확인하므로 응답을 시작하기 전에 400으로 반환됩니다.
+    응답을 시작한 뒤(첫 청크 이후)에 읽기 오류가 나면 오류를 기록하고 전송을 중단하므로, 받은 파일이 끝까지 변환되지 않았을 수 있습니다.
 
     Args:
         file (UploadFile): 사용자가 업로드한 .xlsx 또는 .csv 형식의 QA 파일.
-        background_tasks (BackgroundTasks): FastAPI의 의존성 주입 기능. 응답 전송 후 임시 파일을 삭제하는 등의 후처리 작업을 수행합니다.
         data_processor (DataProcessor): 파일 변환 로직을 실제로 수행하는 서비스 객체. 의존성 주입을 통해 제공됩니다.
 
     Returns:
-        FileResponse: 변환된 .jsonl 파일을 담고 있는 스트리밍 응답. 브라우저에서 파일 다운로드를 트리거합니다.
+        StreamingResponse: 변환된 .jsonl 파일을 담고 있는 스트리밍 응답. 브라우저에서 파일 다운로드를 트리거합니다.
 
     Raises:
         HTTPException (status_code=400): 지원하지 않는 파일 형식이거나 파일 내용에 문제가 있어 처리할 수 없는 경우 발생합니다.
@@ -110,40 +143,19 @@ async def to_jsonl(
             detail="잘못된 파일 형식입니다. .xlsx 또는 .csv 파일만 업로드할 수 있습니다."
         )
 
-    tmp_input_file_path = None
-    tmp_output_file_path = None
-
+    chunks = data_processor.iter_qa_jsonl_chunks(file.file, file_extension)
     try:
-        # 1. 업로드된 파일을 서버에 임시 저장
-        with tempfile.NamedTemporaryFile(delete=False, suffix=file_extension) as tmp_input_file:
-            shutil.copyfileobj(file.file, tmp_input_file)
-            tmp_input_file_path = tmp_input_file.name
-
-        # 2. 출력 파일 경로 설정
-        tmp_output_file_path = f"{tmp_input_file_path}.jsonl"
-
-        # 3. 데이터 처리 함수 호출
-        data_processor.qa_to_jsonl(
-            input_file_path=tmp_input_file_path,
-            output_file_path=tmp_output_file_path
-        )
-
-        # 4. 응답이 완료된 후 임시 파일들을 삭제하도록 백그라운드 작업 추가
-        background_tasks.add_task(cleanup_files, tmp_input_file_path, tmp_output_file_path)
-
-        # 5. 생성된 파일을 FileResponse로 반환하여 다운로드
-        download_filename = f"{os.path.splitext(file.filename)[0]}.jsonl"
-        return FileResponse(
-            path=tmp_output_file_path,
-            filename=download_filename,
-            media_type='application/octet-stream'  # 브라우저가 파일 다운로드로 인식하도록 설정
-        )
-
-    except (FileNotFoundError, ValueError, RuntimeError) as e:
-        # 오류 발생 시 생성되었을 수 있는 임시 파일 정리
-        cleanup_files(tmp_input_file_path, tmp_output_file_path)
+        # 첫 청크를 미리 변환하여 형식 오류를 응답 전에 확인 (파일 읽기는 스레드에서 실행)
+        first_chunk = await run_in_threadpool(next, chunks, "")
+    except (ValueError, RuntimeError) as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        # 예상치 못한 오류 발생 시에도 임시 파일 정리
-        cleanup_files(tmp_input_file_path, tmp_output_file_path)
-        raise HTTPException(status_code=500, detail=f"서버 내부 오류가 발생했습니다: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"서버 내부 오류가 발생했습니다: {str(e)}")
+
+    # 나머지 청크는 StreamingResponse가 스레드에서 순회하며 전송 (업로드 파일은 응답 전송이 끝난 뒤 닫힘)
+    download_filename = f"{os.path.splitext(file.filename)[0]}.jsonl"
+    return StreamingResponse(
+        chain([first_chunk], chunks),
+        media_type='application/octet-stream',  # 브라우저가 파일 다운로드로 인식하도록 설정
+        headers={"Content-Disposition": f"attachment; filename*=utf-8''{quote(download_filename)}"},
+    )
@@ -1,6 +1,7 @@
 from abc import ABC, abstractmethod
 from typing import Optional, Dict
 
+from service.embedding.query_embedding import QueryEmbedding
 
 class CacheStrategy(ABC):
     """
@@ -8,11 +9,12 @@ class CacheStrategy(ABC):
     캐시를 사용하는 로직은 모두 이 클래스를 상속받아야 사용 가능합니다.
     """
     @abstractmethod
-    async def get_cached_answer(self, quesion:str) -> Optional[Dict[str, str | float]]:
+    async def get_cached_answer(self, quesion:str, query_embedding: Optional[QueryEmbedding] = None) -> Optional[Dict[str, str | float]]:
         """
 
         Args:
             quesion (str): 사용자의 질문
+            query_embedding (Optional[QueryEmbedding]): 요청 단위로 공유되는 질문 임베딩 컨텍스트. 없으면 내부에서 생성합니다.
 
         Returns:
             - Cache Hit: {"answer": str, 'question': str}
@@ -21,14 +23,43 @@ class CacheStrategy(ABC):
     pass
 
     @abstractmethod
-    async def add_to_cache(self, question: str, answer: str) -> None:
+    async def add_to_cache(self, question: str, answer: str, query_embedding: Optional[QueryEmbedding] = None) -> None:
         """
         새로운 질문과 답변을 캐시에 추가합니다.
 
         Args:
             question (str): 사용자 질문
             answer (str): LLM이 생성한 답변
+            query_embedding (Optional[QueryEmbedding]): 조회 시 계산해 둔 질문 임베딩 컨텍스트. 없으면 내부에서 생성합니다.
         """
         pass
 
+    async def get_stats(self) -> Dict[str, int | float]:
+        """
+        캐시 크기와 적중률 등 통계를 반환합니다. 통계를 제공하지 않는 구현체는 빈 딕셔너리를 반환합니다.
+
+        Returns:
+            Dict[str, int | float]: 캐시 통계.
+        """
+        return {}
+
+    async def collect_garbage(self) -> int:
+        """
+        더 이상 유효하지 않은 캐시 항목(예: 이전 문서로 생성된 답변)을 정리합니다. 정리할 것이 없는 구현체는 0을 반환합니다.
+
+        Returns:
+            int: 정리한 항목 수.
+        """
+        return 0
+
+    async def start(self):
+        """
+        캐시에 필요한 백그라운드 작업(예: 무효화 알림 구독)을 시작합니다. 필요 없는 구현체는 아무것도 하지 않습니다.
+        """
+        pass
 
+    async def aclose(self):
+        """
+        `start`에서 시작한 백그라운드 작업을 정리합니다. 애플리케이션 종료 시 호출됩니다.
+        """
+        pass
@@ -0,0 +1,38 @@
+from redis.asyncio import Redis
+
+
+class CorpusVersion:
+    """
+    수집된 문서 전체(코퍼스)의 버전을 Redis에 보관하는 카운터입니다.
+
+    시맨틱 캐시의 각 항목은 답변을 생성할 당시의 코퍼스 버전으로 태그되며, 캐시 조회 시 현재 버전의 항목만 검색합니다.
+    문서를 다시 수집하면 버전을 올리므로 이전 문서로 생성된 답변은 Redis를 비우지 않아도 더 이상 사용되지 않습니다.
+    버전은 Redis에 있으므로 모든 워커가 같은 값을 봅니다.
+    버전이 바뀌면 `channel`로 새 버전을 발행하여, 프로세스 내부 캐시를 가진 워커가 즉시 비울 수 있도록 합니다.
+    """
+
+    def __init__(self, redis_client: Redis, key: str = "rag_corpus_version"):
+        """
+        Args:
+            redis_client (Redis): 버전을 저장할 비동기 Redis 클라이언트.
+            key (str): 버전을 저장할 Redis 키.
+        """
+        self.r = redis_client
+        self.key = key
+        self.channel = f"{key}:changed"
+
+    async def get(self) -> int:
+        """현재 코퍼스 버전을 반환합니다. 한 번도 올린 적이 없으면 0입니다."""
+        value = await self.r.get(self.key)
+        return int(value) if value is not None else 0
+
+    async def bump(self) -> int:
+        """
+        코퍼스 버전을 1 올립니다.
+
+        Returns:
+            int: 변경된 코퍼스 버전.
+        """
+        version = await self.r.incr(self.key)
+        await self.r.publish(self.channel, version)
+        return version
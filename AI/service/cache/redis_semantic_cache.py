@@ -1,84 +1,456 @@
-import numpy as np
-import redis
+import hashlib
+import json
+import time
+
+import redis.asyncio as redis
 from fastapi.logger import logger
 from langchain_core.embeddings import Embeddings
 from redis.commands.search.query import Query
 
 from service.cache.cache_strategy import CacheStrategy
+from service.cache.corpus_version import CorpusVersion
+from service.embedding.query_embedding import QueryEmbedding
+from utils.text_normalizer import normalize_question
+
+# 항목이 아직 남아 있을 때만 적중 기록을 갱신하는 Lua 스크립트 (조회 직후 제거된 항목의 빈 해시가 다시 생기지 않도록)
+# KEYS: 항목 키, last_hit 정렬 집합, hit_count 정렬 집합, (선택) 완전 일치 키 / ARGV: 현재 시각, TTL, 적중 횟수
+_RECORD_HIT_SCRIPT = """
+if redis.call('exists', KEYS[1]) == 0 then
+    return 0
+end
+redis.call('hincrby', KEYS[1], 'hits', ARGV[3])
+redis.call('hset', KEYS[1], 'last_hit', ARGV[1])
+redis.call('expire', KEYS[1], ARGV[2])
+redis.call('zadd', KEYS[2], 'XX', ARGV[1], KEYS[1])
+redis.call('zadd', KEYS[3], 'XX', 'INCR', ARGV[3], KEYS[1])
+if KEYS[4] then
+    redis.call('expire', KEYS[4], ARGV[2])
+end
+return 1
+"""
 
 
 class RedisSemanticCache(CacheStrategy):
     """
     Redis의 벡터 검색을 이용한 시맨틱 캐시 전략 구현체입니다.
+
+    캐시 용량은 최대 항목 수와 최대 바이트 수로 제한되며, 각 항목은 마지막 적중(또는 저장) 후 TTL이 지나면 만료됩니다.
+    조회 시 적중 횟수와 마지막 적중 시각을 기록해 두고, 용량을 넘으면 정책(`last_hit`: 가장 오래 적중하지 않은 항목,
+    `hit_count`: 적중 횟수가 가장 적은 항목)에 따라 항목을 제거합니다.
+    거의 같은 질문이 이미 캐시에 있으면 새로 저장하지 않습니다.
+
+    CorpusVersion이 주어지면 각 항목을 저장 당시의 코퍼스 버전으로 태그하고, 조회 시 현재 버전의 항목만 검색합니다.
+    이전 버전의 항목은 `collect_garbage`로 백그라운드에서 정리합니다.
+
+    KNN 검색 앞에는 정규화된 질문의 해시를 키로 하는 완전 일치 단계가 있어,
+    이전과 같은 질문은 임베딩 계산과 벡터 검색 없이 바로 응답합니다.
     """
 
-    def __init__(self, redis_client: redis.Redis, embedding_model: Embeddings, embedding_dim: int, similarity_threshold:float):
+    def __init__(
+            self,
+            redis_client: redis.Redis,
+            embedding_model: Embeddings,
+            embedding_dim: int,
+            similarity_threshold: float,
+            max_entries: int = 10000,
+            max_bytes: int = 256 * 1024 * 1024,
+            ttl_seconds: int = 60 * 60 * 24 * 7,
+            eviction_policy: str = "last_hit",
+            dedupe_threshold: float | None = None,
+            corpus_version: CorpusVersion | None = None,
+    ):
+        """
+        Args:
+            redis_client (redis.Redis): 비동기 Redis 클라이언트.
+            embedding_model (Embeddings): 질문 임베딩에 사용할 모델.
+            embedding_dim (int): 임베딩 차원 수.
+            similarity_threshold (float): 캐시 적중으로 판단할 코사인 유사도 임계값.
+            max_entries (int): 캐시에 보관할 최대 항목 수.
+            max_bytes (int): 캐시 항목(질문, 답변, 벡터)의 최대 총 바이트 수.
+            ttl_seconds (int): 항목의 만료 시간(초). 적중할 때마다 다시 연장됩니다.
+            eviction_policy (str): 용량 초과 시 제거 기준. "last_hit" | "hit_count"
+            dedupe_threshold (float | None): 이 유사도 이상인 항목이 이미 있으면 저장하지 않습니다. 없으면 similarity_threshold를 사용합니다.
+            corpus_version (CorpusVersion | None): 항목을 태그할 코퍼스 버전. 없으면 버전 구분 없이 모든 항목을 검색합니다.
+        """
+        if eviction_policy not in ("last_hit", "hit_count"):
+            raise ValueError(f"지원하지 않는 캐시 제거 정책입니다: {eviction_policy}")
+
         self.r = redis_client
         self.model = embedding_model
         self.embedding_dim = embedding_dim
         self.index_name = "llm_rag_cache_idx" # 벡터 검색용 인덱스 이름
         self.doc_prefix = "rag_cache:" # 캐시 데이터를 저장할 때 사용할 키의 접두어
+        self.exact_prefix = "rag_exact:" # 완전 일치 캐시 키의 접두어 (rag_exact:{코퍼스 버전}:{질문 해시})
         self.similarity_threshold = similarity_threshold or 0.95 # 코사인 유사도 임계값
+        self.dedupe_threshold = dedupe_threshold or self.similarity_threshold
 
-    async def get_cached_answer(self, question: str) -> dict[str, float | str] | None:
-        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.eviction_policy = eviction_policy
+        self.corpus_version = corpus_version
 
-        Args:
-            question (str): 사용자의 질문
+        # 용량 관리용 키 (인덱스 접두어와 겹치지 않도록 별도 접두어 사용)
+        meta_prefix = "rag_cache_meta:"
+        self.last_hit_key = f"{meta_prefix}last_hit"     # ZSET: 캐시 키 -> 마지막 적중(또는 저장) 시각
+        self.hit_count_key = f"{meta_prefix}hit_count"   # ZSET: 캐시 키 -> 적중 횟수
+        self.sizes_key = f"{meta_prefix}sizes"           # HASH: 캐시 키 -> 항목 바이트 수
+        self.bytes_key = f"{meta_prefix}bytes"           # STRING: 전체 항목 바이트 수
+        self.evictions_key = f"{meta_prefix}evictions"   # STRING: 용량 초과로 제거된 항목 수
+        self.expired_key = f"{meta_prefix}expired"       # STRING: TTL 만료로 정리된 항목 수
+        self.inserts_key = f"{meta_prefix}inserts"       # STRING: 저장된 항목 수
+        self.stale_key = f"{meta_prefix}stale"           # STRING: 이전 코퍼스 버전이라 정리된 항목 수
+        self.invalidation_channel = f"{meta_prefix}invalidated"  # PUB/SUB: 삭제된 캐시 키 목록 알림 (로컬 캐시 동기화용)
 
-        Returns:
-            - Cache Hit: 이전 AI의 답변
-            - Cache Miss: None
+        # 워커 단위 카운터
+        self.exact_hits = 0
+        self.hits = 0
+        self.misses = 0
+        self.skipped_duplicates = 0
 
-        """
-        question_embedding = self.model.embed_query(question) # 사용자의 질문을 벡터화
-        question_vector = np.array(question_embedding, dtype=np.float32).tobytes() # 벡터를 바이트 데이터 형태로 변환
+    async def _current_version(self) -> int | None:
+        """현재 코퍼스 버전을 반환합니다. 버전 관리를 사용하지 않으면 None."""
+        if self.corpus_version is None:
+            return None
+        return await self.corpus_version.get()
+
+    async def _search_nearest(self, question_vector: bytes, version: int | None = None):
+        """질문 벡터와 가장 가까운 캐시 항목 하나와 그 유사도를 반환합니다. 없으면 (None, 0.0)."""
+        # 코퍼스 버전이 주어지면 해당 버전의 항목 중에서만 KNN 검색 (TAG 사전 필터)
+        base_filter = "*" if version is None else f"(@corpus_version:{{{version}}})"
 
         # 벡터 명령어 검색
         q = (
-            Query("*=>[KNN 1 @question_vector $vec_param AS vector_score]")
+            Query(f"{base_filter}=>[KNN 1 @question_vector $vec_param AS vector_score]")
             .sort_by("vector_score")
             .return_fields("question", "answer", "vector_score")
             .dialect(2)
         )
-        # 쿼리 뜻: 모든 문서(*)를 대상으로 question_vector 필드에서 KNN알고리즘을 통해 가장 가까운 1개의 이웃을 찾는다.
+        # 쿼리 뜻: 모든 문서(*) 또는 현재 코퍼스 버전의 문서를 대상으로 question_vector 필드에서 KNN알고리즘을 통해 가장 가까운 1개의 이웃을 찾는다.
         # (참고)
         # $vec_param은 실제 검색할 벡터값을 의미한다.
 
         params = {"vec_param": question_vector}
         # vec_param의 자리에 질문 벡터를 삽입한다.
 
+        results = await self.r.ft(self.index_name).search(q, query_params=params)
+        # llm_rag_cache_idx라는 이름의 인덱스를 사용하여 쿼리를 실행한 뒤 결과를 받는다.
+        if not results.docs:
+            return None, 0.0
+        most_similar = results.docs[0]
+        # 0에 가까울수록 유사한 것이기에(KNN알고리즘) 유사도로 변환하기 위해 1로 변환
+        return most_similar, 1 - float(most_similar.vector_score)
+
+    def _exact_key(self, question: str, version: int | None) -> str:
+        """코퍼스 버전과 정규화된 질문의 해시로 완전 일치 캐시 키를 생성합니다."""
+        question_hash = hashlib.sha256(normalize_question(question).encode("utf-8")).hexdigest()
+        return f"{self.exact_prefix}{version if version is not None else 0}:{question_hash}"
+
+    async def get_exact_answer(self, question: str) -> dict[str, float | str] | None:
+        """
+        정규화 기준으로 완전히 같은 질문의 답변을 조회합니다. 임베딩을 계산하지 않습니다.
+
+        Args:
+            question (str): 사용자의 질문
+
+        Returns:
+            - Cache Hit: 이전 AI의 답변
+            - Cache Miss: None
+        """
         try:
-            results = self.r.ft(self.index_name).search(q, query_params=params)
-            # llm_rag_cache_idx라는 이름의 인덱스를 사용하여 쿼리를 실행한 뒤 결과를 받는다.
-            if results.docs:
-                most_similar = results.docs[0]
-                score = 1 - float(most_similar.vector_score)
-                # 0에 가까울수록 유사한 것이기에(KNN알고리즘) 유사도로 변환하기 위해 1로 변환
-
-                if score > self.similarity_threshold:
-                    logger.info(f"✅ Cache Hit! (유사도: {score:.4f})")
-                    return {
-                        "answer": most_similar.answer,
-                        "original_question": most_similar.question,
-                        "score": score
-                    }
+            exact_key = self._exact_key(question, await self._current_version())
+            cached = await self.r.get(exact_key)
+            if cached is None:
+                return None
+            entry = json.loads(cached)
+            logger.info("✅ Exact Cache Hit!")
+            self.exact_hits += 1
+            try:
+                await self._record_hit(entry["key"], exact_key)
+            except Exception as e:
+                logger.info(f"Redis 캐시 적중 기록 오류: {e}")
+            return {
+                "answer": entry["answer"],
+                "original_question": entry["question"],
+                "score": 1.0,
+                "key": entry["key"],
+                "tier": "exact",
+            }
+        except Exception as e:
+            logger.info(f"Redis 완전 일치 캐시 조회 오류: {e}")
+            return None
+
+    async def get_cached_answer(self, question: str, query_embedding: QueryEmbedding | None = None) -> dict[str, float | str] | None:
+        """
+        완전 일치 단계를 먼저 확인하고, 없으면 질문 임베딩으로 KNN 검색을 수행합니다.
+
+        Args:
+            question (str): 사용자의 질문
+            query_embedding (QueryEmbedding | None): 요청 단위로 공유되는 질문 임베딩. 이미 계산되어 있다면 재사용합니다.
+
+        Returns:
+            - Cache Hit: 이전 AI의 답변
+            - Cache Miss: None
+
+        """
+        exact = await self.get_exact_answer(question)
+        if exact is not None:
+            return exact
+        return await self.get_semantic_answer(question, query_embedding)
+
+    async def get_semantic_answer(self, question: str, query_embedding: QueryEmbedding | None = None) -> dict[str, float | str] | None:
+        """
+        질문 임베딩으로 KNN 검색을 수행하여 유사한 질문의 답변을 조회합니다. (완전 일치 단계는 확인하지 않음)
+
+        Args:
+            question (str): 사용자의 질문
+            query_embedding (QueryEmbedding | None): 요청 단위로 공유되는 질문 임베딩. 이미 계산되어 있다면 재사용합니다.
+
+        Returns:
+            - Cache Hit: 이전 AI의 답변
+            - Cache Miss: None
+        """
+        query_embedding = query_embedding or QueryEmbedding(question, self.model)
+        question_vector = await query_embedding.aget_bytes() # 사용자의 질문을 벡터화하여 바이트 데이터 형태로 변환
+
+        try:
+            most_similar, score = await self._search_nearest(question_vector, await self._current_version())
+            if most_similar is not None and score > self.similarity_threshold:
+                logger.info(f"✅ Cache Hit! (유사도: {score:.4f})")
+                self.hits += 1
+                try:
+                    await self._record_hit(most_similar.id)
+                except Exception as e:
+                    logger.info(f"Redis 캐시 적중 기록 오류: {e}")
+                return {
+                    "answer": most_similar.answer,
+                    "original_question": most_similar.question,
+                    "score": score,
+                    "key": most_similar.id,
+                    "tier": "semantic",
+                }
         except Exception as e:
             logger.info(f"Redis 캐시 검색 오류: {e}")
 
         logger.info("❌ Cache Miss!")
+        self.misses += 1
         return None
 
-    async def add_to_cache(self, question: str, answer: str):
-        question_embedding = self.model.embed_query(question)
-        question_vector = np.array(question_embedding, dtype=np.float32).tobytes()
+    async def _record_hit(self, key: str, exact_key: str | None = None):
+        """적중한 항목의 적중 횟수와 마지막 적중 시각을 기록하고 만료 시간을 연장합니다. (제거 정책에 사용)"""
+        keys = [key, self.last_hit_key, self.hit_count_key]
+        if exact_key is not None:
+            keys.append(exact_key)
+        await self.r.eval(_RECORD_HIT_SCRIPT, len(keys), *keys, time.time(), self.ttl_seconds, 1)
+
+    async def record_hits(self, hits: dict[str, int]):
+        """
+        Redis를 거치지 않고 응답한 적중(예: 프로세스 내부 캐시 적중)을 모아서 기록합니다.
+        자주 적중하는 항목이 제거 정책에서 적중하지 않은 항목으로 취급되지 않도록 합니다.
+
+        Args:
+            hits (dict[str, int]): 캐시 키 -> 적중 횟수.
+        """
+        if not hits:
+            return
+        now = time.time()
+        async with self.r.pipeline(transaction=False) as pipe:
+            for key, count in hits.items():
+                pipe.eval(_RECORD_HIT_SCRIPT, 3, key, self.last_hit_key, self.hit_count_key, now, self.ttl_seconds, count)
+            await pipe.execute()
+
+    async def add_to_cache(self, question: str, answer: str, query_embedding: QueryEmbedding | None = None):
+        query_embedding = query_embedding or QueryEmbedding(question, self.model)
+        question_vector = await query_embedding.aget_bytes()
+
+        # 답변이 생성된 시점의 코퍼스 버전으로 태그 (조회 시 현재 버전 항목만 검색됨)
+        version = await self._current_version()
+
+        # 동시 요청 등으로 거의 같은 질문이 이미 저장되어 있으면 중복 저장하지 않는다.
+        try:
+            nearest, score = await self._search_nearest(question_vector, version)
+            if nearest is not None and score >= self.dedupe_threshold:
+                self.skipped_duplicates += 1
+                logger.info(f"유사한 질문이 이미 캐시에 있어 저장하지 않습니다. (유사도: {score:.4f}, Key: {nearest.id})")
+                return
+        except Exception as e:
+            logger.info(f"Redis 캐시 중복 확인 오류: {e}")
 
-        key = f"{self.doc_prefix}{self.r.incr('rag_cache_id')}"
+        key = f"{self.doc_prefix}{await self.r.incr('rag_cache_id')}"
         # Redis의 rag_cache_id 키의 숫자를 1 증가시킨 뒤 그 결과를 가져온다.
+        now = time.time()
         item = {
             "question": question,
             "answer": answer,
-            "question_vector": question_vector
+            "question_vector": question_vector,
+            "hits": 0,
+            "created_at": now,
+            "last_hit": now,
+        }
+        if version is not None:
+            item["corpus_version"] = version
+        # 같은 질문은 임베딩 없이 찾을 수 있도록 완전 일치 키도 함께 저장 (시맨틱 항목이 제거되면 함께 제거)
+        exact_key = self._exact_key(question, version)
+        exact_value = json.dumps({"question": question, "answer": answer, "key": key}, ensure_ascii=False)
+        item["exact_key"] = exact_key
+        size = len(question.encode("utf-8")) + len(answer.encode("utf-8")) + len(question_vector) + len(exact_value.encode("utf-8"))
+
+        async with self.r.pipeline(transaction=True) as pipe:
+            pipe.hset(key, mapping=item)
+            pipe.expire(key, self.ttl_seconds)
+            pipe.set(exact_key, exact_value, ex=self.ttl_seconds)
+            pipe.zadd(self.last_hit_key, {key: now})
+            pipe.zadd(self.hit_count_key, {key: 0})
+            pipe.hset(self.sizes_key, key, size)
+            pipe.incrby(self.bytes_key, size)
+            pipe.incr(self.inserts_key)
+            await pipe.execute()
+        logger.info(f"새로운 Q&A를 Redis 캐시에 추가했습니다. (Key: {key})")
+
+        try:
+            await self._enforce_capacity()
+        except Exception as e:
+            logger.info(f"Redis 캐시 용량 정리 오류: {e}")
+
+    async def _remove_members(self, keys: list[str]) -> int:
+        """용량 관리용 자료구조에서 항목들을 제거하고 해당 항목의 바이트 수를 차감합니다. 제거한 바이트 수를 반환합니다."""
+        if not keys:
+            return 0
+        sizes = await self.r.hmget(self.sizes_key, keys)
+        freed = sum(int(size) for size in sizes if size is not None)
+        async with self.r.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.hget(key, "exact_key")
+            exact_keys = [exact_key for exact_key in await pipe.execute() if exact_key is not None]
+        async with self.r.pipeline(transaction=True) as pipe:
+            pipe.delete(*keys, *exact_keys)
+            pipe.zrem(self.last_hit_key, *keys)
+            pipe.zrem(self.hit_count_key, *keys)
+            pipe.hdel(self.sizes_key, *keys)
+            pipe.decrby(self.bytes_key, freed)
+            pipe.publish(self.invalidation_channel, json.dumps(keys))  # 다른 워커의 로컬 캐시에서도 제거하도록 알림
+            await pipe.execute()
+        return freed
+
+    async def get_vector(self, key: str) -> bytes | None:
+        """
+        캐시 항목에 저장된 질문 벡터를 반환합니다.
+
+        Args:
+            key (str): 캐시 항목의 키.
+
+        Returns:
+            bytes | None: float32로 직렬화된 질문 벡터. 항목이 없으면 None.
+        """
+        return await self.r.hget(key, "question_vector")
+
+    async def _prune_expired(self) -> int:
+        """
+        TTL로 만료된 항목을 용량 관리용 자료구조에서도 정리합니다.
+        만료 시간은 마지막 적중 시각부터 계산되므로, 마지막 적중이 TTL보다 오래된 항목만 후보로 골라 실제 존재 여부를 확인합니다.
+        """
+        candidates = await self.r.zrangebyscore(self.last_hit_key, "-inf", time.time() - self.ttl_seconds)
+        if not candidates:
+            return 0
+        keys = [candidate.decode() if isinstance(candidate, bytes) else candidate for candidate in candidates]
+        async with self.r.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.exists(key)
+            exists = await pipe.execute()
+        expired = [key for key, alive in zip(keys, exists) if not alive]
+        if expired:
+            await self._remove_members(expired)
+            await self.r.incrby(self.expired_key, len(expired))
+        return len(expired)
+
+    async def _enforce_capacity(self):
+        """최대 항목 수/바이트 수를 넘으면 제거 정책에 따라 항목을 제거합니다."""
+        await self._prune_expired()
+
+        policy_key = self.last_hit_key if self.eviction_policy == "last_hit" else self.hit_count_key
+        evicted = 0
+        while True:
+            count = await self.r.zcard(self.last_hit_key)
+            total_bytes = int(await self.r.get(self.bytes_key) or 0)
+            if count <= self.max_entries and total_bytes <= self.max_bytes:
+                break
+
+            # ZPOPMIN은 원자적이므로 여러 워커가 동시에 정리해도 같은 항목을 두 번 제거하지 않는다.
+            popped = await self.r.zpopmin(policy_key, max(1, count - self.max_entries))
+            if not popped:
+                break
+            keys = [member.decode() if isinstance(member, bytes) else member for member, _ in popped]
+            await self._remove_members(keys)
+            evicted += len(keys)
+
+        if evicted:
+            await self.r.incrby(self.evictions_key, evicted)
+            logger.info(f"캐시 용량 초과로 {evicted}개의 항목을 제거했습니다. (정책: {self.eviction_policy})")
+
+    async def collect_garbage(self, batch_size: int = 500) -> int:
+        """
+        현재 코퍼스 버전이 아닌(이전 문서로 생성된) 캐시 항목을 삭제합니다. 백그라운드에서 주기적으로 호출됩니다.
+
+        Args:
+            batch_size (int): 한 번의 검색으로 가져와 삭제할 항목 수.
+
+        Returns:
+            int: 삭제한 항목 수.
+        """
+        version = await self._current_version()
+        if version is None:
+            return 0
+
+        # 현재 버전 태그가 없는 항목(이전 버전 및 버전 태그 이전에 저장된 항목)을 검색
+        q = Query(f"-@corpus_version:{{{version}}}").no_content().paging(0, batch_size).dialect(2)
+        removed = 0
+        while True:
+            results = await self.r.ft(self.index_name).search(q)
+            keys = [doc.id for doc in results.docs]
+            if not keys:
+                break
+            await self._remove_members(keys)
+            removed += len(keys)
+            if len(keys) < batch_size:
+                break
+
+        if removed:
+            await self.r.incrby(self.stale_key, removed)
+            logger.info(f"🧹 이전 코퍼스 버전의 캐시 항목 {removed}개를 정리했습니다. (현재 버전: {version})")
+        return removed
+
+    async def get_stats(self) -> dict[str, int | float]:
+        """
+        캐시 용량 및 적중 통계를 반환합니다.
+
+        Returns:
+            dict[str, int | float]: 현재 항목 수/바이트 수, 제거·만료·버전 정리 수, 제거율(제거 수 / 저장 수), 워커 단위 적중 통계.
+        """
+        async with self.r.pipeline(transaction=False) as pipe:
+            pipe.zcard(self.last_hit_key)
+            pipe.get(self.bytes_key)
+            pipe.get(self.evictions_key)
+            pipe.get(self.expired_key)
+            pipe.get(self.inserts_key)
+            pipe.get(self.stale_key)
+            entries, total_bytes, evictions, expired, inserts, stale = await pipe.execute()
+
+        evictions, inserts = int(evictions or 0), int(inserts or 0)
+        lookups = self.exact_hits + self.hits + self.misses
+        return {
+            "entries": entries,
+            "bytes": int(total_bytes or 0),
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "inserts": inserts,
+            "evictions": evictions,
+            "expired": int(expired or 0),
+            "stale_collected": int(stale or 0),
+            "corpus_version": await self._current_version(),
+            "eviction_rate": evictions / inserts if inserts else 0.0,
+            "skipped_duplicates": self.skipped_duplicates,
+            "exact_hits": self.exact_hits,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.exact_hits + self.hits) / lookups if lookups else 0.0,
         }
-        self.r.hset(key, mapping=item)
-        logger.info(f"새로운 Q&A를 Redis 캐시에 추가했습니다. (Key: {key})")
\ No newline at end of file
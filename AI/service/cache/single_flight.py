@@ -0,0 +1,203 @@
+import asyncio
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+from fastapi.logger import logger
+from redis.asyncio import Redis
+
+# 자신이 잡은 리스만 해제하도록 값이 일치할 때만 삭제하는 Lua 스크립트
+_RELEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+class _Flight:
+    """진행 중인 계산 하나를 나타냅니다. 계산은 리더 요청과 분리된 태스크에서 실행됩니다."""
+
+    __slots__ = ("task", "vector", "followers")
+
+    def __init__(self, task: asyncio.Task, vector: Optional[np.ndarray]):
+        self.task = task
+        self.vector = vector
+        self.followers = 0
+
+
+class SingleFlight:
+    """
+    같은 질문에 대한 동시 요청을 하나의 계산으로 합치는(coalescing) 객체입니다.
+
+    먼저 들어온 요청(리더)만 실제로 검색과 LLM 생성을 수행하고, 그동안 들어온 같은 질문의 요청(팔로워)은
+    리더의 결과를 기다렸다가 그대로 사용합니다. 같은 질문인지는 정규화된 질문 키로 판단하며,
+    질문 벡터가 주어지면 진행 중인 질문과의 코사인 유사도가 임계값 이상인 경우도 같은 질문으로 봅니다.
+
+    Redis 클라이언트가 주어지면 워커 간에도 `SET NX` 리스로 리더를 하나만 정합니다.
+    다른 워커가 리스를 가지고 있으면 리스가 풀릴 때까지 기다린 뒤 `remote_result`(예: 시맨틱 캐시 조회)로 결과를 가져오고,
+    가져오지 못하면 직접 계산합니다.
+    """
+
+    def __init__(
+            self,
+            redis_client: Optional[Redis] = None,
+            similarity_threshold: float = 0.97,
+            lease_ttl: int = 30,
+            wait_timeout: float = 30.0,
+            poll_interval: float = 0.2,
+    ):
+        """
+        SingleFlight를 초기화합니다.
+
+        Args:
+            redis_client (Optional[Redis]): 워커 간 리스에 사용할 Redis 클라이언트. 없으면 워커 내부에서만 합칩니다.
+            similarity_threshold (float): 진행 중인 질문과 같은 질문으로 볼 코사인 유사도 임계값.
+            lease_ttl (int): Redis 리스 만료 시간(초). 리더 워커가 죽어도 이 시간이 지나면 리스가 풀립니다.
+            wait_timeout (float): 다른 워커의 리스가 풀리기를 기다릴 최대 시간(초).
+            poll_interval (float): 다른 워커의 리스 해제 여부를 확인하는 간격(초).
+        """
+        self._redis = redis_client
+        self.similarity_threshold = similarity_threshold
+        self.lease_ttl = lease_ttl
+        self.wait_timeout = wait_timeout
+        self.poll_interval = poll_interval
+        self.lease_prefix = "single_flight:"
+
+        self._flights: Dict[str, _Flight] = {}
+
+        # 합쳐진 요청 수 카운터
+        self.leaders = 0
+        self.coalesced = 0
+
+    @property
+    def distributed(self) -> bool:
+        """Redis 리스로 워커 간에도 요청을 합치는지 여부"""
+        return self._redis is not None
+
+    def _find_similar(self, vector: Optional[np.ndarray]) -> Optional[_Flight]:
+        """질문 벡터와 유사도가 임계값 이상인 진행 중인 계산을 찾습니다."""
+        if vector is None:
+            return None
+        for flight in self._flights.values():
+            if flight.vector is not None and float(np.dot(flight.vector, vector)) >= self.similarity_threshold:
+                return flight
+        return None
+
+    async def do(
+            self,
+            key: str,
+            fn: Callable[[], Awaitable[Any]],
+            vector: Optional[List[float]] = None,
+            remote_result: Optional[Callable[[], Awaitable[Optional[Any]]]] = None,
+    ) -> Tuple[Any, bool]:
+        """
+        같은 키(또는 유사한 질문 벡터)의 계산이 진행 중이면 그 결과를 기다리고, 없으면 직접 계산합니다.
+
+        Args:
+            key (str): 정규화된 질문 키.
+            fn (Callable[[], Awaitable[Any]]): 실제 계산(검색 + LLM 생성)을 수행하는 함수.
+            vector (Optional[List[float]]): 질문 임베딩. 주어지면 유사한 질문의 진행 중인 계산과도 합칩니다.
+            remote_result (Optional[Callable]): 다른 워커가 계산을 마친 뒤 결과를 가져오는 함수. None을 반환하면 직접 계산합니다.
+
+        Returns:
+            Tuple[Any, bool]: (계산 결과, 다른 요청의 결과를 공유했는지 여부).
+        """
+        normalized_vector = None
+        if vector is not None:
+            normalized_vector = np.asarray(vector, dtype=np.float32)
+            norm = np.linalg.norm(normalized_vector)
+            normalized_vector = normalized_vector / norm if norm else None
+
+        flight = self._flights.get(key) or self._find_similar(normalized_vector)
+        if flight is not None:
+            flight.followers += 1
+            self.coalesced += 1
+            logger.info(f"🔗 진행 중인 동일 질문의 결과를 기다립니다. (대기 요청 {flight.followers}개)")
+            try:
+                # 팔로워가 취소되어도 공유 계산은 취소되지 않도록 shield
+                result, _ = await asyncio.shield(flight.task)
+            finally:
+                flight.followers -= 1
+            return result, True
+
+        # 리더 요청이 취소되어도 기다리는 팔로워가 결과를 받을 수 있도록 계산을 별도 태스크로 실행
+        task = asyncio.ensure_future(self._run_with_lease(key, fn, remote_result))
+        flight = _Flight(task, normalized_vector)
+        self._flights[key] = flight
+        task.add_done_callback(lambda _: self._finish(key, flight))
+        self.leaders += 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            # 기다리는 팔로워가 없으면 계산도 취소하고, 새 요청이 취소된 계산에 합류하지 않도록 바로 제거
+            if not flight.followers and not task.done():
+                task.cancel()
+                self._finish(key, flight)
+            raise
+
+    def _finish(self, key: str, flight: _Flight):
+        """끝난(또는 취소한) 계산을 진행 목록에서 제거합니다."""
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+        # 기다리는 요청이 모두 취소된 경우에도 예외가 회수되지 않았다는 경고가 뜨지 않도록 미리 회수
+        if flight.task.done() and not flight.task.cancelled():
+            flight.task.exception()
+
+    async def _run_with_lease(
+            self,
+            key: str,
+            fn: Callable[[], Awaitable[Any]],
+            remote_result: Optional[Callable[[], Awaitable[Optional[Any]]]],
+    ) -> Tuple[Any, bool]:
+        """Redis 리스를 잡은 뒤 계산합니다. 다른 워커가 리스를 가지고 있으면 해제를 기다렸다가 결과를 가져옵니다."""
+        if self._redis is None:
+            return await fn(), False
+
+        lease_key = f"{self.lease_prefix}{key}"
+        token = uuid.uuid4().hex
+        try:
+            acquired = await self._redis.set(lease_key, token, nx=True, ex=self.lease_ttl)
+        except Exception as e:
+            logger.info(f"Redis 리스 획득 오류, 직접 계산합니다: {e}")
+            return await fn(), False
+
+        if not acquired:
+            if await self._wait_for_release(lease_key) and remote_result is not None:
+                result = await remote_result()
+                if result is not None:
+                    self.coalesced += 1
+                    logger.info("🔗 다른 워커가 계산한 결과를 사용합니다.")
+                    return result, True
+            return await fn(), False
+
+        try:
+            return await fn(), False
+        finally:
+            try:
+                await self._redis.eval(_RELEASE_SCRIPT, 1, lease_key, token)
+            except Exception as e:
+                logger.info(f"Redis 리스 해제 오류: {e}")
+
+    async def _wait_for_release(self, lease_key: str) -> bool:
+        """다른 워커의 리스가 풀릴 때까지 기다립니다. 제한 시간 안에 풀리면 True를 반환합니다."""
+        deadline = time.monotonic() + self.wait_timeout
+        while time.monotonic() < deadline:
+            try:
+                if not await self._redis.exists(lease_key):
+                    return True
+            except Exception as e:
+                logger.info(f"Redis 리스 확인 오류: {e}")
+                return False
+            await asyncio.sleep(self.poll_interval)
+        return False
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        요청 합치기 통계를 반환합니다.
+
+        Returns:
+            Dict[str, int]: 직접 계산한 요청 수, 다른 요청의 결과를 공유한 요청 수, 현재 진행 중인 계산 수.
+        """
+        return {"leaders": self.leaders, "coalesced": self.coalesced, "in_flight": len(self._flights)}
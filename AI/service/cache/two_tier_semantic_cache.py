@@ -0,0 +1,317 @@
+import asyncio
+import json
+import time
+from contextlib import suppress
+from typing import Dict, List, Optional, Set
+
+import numpy as np
+from fastapi.logger import logger
+
+from service.cache.cache_strategy import CacheStrategy
+from service.cache.corpus_version import CorpusVersion
+from service.cache.redis_semantic_cache import RedisSemanticCache
+from service.embedding.query_embedding import QueryEmbedding
+from utils.text_normalizer import normalize_question
+
+# 1단계 항목 하나에 연결할 수 있는 완전 일치 질문(표현이 다른 같은 질문) 수의 상한
+MAX_EXACT_PER_SLOT = 32
+
+
+class TwoTierSemanticCache(CacheStrategy):
+    """
+    프로세스 내부 벡터 캐시(1단계)와 Redis 시맨틱 캐시(2단계)로 구성된 2단계 시맨틱 캐시입니다.
+
+    1단계는 자주 적중하는 질문 N개의 임베딩을 행 단위로 정규화한 NumPy 행렬로 보관하며,
+    행렬-벡터 곱 한 번으로 코사인 유사도를 계산하므로 네트워크 호출 없이 응답합니다.
+    1단계에서 찾지 못하면 Redis를 조회하고, Redis에서 적중한 항목은 1단계로 올립니다. (가장 오래 적중하지 않은 항목부터 교체)
+
+    조회 순서는 임베딩 계산과 네트워크 호출이 적은 순서입니다.
+    1단계 완전 일치(정규화된 질문) → Redis 완전 일치 → 1단계 벡터 검색 → Redis KNN 검색
+
+    1단계는 Redis pub/sub으로 일관성을 유지합니다.
+    - Redis 항목이 제거/만료 정리되면 해당 키를 1단계에서도 제거합니다.
+    - 코퍼스 버전이 바뀌면 1단계를 모두 비웁니다.
+    알림을 받지 못하는 경우(연결 끊김 등)를 대비해 1단계 항목에는 짧은 TTL을 둡니다.
+    만료된 항목은 Redis에서 다시 적중하면 새로 읽어 갱신합니다.
+
+    1단계 적중은 Redis를 거치지 않으므로, 키별 적중 횟수를 모아 `hit_flush_interval`마다 Redis에 기록합니다.
+    (Redis의 TTL 연장과 제거 정책이 자주 적중하는 항목을 적중하지 않은 항목으로 취급하지 않도록)
+    """
+
+    def __init__(
+            self,
+            redis_cache: RedisSemanticCache,
+            corpus_version: Optional[CorpusVersion] = None,
+            max_size: int = 256,
+            ttl_seconds: float = 300,
+            hit_flush_interval: float = 5.0,
+    ):
+        """
+        TwoTierSemanticCache를 초기화합니다.
+
+        Args:
+            redis_cache (RedisSemanticCache): 2단계로 사용할 Redis 시맨틱 캐시.
+            corpus_version (Optional[CorpusVersion]): 코퍼스 버전 변경 알림을 구독할 카운터. 없으면 버전 변경 알림을 받지 않습니다.
+            max_size (int): 1단계에 보관할 최대 질문 수(행렬의 행 수).
+            ttl_seconds (float): 1단계 항목의 유효 시간(초).
+            hit_flush_interval (float): 1단계 적중 횟수를 Redis에 기록하는 주기(초).
+        """
+        self.redis_cache = redis_cache
+        self.corpus_version = corpus_version
+        self.similarity_threshold = redis_cache.similarity_threshold
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.hit_flush_interval = hit_flush_interval
+
+        # 1단계: 정규화된 질문 임베딩 행렬과 행(slot)별 항목 정보
+        self._matrix = np.zeros((max_size, redis_cache.embedding_dim), dtype=np.float32)
+        self._slots: Dict[str, int] = {}                      # 캐시 키 -> 행 번호
+        self._keys: List[Optional[str]] = [None] * max_size   # 행 번호 -> 캐시 키
+        self._entries: List[Optional[Dict[str, str]]] = [None] * max_size
+        self._expires_at = np.zeros(max_size, dtype=np.float64)
+        self._last_hit = np.zeros(max_size, dtype=np.float64)
+        self._exact: Dict[str, str] = {}                      # 정규화된 질문 -> 캐시 키 (1단계 완전 일치)
+        self._slot_questions: List[Set[str]] = [set() for _ in range(max_size)]  # 행 번호 -> 연결된 정규화된 질문
+
+        self._listener: Optional[asyncio.Task] = None
+        self._hit_flusher: Optional[asyncio.Task] = None
+        self._local_hit_counts: Dict[str, int] = {}  # Redis에 아직 기록하지 않은 1단계 적중: 캐시 키 -> 횟수
+
+        # 1단계 적중/실패 카운터
+        self.local_hits = 0
+        self.local_misses = 0
+        self.promotions = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def _normalize(vector: np.ndarray) -> Optional[np.ndarray]:
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else None
+
+    def _search_local(self, vector: np.ndarray) -> Optional[int]:
+        """1단계에서 임계값을 넘는 가장 유사한 행 번호를 찾습니다."""
+        if not self._slots:
+            return None
+        scores = self._matrix @ vector  # 비어 있는 행은 0 벡터이므로 점수가 0
+        scores[self._expires_at < time.monotonic()] = -1.0
+        slot = int(np.argmax(scores))
+        if self._keys[slot] is None or scores[slot] <= self.similarity_threshold:
+            return None
+        self._last_hit[slot] = time.monotonic()
+        return slot
+
+    def _search_exact(self, question: str) -> Optional[int]:
+        """1단계에서 정규화 기준으로 완전히 같은 질문의 행 번호를 찾습니다."""
+        key = self._exact.get(normalize_question(question))
+        slot = self._slots.get(key) if key is not None else None
+        if slot is None or self._expires_at[slot] < time.monotonic():
+            return None
+        self._last_hit[slot] = time.monotonic()
+        return slot
+
+    def _link_exact(self, question: str, key: str):
+        """정규화된 질문을 1단계 항목에 연결합니다. 항목이 제거되면 연결도 함께 제거되며, 항목당 연결 수는 제한됩니다."""
+        slot = self._slots.get(key)
+        if slot is None:
+            return
+        normalized = normalize_question(question)
+        questions = self._slot_questions[slot]
+        if normalized in questions or len(questions) >= MAX_EXACT_PER_SLOT:
+            return
+        previous_key = self._exact.get(normalized)
+        if previous_key is not None and previous_key in self._slots:
+            self._slot_questions[self._slots[previous_key]].discard(normalized)
+        self._exact[normalized] = key
+        questions.add(normalized)
+
+    def _promote(self, key: str, vector: np.ndarray, entry: Dict[str, str]):
+        """Redis에서 적중한 항목을 1단계에 올립니다. 자리가 없으면 가장 오래 적중하지 않은 행을 교체합니다."""
+        slot = self._slots.get(key)
+        if slot is None:
+            slot = int(np.argmin(self._last_hit)) if len(self._slots) >= self.max_size else self._keys.index(None)
+            self._evict_slot(slot)
+            self._slots[key] = slot
+            self._keys[slot] = key
+        now = time.monotonic()
+        self._matrix[slot] = vector
+        self._entries[slot] = entry
+        self._expires_at[slot] = now + self.ttl_seconds
+        self._last_hit[slot] = now
+        self.promotions += 1
+
+    def _evict_slot(self, slot: int):
+        key = self._keys[slot]
+        if key is not None:
+            del self._slots[key]
+            for question in self._slot_questions[slot]:
+                del self._exact[question]
+            self._slot_questions[slot].clear()
+        self._keys[slot] = None
+        self._entries[slot] = None
+        self._matrix[slot] = 0.0
+        self._expires_at[slot] = 0.0
+        self._last_hit[slot] = 0.0
+
+    def invalidate(self, keys: Optional[List[str]] = None):
+        """
+        1단계에서 항목을 제거합니다.
+
+        Args:
+            keys (Optional[List[str]]): 제거할 캐시 키 목록. 없으면 1단계 전체를 비웁니다.
+        """
+        if keys is None:
+            for slot in list(self._slots.values()):
+                self._evict_slot(slot)
+            self.invalidations += 1
+            return
+        for key in keys:
+            slot = self._slots.get(key)
+            if slot is not None:
+                self._evict_slot(slot)
+                self.invalidations += 1
+
+    async def get_cached_answer(self, question: str, query_embedding: Optional[QueryEmbedding] = None) -> Optional[Dict[str, str | float]]:
+        # 1단계 완전 일치 (임베딩, 네트워크 호출 없음)
+        slot = self._search_exact(question)
+        if slot is not None:
+            self._count_local_hit(slot)
+            logger.info("✅ Local Exact Cache Hit!")
+            return {**self._entries[slot], "score": 1.0, "tier": "local_exact"}
+
+        # Redis 완전 일치 (임베딩 없음)
+        cached_result = await self.redis_cache.get_exact_answer(question)
+        if cached_result is None:
+            query_embedding = query_embedding or QueryEmbedding(question, self.redis_cache.model)
+            vector = self._normalize(np.asarray(await query_embedding.aget(), dtype=np.float32))
+
+            # 1단계 벡터 검색: 프로세스 내부 행렬 검색 (네트워크 호출 없음)
+            if vector is not None:
+                slot = self._search_local(vector)
+                if slot is not None:
+                    self._count_local_hit(slot)
+                    score = float(self._matrix[slot] @ vector)
+                    logger.info(f"✅ Local Cache Hit! (유사도: {score:.4f})")
+                    self._link_exact(question, self._keys[slot])
+                    return {**self._entries[slot], "score": score, "tier": "local"}
+
+            # 1단계의 두 검색에서 모두 찾지 못한 경우만 1단계 실패로 집계 (Redis 완전 일치 적중은 제외)
+            self.local_misses += 1
+
+            # 2단계: Redis 시맨틱 캐시
+            cached_result = await self.redis_cache.get_semantic_answer(question, query_embedding=query_embedding)
+
+        if cached_result and cached_result.get("key"):
+            try:
+                await self._promote_from_redis(question, cached_result)
+            except Exception as e:
+                logger.info(f"로컬 캐시 등록 오류: {e}")
+        return cached_result
+
+    def _count_local_hit(self, slot: int):
+        self.local_hits += 1
+        key = self._keys[slot]
+        self._local_hit_counts[key] = self._local_hit_counts.get(key, 0) + 1
+
+    async def _flush_local_hits(self):
+        """모아 둔 1단계 적중 횟수를 Redis에 기록합니다."""
+        hits, self._local_hit_counts = self._local_hit_counts, {}
+        try:
+            await self.redis_cache.record_hits(hits)
+        except Exception as e:
+            logger.info(f"로컬 캐시 적중 기록 오류: {e}")
+
+    async def _run_hit_flusher(self):
+        while True:
+            await asyncio.sleep(self.hit_flush_interval)
+            await self._flush_local_hits()
+
+    async def _promote_from_redis(self, question: str, cached_result: Dict[str, str | float]):
+        """Redis에서 적중한 항목의 저장된 질문 벡터를 가져와 1단계에 올립니다. 이미 있지만 만료된 항목은 새로 읽어 갱신합니다."""
+        key = cached_result["key"]
+        slot = self._slots.get(key)
+        if slot is None or self._expires_at[slot] < time.monotonic():
+            stored_vector = await self.redis_cache.get_vector(key)
+            if stored_vector is None:
+                return
+            normalized = self._normalize(np.frombuffer(stored_vector, dtype=np.float32))
+            if normalized is None:
+                return
+            self._promote(
+                key,
+                normalized,
+                {
+                    "answer": cached_result["answer"],
+                    "original_question": cached_result["original_question"],
+                    "key": key,
+                },
+            )
+        self._link_exact(question, key)
+
+    async def add_to_cache(self, question: str, answer: str, query_embedding: Optional[QueryEmbedding] = None) -> None:
+        # 새 항목은 Redis에만 저장하고, 1단계에는 적중했을 때 올린다.
+        await self.redis_cache.add_to_cache(question, answer, query_embedding=query_embedding)
+
+    async def collect_garbage(self) -> int:
+        return await self.redis_cache.collect_garbage()
+
+    async def start(self):
+        """Redis 무효화 알림 구독과 1단계 적중 기록을 시작합니다."""
+        if self._listener is None:
+            self._listener = asyncio.create_task(self._listen_invalidations())
+        if self._hit_flusher is None:
+            self._hit_flusher = asyncio.create_task(self._run_hit_flusher())
+
+    async def aclose(self):
+        if self._listener is not None:
+            self._listener.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._listener
+            self._listener = None
+        if self._hit_flusher is not None:
+            self._hit_flusher.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._hit_flusher
+            self._hit_flusher = None
+        await self._flush_local_hits()
+
+    async def _listen_invalidations(self):
+        """캐시 항목 삭제/코퍼스 버전 변경 알림을 구독하여 1단계를 갱신합니다. 연결이 끊기면 1단계를 비우고 다시 구독합니다."""
+        channels = [self.redis_cache.invalidation_channel]
+        if self.corpus_version is not None:
+            channels.append(self.corpus_version.channel)
+
+        while True:
+            pubsub = self.redis_cache.r.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(*channels)
+                logger.info(f"--- 로컬 캐시 무효화 알림 구독 시작: {channels} ---")
+                async for message in pubsub.listen():
+                    channel = message["channel"]
+                    channel = channel.decode() if isinstance(channel, bytes) else channel
+                    if channel == self.redis_cache.invalidation_channel:
+                        self.invalidate(json.loads(message["data"]))
+                    else:
+                        self.invalidate()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # 구독이 끊긴 동안의 알림은 받을 수 없으므로 1단계를 비워 일관성을 유지
+                logger.info(f"로컬 캐시 무효화 구독 오류, 재연결합니다: {e}")
+                self.invalidate()
+                await asyncio.sleep(1)
+            finally:
+                with suppress(Exception):
+                    await pubsub.aclose()
+
+    async def get_stats(self) -> Dict[str, int | float]:
+        stats = await self.redis_cache.get_stats()
+        lookups = self.local_hits + self.local_misses
+        stats.update({
+            "local_entries": len(self._slots),
+            "local_max_entries": self.max_size,
+            "local_hits": self.local_hits,
+            "local_hit_rate": self.local_hits / lookups if lookups else 0.0,
+            "local_promotions": self.promotions,
+            "local_invalidations": self.invalidations,
+        })
+        return stats
@@ -1,6 +1,10 @@
-from typing import Dict
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Any, AsyncIterator, Optional, Tuple
 
+from bson import ObjectId
 from fastapi.logger import logger
+from langchain_core.documents import Document
 from langchain_core.language_models import BaseLanguageModel
 from langchain_core.output_parsers import StrOutputParser
 from langchain_core.prompts import ChatPromptTemplate
@@ -8,7 +12,15 @@ from langchain_core.prompts import ChatPromptTemplate
 from database.chat.repository import ChatRepository
 from database.vector.repository import VectorRepository
 from service.cache.cache_strategy import CacheStrategy
+from service.cache.single_flight import SingleFlight
+from service.embedding.embedding_strategy.embedding_strategy import EmbeddingStrategy
+from service.embedding.query_embedding import QueryEmbedding
+from service.persistence.feedback_buffer import FeedbackBuffer
+from service.persistence.write_behind_queue import WriteBehindQueue
 from service.retriever.document_retriever import DocumentRetriever
+from utils.text_normalizer import text_hash
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
 
 
 class ChatService:
@@ -26,7 +38,14 @@ class ChatService:
             llm: BaseLanguageModel,
             chat_repository: ChatRepository,
             vector_repository: VectorRepository,
-            cache_strategy: CacheStrategy
+            cache_strategy: CacheStrategy,
+            embedding_strategy: EmbeddingStrategy,
+            single_flight: Optional[SingleFlight] = None,
+            qa_direct_threshold: Optional[float] = None,
+            qa_direct_template: Optional[str] = None,
+            qa_direct_source: str = "vector",
+            write_queue: Optional[WriteBehindQueue] = None,
+            feedback_buffer: Optional[FeedbackBuffer] = None,
     ):
         """
         ChatService를 초기화합니다.
@@ -38,6 +57,13 @@ class ChatService:
             chat_repository (ChatRepository): 대화 기록을 데이터베이스에 저장하고 조회하는 레포지토리.
             vector_repository (VectorRepository): 피드백을 기반으로 참조 문서의 점수(좋/싫)를 업데이트하는 레포지토리.
             cache_strategy (CacheStrategy): 질문과 유사한 답변을 미리 저장해놓는 캐시
+            embedding_strategy (EmbeddingStrategy): 요청마다 질문 임베딩을 한 번만 계산하기 위한 임베딩 전략.
+            single_flight (Optional[SingleFlight]): 같은 질문의 동시 요청을 하나의 검색/생성으로 합치는 객체. 없으면 요청마다 생성합니다.
+            qa_direct_threshold (Optional[float]): 벡터 검색 1위가 QA 데이터이고 유사도가 이 값 이상이면 LLM 없이 등록된 답변으로 응답합니다. 없으면 항상 LLM으로 생성합니다.
+            qa_direct_template (Optional[str]): QA 답변을 바로 응답할 때 사용할 템플릿. {answer}, {question}, {matched_question}을 사용할 수 있습니다.
+            qa_direct_source (str): QA 직접 응답 판단에 사용할 검색기 이름. (유사도 점수를 쓰므로 벡터 검색기)
+            write_queue (Optional[WriteBehindQueue]): 대화 기록/캐시 저장을 응답 후 일괄 처리하는 큐. 없으면 요청 안에서 바로 저장합니다.
+            feedback_buffer (Optional[FeedbackBuffer]): 참조 문서 피드백을 모았다가 벡터 DB에 일괄 반영하는 버퍼. 없으면 요청 안에서 바로 반영합니다.
         """
         self.retriever = retriever
         self.prompt = prompt
@@ -45,6 +71,13 @@ class ChatService:
         self.chat_repository = chat_repository
         self.vector_repository = vector_repository
         self.cache_strategy = cache_strategy
+        self.embedding_strategy = embedding_strategy
+        self.single_flight = single_flight
+        self.qa_direct_threshold = qa_direct_threshold
+        self.qa_direct_template = qa_direct_template
+        self.qa_direct_source = qa_direct_source
+        self.write_queue = write_queue
+        self.feedback_buffer = feedback_buffer
         logger.info("✅ ChatService 초기화 완료")
 
     async def ask(self, question: str, session_id: str) -> Dict[str, str]:
@@ -54,6 +87,7 @@ class ChatService:
         처리 흐름:
         0. 캐시된 답변이 있는지 확인하고 있다면 캐시에서 응답합니다.
         1. Retriever를 사용하여 질문과 관련된 컨텍스트 문서를 검색합니다.
+           벡터 검색 1위가 유사도가 충분히 높은 QA 데이터라면 LLM 없이 등록된 답변으로 응답합니다.
         2. 검색된 컨텍스트와 질문을 프롬프트에 결합하여 LLM에 전달합니다.
         3. LLM으로부터 생성된 답변을 받습니다.
         4. 질문, 답변, 참조 문서 ID를 데이터베이스에 저장합니다.
@@ -70,25 +104,90 @@ class ChatService:
 
         logger.info(f"--- 🗣️ 질문: {question} (Chat Session: {session_id}) ---")
 
+        # 캐시 조회, 벡터 검색, 캐시 저장에서 공유할 질문 임베딩 (최초 사용 시 한 번만 계산)
+        query_embedding = QueryEmbedding(question, self.embedding_strategy)
+
         #1. 캐시를 확인하여 유사 답변이 있는지 확인
-        cached_result = await self.cache_strategy.get_cached_answer(question)
+        cached_result = await self.cache_strategy.get_cached_answer(question, query_embedding=query_embedding)
         if cached_result:
-            metadata = {
-                "cache_hit": True,
-                "question": cached_result.get('question'),
-                "score": cached_result.get('score'),
-                "retrieved_source_ids": []
-            }
-            chat_id = self.chat_repository.save_chat(cached_result.get('answer'), question, session_id, metadata)
+            metadata = self._cache_hit_metadata(cached_result)
+            chat_id = await self._save_chat(cached_result.get('answer'), question, session_id, metadata)
 
             return {"llm_answer": cached_result.get('answer'), "chat_id": chat_id}
 
         # 없다면 아래 실행
+        # 2~4. 검색과 답변 생성 (같은 질문이 이미 처리 중이면 그 결과를 함께 사용)
+        if self.single_flight is not None:
+            generated, coalesced = await self.single_flight.do(
+                key=text_hash(question),
+                fn=lambda: self._generate(question, query_embedding),
+                vector=await query_embedding.aget() if query_embedding.is_computed else None,
+                remote_result=lambda: self._cached_generation(question, query_embedding),
+            )
+        else:
+            generated, coalesced = await self._generate(question, query_embedding), False
+        answer = generated["answer"]
+
+        # 5. 대화 내용을 DB에 저장하기 위한 메타데이터를 구성합니다.
+        # 다른 워커가 캐시에 저장한 답변을 가져온 경우(hit_type "cache")도 캐시 적중으로 기록합니다.
+        metadata = {
+            "cache_hit": generated["hit_type"] == "cache",
+            "hit_type": generated["hit_type"],
+            "retrieved_source_ids": generated["source_ids"]
+        }
+        if coalesced:
+            metadata["coalesced"] = True
+
+        # 6. 대화 내용을 저장하고, 생성된 chat_id를 받습니다. (요청마다 별도로 저장)
+        chat_id = await self._save_chat(answer, question, session_id, metadata)
+
+        return {"llm_answer": answer, "chat_id": chat_id}
+
+    async def _save_chat(self, answer: str, question: str, session_id: str, metadata: Dict[str, Any]) -> str:
+        """대화 기록을 저장하고 chat_id를 반환합니다. write-behind 큐가 있으면 큐에 넣고 미리 생성된 ID를 바로 반환합니다."""
+        if self.write_queue is None:
+            return await self.chat_repository.asave_chat(answer, question, session_id, metadata)
+        return await self.write_queue.submit_chat(self.chat_repository.build_chat(answer, question, session_id, metadata))
+
+    async def _save_cache(self, question: str, answer: str, query_embedding: QueryEmbedding):
+        """질문-답변을 캐시에 저장합니다. write-behind 큐가 있으면 큐에 넣고 바로 반환합니다."""
+        if self.write_queue is None:
+            await self.cache_strategy.add_to_cache(question, answer, query_embedding=query_embedding)
+        else:
+            await self.write_queue.submit_cache(question, answer, query_embedding)
+
+    @staticmethod
+    def _cache_hit_metadata(cached_result: Dict[str, Any]) -> Dict[str, Any]:
+        """캐시에서 응답한 대화의 메타데이터를 구성합니다. (어느 캐시 단계에서 적중했는지 포함)"""
+        return {
+            "cache_hit": True,
+            "hit_type": "cache",
+            "cache_tier": cached_result.get('tier'),
+            "question": cached_result.get('original_question'),
+            "score": cached_result.get('score'),
+            "retrieved_source_ids": []
+        }
+
+    async def _generate(self, question: str, query_embedding: QueryEmbedding) -> Dict[str, Any]:
+        """
+        문서를 검색하고 LLM으로 답변을 생성한 뒤 캐시에 저장합니다.
+        유사도가 충분히 높은 QA 데이터가 검색되면 LLM을 호출하지 않고 등록된 답변을 반환합니다.
+
+        Returns:
+            Dict[str, Any]: "answer"(생성된 답변), "source_ids"(참조 문서의 소스 ID 리스트),
+                            "hit_type"("qa_direct" | "generated")를 포함하는 딕셔너리.
+        """
         # 2. 검색기를 호출하여 컨텍스트와 참조 문서를 가져옵니다.
-        retriever_output = self.retriever.invoke(question)
+        retriever_output = await self.retriever.ainvoke(question, query_embedding=query_embedding)
         context = retriever_output["context"]
         source_docs = retriever_output["source_docs"]
 
+        # QA 데이터와 거의 같은 질문이면 등록된 답변으로 바로 응답합니다.
+        qa_direct = self._qa_direct_answer(question, retriever_output)
+        if qa_direct is not None:
+            answer, qa_doc = qa_direct
+            return {"answer": answer, "source_ids": [qa_doc.metadata.get("source_id")], "hit_type": "qa_direct"}
+
         # 참조된 문서들의 소스 ID를 추출합니다.
         source_ids = [doc.metadata.get("source_id") for doc in source_docs if "source_id" in doc.metadata]
 
@@ -96,32 +195,189 @@ class ChatService:
         chain = self.prompt | self.llm | StrOutputParser()
 
         # 4. 체인을 실행하여 AI의 답변을 생성합니다.
-        answer = chain.invoke({
+        answer = await chain.ainvoke({
             "context": context,
             "question": question
         })
 
-        # 5. 대화 내용을 DB에 저장하기 위한 메타데이터를 구성합니다.
+        # 새로 생성된 질문-답변 쌍을 캐시에 저장합니다. (다른 워커에서 기다리는 요청도 이 캐시로 결과를 가져감)
+        # 다른 워커가 리스 해제 후 캐시로 결과를 가져가야 하므로, 워커 간 합치기를 사용할 때는 큐를 거치지 않고 바로 저장합니다.
+        if self.single_flight is not None and self.single_flight.distributed:
+            await self.cache_strategy.add_to_cache(question, answer, query_embedding=query_embedding)
+        else:
+            await self._save_cache(question, answer, query_embedding)
+
+        return {"answer": answer, "source_ids": source_ids, "hit_type": "generated"}
+
+    def _qa_direct_answer(self, question: str, retriever_output: Dict[str, Any]) -> Optional[Tuple[str, Document]]:
+        """
+        벡터 검색 1위가 QA 데이터이고 유사도가 임계값 이상이면 등록된 답변을 반환합니다.
+
+        QA 데이터는 질문이 page_content에, 답변이 metadata의 retrieved_content에 저장되어 있으므로
+        방문자의 질문이 등록된 질문과 거의 같다면 LLM으로 다시 생성할 필요가 없습니다.
+
+        Args:
+            question (str): 사용자의 질문.
+            retriever_output (Dict[str, Any]): DocumentRetriever의 검색 결과.
+
+        Returns:
+            Optional[Tuple[str, Document]]: (응답할 답변, 해당 QA 문서). 조건을 만족하지 않으면 None.
+        """
+        if self.qa_direct_threshold is None:
+            return None
+        results = retriever_output.get("source_results", {}).get(self.qa_direct_source)
+        if not results:
+            return None
+
+        doc, score = max(results, key=lambda result: result[1])
+        answer = doc.metadata.get("retrieved_content")
+        if doc.metadata.get("source_type") != "qa" or not answer or score < self.qa_direct_threshold:
+            return None
+
+        logger.info(f"✅ QA 직접 응답: '{doc.page_content[:50]}' (유사도: {score:.4f})")
+        if self.qa_direct_template:
+            answer = self.qa_direct_template.format(answer=answer, question=question, matched_question=doc.page_content)
+        return answer, doc
+
+    async def _cached_generation(self, question: str, query_embedding: QueryEmbedding) -> Optional[Dict[str, Any]]:
+        """다른 워커가 생성을 마친 뒤 캐시에 저장한 답변을 `_generate`와 같은 형태로 가져옵니다."""
+        cached_result = await self.cache_strategy.get_cached_answer(question, query_embedding=query_embedding)
+        if not cached_result:
+            return None
+        return {"answer": cached_result.get('answer'), "source_ids": [], "hit_type": "cache"}
+
+    async def astream(self, question: str, session_id: str) -> AsyncIterator[Dict[str, Any]]:
+        """
+        `ask`의 스트리밍 버전입니다. LLM이 생성하는 토큰을 생성되는 즉시 이벤트로 전달합니다.
+
+        전체 답변이 생성될 때까지 기다리지 않으므로 첫 토큰까지의 시간(TTFT)이 크게 줄어듭니다.
+        캐시에 유사 답변이 있거나 유사도가 충분히 높은 QA 데이터가 검색되면 LLM을 호출하지 않고 답변을 바로 하나의 토큰 이벤트로 전달합니다.
+        캐시 저장과 대화 기록 저장은 스트림이 끝난 뒤 동시에 수행하며, 생성된 chat_id는 마지막 이벤트에 담아 전달합니다.
+
+        Args:
+            question (str): 사용자의 질문.
+            session_id (str): 현재 대화 세션을 식별하는 고유 ID.
+
+        Yields:
+            Dict[str, Any]: {"event": 이벤트 이름, "data": 이벤트 데이터} 형태의 딕셔너리.
+                            - token: {"token": str} 답변의 일부
+                            - done: {"chat_id": str, "cache_hit": bool, "hit_type": str} 스트림 종료
+                            - error: {"message": str} 처리할 수 없는 요청
+        """
+        if len(question) > 200:
+            yield {"event": "error", "data": {"message": "질문이 너무 깁니다. 200자 이하로 줄여주세요."}}
+            return
+
+        logger.info(f"--- 🗣️ 질문(스트리밍): {question} (Chat Session: {session_id}) ---")
+
+        query_embedding = QueryEmbedding(question, self.embedding_strategy)
+
+        # 1. 캐시된 답변이 있으면 LLM 호출 없이 즉시 전달
+        cached_result = await self.cache_strategy.get_cached_answer(question, query_embedding=query_embedding)
+        if cached_result:
+            answer = cached_result.get('answer')
+            yield {"event": "token", "data": {"token": answer}}
+
+            metadata = self._cache_hit_metadata(cached_result)
+            chat_id = await self._save_chat(answer, question, session_id, metadata)
+            yield {"event": "done", "data": {"chat_id": chat_id, "cache_hit": True, "hit_type": "cache"}}
+            return
+
+        # 2. 검색기를 호출하여 컨텍스트와 참조 문서를 가져옵니다.
+        retriever_output = await self.retriever.ainvoke(question, query_embedding=query_embedding)
+        source_docs = retriever_output["source_docs"]
+        source_ids = [doc.metadata.get("source_id") for doc in source_docs if "source_id" in doc.metadata]
+
+        # QA 데이터와 거의 같은 질문이면 등록된 답변을 바로 전달합니다.
+        qa_direct = self._qa_direct_answer(question, retriever_output)
+        if qa_direct is not None:
+            answer, qa_doc = qa_direct
+            yield {"event": "token", "data": {"token": answer}}
+
+            metadata = {
+                "cache_hit": False,
+                "hit_type": "qa_direct",
+                "retrieved_source_ids": [qa_doc.metadata.get("source_id")]
+            }
+            chat_id = await self._save_chat(answer, question, session_id, metadata)
+            yield {"event": "done", "data": {"chat_id": chat_id, "cache_hit": False, "hit_type": "qa_direct"}}
+            return
+
+        # 3. 체인을 스트리밍으로 실행하여 생성되는 토큰을 바로 전달합니다.
+        chain = self.prompt | self.llm | StrOutputParser()
+        tokens = []
+        async for token in chain.astream({
+            "context": retriever_output["context"],
+            "question": question
+        }):
+            if not token:
+                continue
+            tokens.append(token)
+            yield {"event": "token", "data": {"token": token}}
+        answer = "".join(tokens)
+
+        # 4. 스트림이 끝난 뒤 캐시 저장과 대화 기록 저장을 동시에 수행합니다.
         metadata = {
             "cache_hit": False,
+            "hit_type": "generated",
             "retrieved_source_ids": source_ids
         }
+        _, chat_id = await asyncio.gather(
+            self._save_cache(question, answer, query_embedding),
+            self._save_chat(answer, question, session_id, metadata),
+        )
+        yield {"event": "done", "data": {"chat_id": chat_id, "cache_hit": False, "hit_type": "generated"}}
 
-        # 6-1 새로 생성된 질문-답변 쌍을 캐시에 저장합니다.
-        await self.cache_strategy.add_to_cache(question, answer)
+    async def get_history(self, session_id: str, limit: int = 20, before: Optional[str] = None) -> Dict[str, Any]:
+        """
+        세션의 최근 대화를 커서 기반으로 페이지 단위 조회합니다.
 
-        # 6-2. 대화 내용을 저장하고, 생성된 chat_id를 받습니다.
-        chat_id = self.chat_repository.save_chat(answer, question, session_id, metadata)
+        Args:
+            session_id (str): 조회할 대화 세션 ID.
+            limit (int): 한 페이지에 가져올 대화 수.
+            before (Optional[str]): 이전 페이지 커서. 이전 응답의 `next_cursor`("{epoch 밀리초}_{chat_id}")를 그대로 전달합니다.
 
-        return {"llm_answer": answer, "chat_id": chat_id}
+        Returns:
+            Dict[str, Any]: "turns"(시간순 대화 리스트)와 "next_cursor"(더 이전 대화가 있을 수 있으면 커서, 없으면 None).
+
+        Raises:
+            ValueError: 커서 형식이 올바르지 않은 경우.
+        """
+        before_time, before_id = self._parse_history_cursor(before) if before else (None, None)
+        turns = await self.chat_repository.aget_recent_history(session_id, limit, before_time, before_id)
+        next_cursor = self._build_history_cursor(turns[0]) if len(turns) == limit else None
+        return {"turns": turns, "next_cursor": next_cursor}
+
+    @staticmethod
+    def _build_history_cursor(turn: Dict[str, Any]) -> str:
+        """
+        페이지의 가장 오래된 대화로 다음 페이지 커서를 만듭니다.
+        쿼리 문자열에 인코딩 없이 넣어도 되도록 ISO 시각('+00:00' 포함) 대신 epoch 밀리초를 사용합니다.
+        """
+        timestamp_ms = (datetime.fromisoformat(turn["timestamp"]) - _EPOCH) // timedelta(milliseconds=1)
+        return f"{timestamp_ms}_{turn['chat_id']}"
+
+    @staticmethod
+    def _parse_history_cursor(cursor: str) -> Tuple[datetime, Optional[str]]:
+        """
+        대화 기록 커서를 (시각, chat_id)로 변환합니다. 같은 시각의 대화가 페이지 경계에서 빠지지 않도록 chat_id로 구분합니다.
+        이전 형식(ISO 8601 시각, chat_id가 없는 커서)도 받습니다.
+        """
+        timestamp, _, chat_id = cursor.partition("_")
+        if chat_id and not ObjectId.is_valid(chat_id):
+            raise ValueError(f"올바르지 않은 커서입니다: {cursor}")
+        if timestamp.isdigit():
+            return _EPOCH + timedelta(milliseconds=int(timestamp)), chat_id or None
+        return datetime.fromisoformat(timestamp), chat_id or None
 
-    def feedback(self, chat_id: str, is_good: bool) -> bool:
+    async def feedback(self, chat_id: str, is_good: bool) -> bool:
         """
         특정 채팅 답변에 대한 사용자 피드백을 처리합니다.
 
         이 메서드는 두 가지 주요 작업을 수행합니다:
         1. 채팅 문서 자체의 좋아요/싫어요 상태를 업데이트합니다.
         2. 해당 답변의 근거가 된 참조 문서들의 점수(likes/dislikes)를 조정합니다.
+           FeedbackBuffer가 있으면 카운터만 올리고 바로 반환하며, 벡터 DB에는 주기적으로 일괄 반영됩니다.
 
         Args:
             chat_id (str): 피드백을 적용할 채팅의 고유 ID.
@@ -131,12 +387,22 @@ class ChatService:
             bool: 피드백 처리 성공 여부.
         """
         # 1. MongoDB에서 해당 채팅의 피드백을 업데이트하고, 업데이트된 문서를 가져옵니다.
-        updated_chat_document = self.chat_repository.update_feedback(chat_id, is_good)
+        updated_chat_document = await self.chat_repository.aupdate_feedback(chat_id, is_good)
+        if updated_chat_document is None and self.write_queue is not None:
+            # 아직 write-behind 큐에서 저장되지 않은 대화일 수 있으므로 큐를 비운 뒤 다시 시도합니다.
+            await self.write_queue.flush(chat_id)
+            updated_chat_document = await self.chat_repository.aupdate_feedback(chat_id, is_good)
+        if updated_chat_document is None:
+            logger.info(f"피드백 대상 채팅을 찾지 못했습니다: {chat_id}")
+            return False
 
         # 2. 답변의 근거가 되었던 문서들의 소스 ID를 가져옵니다.
         source_ids = updated_chat_document["metadata"]["retrieved_source_ids"]
 
-        # 3. VectorDB(ChromaDB)에서 해당 소스 ID를 가진 문서들을 찾아 피드백 점수를 업데이트합니다.
-        self.vector_repository.find_by_source_id(source_id=source_ids, is_good=is_good)
+        # 3. 해당 소스 ID를 가진 문서들의 피드백 점수를 업데이트합니다.
+        if self.feedback_buffer is not None:
+            await self.feedback_buffer.record(source_ids, is_good)
+        else:
+            await self.vector_repository.afind_by_source_id(source_id=source_ids, is_good=is_good)
 
         return True
\ No newline at end of file
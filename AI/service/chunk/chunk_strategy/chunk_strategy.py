@@ -1,5 +1,6 @@
+import asyncio
 from abc import abstractmethod, ABC
-from typing import List
+from typing import AsyncIterator, List
 
 from langchain_core.documents import Document
 
@@ -16,4 +17,15 @@ class ChunkStrategy(ABC):
     @abstractmethod
     def split_documents(self, documents: List[Document]) -> List[Document]: #Document는 Langchain에서 제공하는 문서 클래스
         """주어진 문서 리스트를 특정 전략에 따라 청크 리스트로 분할합니다."""
-        pass
\ No newline at end of file
+        pass
+
+    async def astream_split(self, documents: List[Document]) -> AsyncIterator[List[Document]]:
+        """
+        문서를 분할하여 완료되는 순서대로(입력 순서 유지) 청크 묶음을 반환합니다. 이벤트 루프를 막지 않습니다.
+        기본 구현은 스레드에서 한 번에 분할합니다.
+        """
+        yield await asyncio.to_thread(self.split_documents, documents)
+
+    def close(self):
+        """전략이 사용하는 자원(예: 프로세스 풀)을 정리합니다. (lifespan 종료 시 호출)"""
+        pass
@@ -0,0 +1,107 @@
+import asyncio
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import AsyncIterator, Iterator, List, Optional
+
+from fastapi.logger import logger
+from langchain_core.documents import Document
+
+from service.chunk.chunk_strategy.chunk_strategy import ChunkStrategy
+
+# 워커 프로세스마다 한 번만 전달받아 사용하는 내부 청킹 전략
+_worker_strategy: Optional[ChunkStrategy] = None
+
+
+def _init_worker(strategy: ChunkStrategy):
+    global _worker_strategy
+    _worker_strategy = strategy
+
+
+def _split_shard(documents: List[Document]) -> List[Document]:
+    return _worker_strategy.split_documents(documents)
+
+
+class ParallelChunkStrategy(ChunkStrategy):
+    """
+    다른 청킹 전략을 프로세스 풀에서 병렬로 실행하는 전략입니다.
+
+    문서 리스트를 `shard_size`개씩 나누어 워커 프로세스에 분배하고, 결과는 입력 순서대로 이어 붙입니다.
+    청킹은 순수 파이썬 CPU 작업이므로 스레드 대신 프로세스를 사용해야 코어 수에 비례하여 빨라집니다.
+    분할 결과는 내부 전략과 같으며, 각 청크의 메타데이터(source_id 등)도 그대로 유지됩니다.
+    문서가 적으면 프로세스 간 전송 비용이 더 크므로 현재 프로세스에서 바로 분할합니다.
+    """
+
+    def __init__(self, chunk_strategy: ChunkStrategy, max_workers: Optional[int] = None, shard_size: int = 50):
+        """
+        ParallelChunkStrategy를 초기화합니다. 프로세스 풀은 처음 사용할 때 생성됩니다.
+
+        Args:
+            chunk_strategy (ChunkStrategy): 워커 프로세스에서 실행할 청킹 전략. (pickle 가능해야 함)
+            max_workers (Optional[int]): 워커 프로세스 수. 없으면 CPU 코어 수를 사용합니다.
+            shard_size (int): 워커 하나에 한 번에 넘길 문서 수.
+        """
+        self.chunk_strategy = chunk_strategy
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.shard_size = shard_size
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # 이벤트 루프/클라이언트 스레드가 있는 프로세스를 fork하지 않도록 spawn 사용
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self.chunk_strategy,),
+            )
+            logger.info(f"✅ 청킹 프로세스 풀 생성 완료 (워커 {self.max_workers}개)")
+        return self._executor
+
+    def _shards(self, documents: List[Document]) -> Iterator[List[Document]]:
+        for start in range(0, len(documents), self.shard_size):
+            yield documents[start:start + self.shard_size]
+
+    def split_documents(self, documents: List[Document]) -> List[Document]:
+        """
+        문서를 샤드로 나누어 워커 프로세스에서 분할하고, 입력 순서대로 합쳐 반환합니다.
+
+        Args:
+            documents (List[Document]): 분할할 Langchain Document 객체의 리스트.
+
+        Returns:
+            List[Document]: 분할된 청크(Document 객체)의 리스트.
+        """
+        if len(documents) <= self.shard_size:
+            return self.chunk_strategy.split_documents(documents)
+        return [chunk for chunks in self.executor.map(_split_shard, self._shards(documents)) for chunk in chunks]
+
+    async def astream_split(self, documents: List[Document]) -> AsyncIterator[List[Document]]:
+        """
+        샤드를 워커 프로세스에 분배하고, 앞 샤드부터 분할이 끝나는 대로 청크 묶음을 반환합니다. (입력 순서 유지)
+        동시에 처리 중인 샤드는 워커 수의 두 배로 제한하여 결과가 메모리에 쌓이지 않도록 합니다.
+        """
+        if len(documents) <= self.shard_size:
+            yield await asyncio.to_thread(self.chunk_strategy.split_documents, documents)
+            return
+
+        loop = asyncio.get_running_loop()
+        shards = self._shards(documents)
+        pending: deque[asyncio.Future] = deque()
+        try:
+            for shard in shards:
+                pending.append(loop.run_in_executor(self.executor, _split_shard, shard))
+                if len(pending) >= self.max_workers * 2:
+                    yield await pending.popleft()
+            while pending:
+                yield await pending.popleft()
+        finally:
+            for future in pending:
+                future.cancel()
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
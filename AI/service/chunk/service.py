@@ -1,4 +1,4 @@
-from typing import List
+from typing import AsyncIterator, List
 
 from fastapi.logger import logger
 from langchain_core.documents import Document
@@ -33,3 +33,16 @@ class ChunkService:
         logger.info("--- 문서 처리 및 청킹 시작 ---")
         chunks = self.chunk_strategy.split_documents(documents)
         return chunks
+
+    async def astream_split(self, documents: List[Document]) -> AsyncIterator[List[Document]]:
+        """
+        문서 리스트를 분할하여 완료되는 순서대로(입력 순서 유지) 청크 묶음을 반환합니다. 이벤트 루프를 막지 않습니다.
+
+        Args:
+            documents (List[Document]): 분할할 Langchain Document 객체의 리스트.
+
+        Returns:
+            AsyncIterator[List[Document]]: 분할된 청크 묶음.
+        """
+        async for chunks in self.chunk_strategy.astream_split(documents):
+            yield chunks
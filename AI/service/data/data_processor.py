@@ -1,15 +1,108 @@
+import codecs
+import hashlib
 import json
 import os
-from typing import List, Dict
+from itertools import islice
+from typing import BinaryIO, List, Dict, Iterable, Iterator
 
+import openpyxl
 import pandas as pd
+from fastapi.logger import logger
 from langchain_core.documents import Document
 
 
 class DataProcessor:
 
+    @staticmethod
+    def make_chunk_id(source_id: str, content: str) -> str:
+        """
+        청크의 출처(source_id)와 내용으로 고유하고 안정적인 청크 ID를 생성합니다.
+
+        같은 출처의 같은 내용은 항상 같은 ID를 가지므로, 재수집 시 변경 여부를 비교하는 데 사용합니다.
+
+        Args:
+            source_id (str): 청크의 출처 식별자 (예: "profile.txt::3").
+            content (str): 청크 본문(page_content).
+
+        Returns:
+            str: SHA-256 해시 기반 청크 ID.
+        """
+        return hashlib.sha256(f"{source_id}\x00{content}".encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def get_chunk_id(doc: Document) -> str:
+        """
+        문서의 청크 ID를 반환합니다. metadata에 `chunk_id`가 없으면 출처(source_id)와 내용으로 생성합니다.
+
+        Args:
+            doc (Document): 청크 ID를 구할 Document.
+
+        Returns:
+            str: 청크 ID.
+        """
+        return doc.metadata.get("chunk_id") or DataProcessor.make_chunk_id(doc.metadata.get("source_id", ""), doc.page_content)
+
+    def assign_chunk_ids(self, chunks: List[Document]) -> List[Document]:
+        """
+        각 청크의 metadata에 내용 기반 `chunk_id`를 부여하고, 같은 ID를 가진 중복 청크는 제거합니다.
+
+        Args:
+            chunks (List[Document]): 청킹이 끝난 Document 리스트.
+
+        Returns:
+            List[Document]: `chunk_id`가 부여된 중복 없는 Document 리스트 (입력 순서 유지).
+        """
+        unique_chunks = {}
+        for chunk in chunks:
+            chunk_id = self.make_chunk_id(chunk.metadata.get("source_id", ""), chunk.page_content)
+            if chunk_id in unique_chunks:
+                continue
+            # 청킹 시 원본 문서의 metadata dict가 공유될 수 있으므로 복사 후 ID를 기록
+            chunk.metadata = {**chunk.metadata, "chunk_id": chunk_id}
+            unique_chunks[chunk_id] = chunk
+        return list(unique_chunks.values())
+
+    @staticmethod
+    def iter_paragraphs(lines: Iterable[str]) -> Iterator[str]:
+        """
+        줄 단위 입력에서 빈 줄('\n\n')로 구분된 문단을 하나씩 반환합니다. 파일 전체를 메모리에 올리지 않습니다.
+
+        Args:
+            lines (Iterable[str]): 줄바꿈 문자를 포함한 줄 단위 입력 (예: 텍스트 파일 객체).
+
+        Returns:
+            Iterator[str]: 앞뒤 공백이 제거된 비어 있지 않은 문단.
+        """
+        buffer: List[str] = []
+        for line in lines:
+            if line == "\n":  # 빈 줄: 직전 줄의 줄바꿈과 합쳐 '\n\n'이 되므로 문단 경계
+                paragraph = "".join(buffer).strip()
+                if paragraph:
+                    yield paragraph
+                buffer = []
+            else:
+                buffer.append(line)
+        paragraph = "".join(buffer).strip()
+        if paragraph:
+            yield paragraph
+
+    @staticmethod
+    def iter_qa_jsonl(lines: Iterable[str]) -> Iterator[Dict[str, str]]:
+        """
+        JSONL 입력을 한 줄씩 파싱하여 QA 딕셔너리를 하나씩 반환합니다. 빈 줄은 건너뜁니다.
+
+        Args:
+            lines (Iterable[str]): JSONL 형식의 줄 단위 입력 (예: 텍스트 파일 객체).
+
+        Returns:
+            Iterator[Dict[str, str]]: 'question'과 'answer' 키를 포함하는 딕셔너리.
+        """
+        for line in lines:
+            if line.strip():
+                yield json.loads(line)
+
     def process_paragraphs(
-        self, paragraphs: List[str], source_identifier: str
+        self, paragraphs: List[str], source_identifier: str, start_index: int = 0
     ) -> List[Document]:
         """
         주어진 문단 리스트를 Langchain Document 객체 리스트로 변환합니다.
@@ -19,13 +112,14 @@ class DataProcessor:
         Args:
             paragraphs (List[str]): 변환할 문단들의 리스트.
             source_identifier (str): 데이터의 출처 식별자(파일명).
+            start_index (int): 첫 문단의 순번. 배치 단위로 나누어 변환할 때 source_id가 이어지도록 사용합니다.
 
         Returns:
             List[Document]: 메타데이터가 포함된 Langchain Document 객체의 리스트.
         """
 
         documents = []
-        for i, p_text in enumerate(paragraphs):
+        for i, p_text in enumerate(paragraphs, start=start_index):
             doc = Document(
                 page_content=p_text,
                 metadata={
@@ -40,7 +134,7 @@ class DataProcessor:
 
 
     def process_qa_json(
-                self, qa_data: List[Dict[str, str]], source_identifier: str
+                self, qa_data: List[Dict[str, str]], source_identifier: str, start_index: int = 0
     ) -> List[Document]:
         """
         QA 딕셔너리 리스트를 Langchain Document 객체 리스트로 변환합니다.
@@ -51,12 +145,13 @@ class DataProcessor:
             qa_data (List[Dict[str, str]]): 'question'과 'answer' 키를 포함하는 딕셔너리의 리스트.
                 예: [{"question": "이름이 무엇인가요?", "answer": "..."}]
             source_identifier (str): 데이터의 출처 식별자 (파일명).
+            start_index (int): 첫 QA의 순번. 배치 단위로 나누어 변환할 때 source_id가 이어지도록 사용합니다.
 
         Returns:
             List[Document]: 변환된 Langchain Document 객체의 리스트.
         """
         documents = []
-        for i, item in enumerate(qa_data):
+        for i, item in enumerate(qa_data, start=start_index):
             doc = Document(
                 page_content=item["question"],
                 metadata={
@@ -71,6 +166,9 @@ class DataProcessor:
         return documents
 
 
+    QA_QUESTION_COLUMN = "질문"
+    QA_ANSWER_COLUMN = "답변"
+
     def qa_to_jsonl(
             self,
             input_file_path: str,
@@ -80,7 +178,7 @@ class DataProcessor:
         Excel(.xlsx) 또는 CSV(.csv) 파일을 JSONL 형식으로 변환합니다.
 
         파일 내 '질문'과 '답변' 열을 추출하여 각 행을 하나의 JSON 객체로 만듭니다.
-        '질문' 또는 '답변'이 비어있는 행은 결과에서 제외됩니다.
+        '질문' 또는 '답변'이 비어있는 행은 결과에서 제외됩니다. 변환은 `iter_qa_jsonl_chunks`로 청크 단위로 수행합니다.
 
         결과 포맷 예시:
             {"question": "이름이 무엇입니까?", "answer": "권하림입니다."}
@@ -97,55 +195,139 @@ class DataProcessor:
             RuntimeError: 파일을 읽거나 쓰는 과정에서 예측하지 못한 오류가 발생할 경우.
 
         """
-        
-        question_column = "질문"
-        answer_column = "답변"
-
-
         if not os.path.exists(input_file_path):
             raise FileNotFoundError(f"입력 파일을 찾을 수 없습니다: {input_file_path}")
 
         file_extension = os.path.splitext(input_file_path)[1].lower()
-        try:
-            if file_extension == ".xlsx":
-                df = pd.read_excel(input_file_path)
-            elif file_extension == ".csv":
-                try:
-                    df = pd.read_csv(input_file_path, encoding="utf-8-sig")
-                except UnicodeDecodeError:
-                    df = pd.read_csv(input_file_path, encoding="cp949")
-            else:
-                raise ValueError(
-                    f"지원하지 않는 파일 형식입니다: {file_extension}. (.xlsx 또는 .csv 파일만 지원)"
-                )
-        except Exception as e:
-            # 구체적인 오류를 로깅하거나 처리할 수 있습니다.
-            raise RuntimeError(f"파일을 읽는 중 오류가 발생했습니다: {e}")
-
-        if question_column not in df.columns or answer_column not in df.columns:
+        count = 0
+        with open(input_file_path, "rb") as source:
+            chunks = self.iter_qa_jsonl_chunks(source, file_extension)
+            try:
+                with open(output_file_path, "w", encoding="utf-8") as f:
+                    for chunk in chunks:
+                        f.write(chunk)
+                        count += chunk.count("\n")
+            except IOError as e:
+                raise RuntimeError(f"파일을 저장하는 중 오류가 발생했습니다: {e}")
+        return count
+
+    def iter_qa_jsonl_chunks(
+            self,
+            source: BinaryIO,
+            file_extension: str,
+            chunk_size: int = 1000,
+    ) -> Iterator[str]:
+        """
+        Excel(.xlsx) 또는 CSV(.csv) 파일을 `chunk_size`행씩 읽어 JSONL 문자열로 변환합니다.
+        파일 전체를 메모리에 올리거나 임시 파일에 쓰지 않으므로 큰 파일도 일정한 메모리로 변환합니다.
+
+        - CSV: 파일 전체를 블록 단위로 한 번 디코딩해 인코딩(utf-8 / cp949)을 확인한 뒤 `pd.read_csv(chunksize=...)`로 나누어 읽습니다.
+        - XLSX: openpyxl read-only 모드로 첫 번째 시트를 한 행씩 읽습니다.
+        빈 값 제거와 앞뒤 공백 제거는 청크 단위 pandas 문자열 연산으로 처리합니다.
+
+        Args:
+            source (BinaryIO): 원본 파일 객체 (바이너리, 탐색 가능해야 함).
+            file_extension (str): 파일 확장자 ('.xlsx' | '.csv').
+            chunk_size (int): 한 번에 변환할 행 수.
+
+        Returns:
+            Iterator[str]: 청크마다 여러 줄의 JSONL 문자열. (행이 모두 비어 있는 청크는 빈 문자열)
+
+        Raises:
+            ValueError: 지원하지 않는 파일 형식이거나, 인코딩을 확인할 수 없거나, 필수 컬럼('질문', '답변')이 없을 경우. (첫 청크를 읽을 때 발생)
+            RuntimeError: 파일을 읽는 과정에서 예측하지 못한 오류가 발생할 경우.
+                          첫 청크 이후에 발생하면 이미 전송된 응답이 중단되므로 오류를 기록한 뒤 전달합니다.
+        """
+        file_extension = file_extension.lower()
+        if file_extension == ".csv":
+            frames = self._iter_csv_frames(source, chunk_size)
+        elif file_extension == ".xlsx":
+            frames = self._iter_xlsx_frames(source, chunk_size)
+        else:
             raise ValueError(
-                f"필수 컬럼('{question_column}', '{answer_column}')이 데이터에 없습니다. 현재 컬럼: {df.columns.tolist()}"
+                f"지원하지 않는 파일 형식입니다: {file_extension}. (.xlsx 또는 .csv 파일만 지원)"
             )
 
-        jsonl_data = []
-        for index, row in df.iterrows():
-            if (
-                    pd.isna(row[question_column])
-                    or not str(row[question_column]).strip()
-                    or pd.isna(row[answer_column])
-                    or not str(row[answer_column]).strip()
-            ):
-                continue
-            question = str(row[question_column]).strip()
-            answer = str(row[answer_column]).strip()
-            json_entry = {"question": question, "answer": answer}
-            jsonl_data.append(json_entry)
+        columns_checked = False
+        while True:
+            try:
+                frame = next(frames, None)
+            except ValueError:
+                if columns_checked:
+                    logger.error("🚨 QA 파일 변환 중 오류가 발생하여 응답을 중단합니다.", exc_info=True)
+                raise
+            except Exception as e:
+                if columns_checked:
+                    logger.error(f"🚨 QA 파일 변환 중 오류가 발생하여 응답을 중단합니다: {e}")
+                raise RuntimeError(f"파일을 읽는 중 오류가 발생했습니다: {e}")
+            if frame is None:
+                if not columns_checked:
+                    raise ValueError("파일에 헤더 행이 없습니다.")
+                return
+            if not columns_checked:
+                missing = {self.QA_QUESTION_COLUMN, self.QA_ANSWER_COLUMN} - set(frame.columns)
+                if missing:
+                    raise ValueError(
+                        f"필수 컬럼('{self.QA_QUESTION_COLUMN}', '{self.QA_ANSWER_COLUMN}')이 데이터에 없습니다. 현재 컬럼: {frame.columns.tolist()}"
+                    )
+                columns_checked = True
+            yield self._qa_frame_to_jsonl(frame)
+
+    def _qa_frame_to_jsonl(self, frame: pd.DataFrame) -> str:
+        """'질문'/'답변'이 비어 있지 않은 행만 남겨 JSONL 문자열로 변환합니다. (행 단위 반복 없이 열 단위로 처리)"""
+        questions = frame[self.QA_QUESTION_COLUMN]
+        answers = frame[self.QA_ANSWER_COLUMN]
+        present = questions.notna() & answers.notna()
+        questions = questions[present].astype(str).str.strip()
+        answers = answers[present].astype(str).str.strip()
+        non_empty = (questions != "") & (answers != "")
+        return "".join(
+            json.dumps({"question": question, "answer": answer}, ensure_ascii=False) + "\n"
+            for question, answer in zip(questions[non_empty].tolist(), answers[non_empty].tolist())
+        )
 
+    @staticmethod
+    def _detect_csv_encoding(source: BinaryIO, block_size: int = 1024 * 1024) -> str:
+        """
+        파일 전체가 utf-8로 읽히면 utf-8-sig, 아니면 cp949로 판단합니다. (기존 utf-8-sig -> cp949 재시도 규칙과 동일)
+        응답을 보내기 시작한 뒤에 인코딩 오류가 나지 않도록 파일 전체를 블록 단위로 디코딩해 확인합니다. (메모리에 올리지 않음)
+
+        Raises:
+            ValueError: utf-8과 cp949 모두로 읽을 수 없는 경우.
+        """
+        position = source.tell()
         try:
-            with open(output_file_path, "w", encoding="utf-8") as f:
-                for entry in jsonl_data:
-                    f.write(json.dumps(entry, ensure_ascii=False) + "\n")
-        except IOError as e:
-            raise RuntimeError(f"파일을 저장하는 중 오류가 발생했습니다: {e}")
+            for encoding in ("utf-8-sig", "cp949"):
+                source.seek(position)
+                decoder = codecs.getincrementaldecoder(encoding)()
+                try:
+                    while block := source.read(block_size):
+                        decoder.decode(block)
+                    decoder.decode(b"", final=True)
+                    return encoding
+                except UnicodeDecodeError:
+                    continue
+            raise ValueError("파일 인코딩을 확인할 수 없습니다. UTF-8 또는 CP949로 저장된 CSV 파일만 지원합니다.")
+        finally:
+            source.seek(position)
 
-        return len(jsonl_data)
\ No newline at end of file
+    def _iter_csv_frames(self, source: BinaryIO, chunk_size: int) -> Iterator[pd.DataFrame]:
+        encoding = self._detect_csv_encoding(source)
+        # 문자열로 읽어 숫자 형태의 답변이 1.0처럼 바뀌지 않도록 함
+        with pd.read_csv(source, encoding=encoding, dtype=str, chunksize=chunk_size) as reader:
+            yield from reader
+
+    @staticmethod
+    def _iter_xlsx_frames(source: BinaryIO, chunk_size: int) -> Iterator[pd.DataFrame]:
+        workbook = openpyxl.load_workbook(source, read_only=True, data_only=True)
+        try:
+            rows = workbook.worksheets[0].iter_rows(values_only=True)
+            header = next(rows, None)
+            if header is None:
+                return
+            columns = [str(cell).strip() if cell is not None else f"Unnamed: {i}" for i, cell in enumerate(header)]
+            yield pd.DataFrame(columns=columns)  # 헤더만으로 필수 컬럼을 먼저 확인
+            while batch := list(islice(rows, chunk_size)):
+                yield pd.DataFrame([row[:len(columns)] for row in batch], columns=columns)
+        finally:
+            workbook.close()
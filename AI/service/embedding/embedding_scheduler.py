@@ -0,0 +1,224 @@
+import asyncio
+import random
+import time
+from typing import List, Optional, Callable, Awaitable
+
+from fastapi.logger import logger
+
+from service.embedding.embedding_strategy.embedding_strategy import EmbeddingStrategy
+
+# 재시도 대상이 되는 HTTP 상태 코드 (요청 한도 초과 및 일시적인 서버 오류)
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+# 상태 코드를 알 수 없는 예외에서 재시도 여부를 판단하기 위한 메시지 키워드
+RETRYABLE_MESSAGE_KEYWORDS = ("429", "RESOURCE_EXHAUSTED", "quota", "rate limit", "500", "502", "503", "504", "UNAVAILABLE", "DEADLINE_EXCEEDED")
+RATE_LIMIT_MESSAGE_KEYWORDS = ("429", "RESOURCE_EXHAUSTED", "quota", "rate limit")
+
+
+class TokenBucket:
+    """
+    분당 요청 수(RPM)를 제한하기 위한 비동기 토큰 버킷입니다.
+
+    토큰은 시간에 비례하여 채워지며, 요청 한 번마다 토큰 하나를 소비합니다.
+    토큰이 없으면 다음 토큰이 채워질 때까지 대기합니다.
+    """
+
+    def __init__(self, requests_per_minute: int, capacity: Optional[int] = None):
+        """
+        Args:
+            requests_per_minute (int): 분당 허용 요청 수.
+            capacity (Optional[int]): 한 번에 몰아서 사용할 수 있는 최대 토큰 수. 없으면 동시 요청 수 수준으로 작게 잡습니다.
+        """
+        self.rate = requests_per_minute / 60.0  # 초당 채워지는 토큰 수
+        self.capacity = capacity or max(1, min(requests_per_minute, 5))
+        self._tokens = float(self.capacity)
+        self._updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        """토큰 하나를 얻을 때까지 대기합니다."""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+                self._updated_at = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class EmbeddingScheduler:
+    """
+    문서 수집(Ingestion) 시 대량의 텍스트를 임베딩하는 스케줄러입니다.
+
+    - 토큰 버킷으로 제공자의 분당 요청 한도(RPM)에 맞춰 요청 속도를 조절합니다.
+    - 세마포어로 동시에 진행 중인 배치 수를 제한합니다.
+    - 429/5xx 오류는 지터(jitter)가 적용된 지수 백오프로 재시도합니다.
+    - 요청 한도 초과 시 배치 크기를 줄이고, 연속으로 성공하면 다시 늘리는 적응형 배치 크기를 사용합니다.
+
+    고정된 `time.sleep(5)` 대신 실제 할당량에 맞춰 최대한 빠르게 임베딩합니다.
+    """
+
+    def __init__(
+            self,
+            embedding_strategy: EmbeddingStrategy,
+            requests_per_minute: int = 60,
+            max_concurrency: int = 4,
+            batch_size: int = 50,
+            min_batch_size: int = 5,
+            max_batch_size: int = 100,
+            max_retries: int = 5,
+            base_delay: float = 1.0,
+            max_delay: float = 60.0,
+    ):
+        """
+        EmbeddingScheduler를 초기화합니다.
+
+        Args:
+            embedding_strategy (EmbeddingStrategy): 실제 배치 임베딩을 수행할 전략 객체.
+            requests_per_minute (int): 분당 허용 요청(배치) 수.
+            max_concurrency (int): 동시에 진행할 수 있는 최대 배치 수.
+            batch_size (int): 시작 배치 크기.
+            min_batch_size (int): 적응형 배치 크기의 하한.
+            max_batch_size (int): 적응형 배치 크기의 상한.
+            max_retries (int): 배치당 최대 재시도 횟수.
+            base_delay (float): 백오프 기본 지연 시간(초).
+            max_delay (float): 백오프 최대 지연 시간(초).
+        """
+        self.embedding_strategy = embedding_strategy
+        self.bucket = TokenBucket(requests_per_minute, capacity=max_concurrency)
+        self.max_concurrency = max_concurrency
+        self.min_batch_size = min_batch_size
+        self.max_batch_size = max_batch_size
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+        self._batch_size = max(min_batch_size, min(batch_size, max_batch_size))
+        self._success_streak = 0
+
+    @property
+    def batch_size(self) -> int:
+        """현재 적응형 배치 크기를 반환합니다."""
+        return self._batch_size
+
+    async def embed_documents(
+            self,
+            texts: List[str],
+            on_batch: Optional[Callable[[int, int, List[List[float]]], Awaitable[None]]] = None,
+    ) -> List[List[float]]:
+        """
+        텍스트 목록을 배치로 나누어 동시에 임베딩합니다. 결과 순서는 입력 순서와 동일합니다.
+
+        Args:
+            texts (List[str]): 임베딩할 텍스트 목록.
+            on_batch (Optional[Callable]): 배치 하나가 끝날 때마다 (시작 인덱스, 끝 인덱스, 임베딩 목록)으로 호출되는 콜백.
+                                           임베딩이 끝난 배치를 바로 저장하는 등 다음 단계와 겹쳐 실행할 때 사용합니다.
+
+        Returns:
+            List[List[float]]: 각 텍스트에 대한 임베딩 벡터의 리스트.
+        """
+        results: List[Optional[List[float]]] = [None] * len(texts)
+        if not texts:
+            return []
+
+        logger.info(f"--- 임베딩 스케줄러: {len(texts)}개 문서 임베딩 시작 (동시 배치 {self.max_concurrency}개) ---")
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        tasks: List[asyncio.Task] = []
+        offset = 0
+
+        try:
+            while offset < len(texts):
+                await semaphore.acquire()
+                # 배치 크기는 슬롯이 생길 때마다 현재 적응형 크기로 결정
+                start, end = offset, min(offset + self._batch_size, len(texts))
+                offset = end
+                tasks.append(asyncio.create_task(
+                    self._run_batch(texts, start, end, results, semaphore, on_batch)
+                ))
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+
+        logger.info(f"--- 임베딩 스케줄러: {len(texts)}개 문서 임베딩 완료 ---")
+        return results
+
+    async def _run_batch(
+            self,
+            texts: List[str],
+            start: int,
+            end: int,
+            results: List[Optional[List[float]]],
+            semaphore: asyncio.Semaphore,
+            on_batch: Optional[Callable[[int, int, List[List[float]]], Awaitable[None]]],
+    ):
+        try:
+            embeddings = await self._embed_with_retry(texts[start:end])
+            results[start:end] = embeddings
+            logger.info(f"--- 임베딩 처리 완료: {start + 1} ~ {end} / {len(texts)} ---")
+            if on_batch is not None:
+                await on_batch(start, end, embeddings)
+        finally:
+            semaphore.release()
+
+    async def _embed_with_retry(self, batch: List[str]) -> List[List[float]]:
+        """배치 하나를 임베딩하며, 재시도 가능한 오류는 지터가 적용된 지수 백오프로 재시도합니다."""
+        for attempt in range(self.max_retries + 1):
+            await self.bucket.acquire()
+            try:
+                embeddings = await self.embedding_strategy.aembed_documents(batch)
+                self._on_success()
+                return embeddings
+            except Exception as e:
+                if attempt >= self.max_retries or not self._is_retryable(e):
+                    raise
+                if self._is_rate_limited(e):
+                    self._on_rate_limited()
+                # Full jitter: 0 ~ min(최대 지연, 기본 지연 * 2^시도 횟수) 사이에서 임의로 대기
+                delay = random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+                logger.info(f"⚠️ 임베딩 요청 실패({e}), {delay:.1f}초 후 재시도합니다. ({attempt + 1}/{self.max_retries})")
+                await asyncio.sleep(delay)
+
+    def _on_success(self):
+        """연속 성공 시 배치 크기를 조금씩 늘립니다. (가산 증가)"""
+        self._success_streak += 1
+        if self._success_streak >= self.max_concurrency and self._batch_size < self.max_batch_size:
+            self._batch_size = min(self.max_batch_size, self._batch_size + self.min_batch_size)
+            self._success_streak = 0
+
+    def _on_rate_limited(self):
+        """요청 한도 초과 시 배치 크기를 절반으로 줄입니다. (승산 감소)"""
+        self._success_streak = 0
+        self._batch_size = max(self.min_batch_size, self._batch_size // 2)
+        logger.info(f"--- 요청 한도 초과로 배치 크기를 {self._batch_size}로 줄입니다. ---")
+
+    @staticmethod
+    def _status_code(error: Exception) -> Optional[int]:
+        """예외 객체에서 HTTP 상태 코드를 추출합니다. (google.api_core 예외의 code, httpx 계열의 status_code 등)"""
+        for attr in ("code", "status_code"):
+            value = getattr(error, attr, None)
+            if callable(value):
+                try:
+                    value = value()
+                except Exception:
+                    value = None
+            value = getattr(value, "value", value)  # grpc StatusCode 등 Enum 대응
+            if isinstance(value, int):
+                return value
+        return None
+
+    def _is_retryable(self, error: Exception) -> bool:
+        status = self._status_code(error)
+        if status is not None:
+            return status in RETRYABLE_STATUS_CODES
+        message = str(error)
+        return any(keyword in message for keyword in RETRYABLE_MESSAGE_KEYWORDS)
+
+    def _is_rate_limited(self, error: Exception) -> bool:
+        status = self._status_code(error)
+        if status is not None:
+            return status == 429
+        message = str(error)
+        return any(keyword in message for keyword in RATE_LIMIT_MESSAGE_KEYWORDS)
@@ -0,0 +1,152 @@
+from collections import OrderedDict
+from threading import Lock
+from typing import List, Optional, Dict
+
+import numpy as np
+from fastapi.logger import logger
+from redis.asyncio import Redis
+
+from service.embedding.embedding_strategy.embedding_strategy import EmbeddingStrategy
+from utils.text_normalizer import text_hash
+
+
+class CachedEmbedding(EmbeddingStrategy):
+    """
+    다른 임베딩 전략을 감싸 질문(쿼리) 임베딩 결과를 캐싱하는 데코레이터 전략입니다.
+
+    조회 순서는 다음과 같습니다.
+    1. 프로세스 내부 LRU 캐시 (네트워크 호출 없음)
+    2. Redis 공유 캐시 (여러 워커/재시작 간 공유, `모델명 + 정규화된 질문 해시`를 키로 사용)
+    3. 실제 임베딩 전략 호출 (예: Google Gemini API)
+
+    문서 임베딩(embed_documents)은 반복되지 않으므로 캐싱하지 않고 그대로 위임합니다.
+    """
+
+    def __init__(
+            self,
+            embedding_strategy: EmbeddingStrategy,
+            model_name: str,
+            redis_client: Optional[Redis] = None,
+            max_size: int = 1024,
+            ttl_seconds: int = 60 * 60 * 24 * 7,
+    ):
+        """
+        CachedEmbedding을 초기화합니다.
+
+        Args:
+            embedding_strategy (EmbeddingStrategy): 실제 임베딩을 수행할 전략 객체.
+            model_name (str): 캐시 키에 포함할 임베딩 모델 이름. 모델이 바뀌면 캐시도 자동으로 분리됩니다.
+            redis_client (Optional[Redis]): 공유 캐시로 사용할 Redis 클라이언트. 없으면 로컬 LRU만 사용합니다.
+            max_size (int): 로컬 LRU 캐시에 보관할 최대 임베딩 개수.
+            ttl_seconds (int): Redis 공유 캐시에 저장된 임베딩의 만료 시간(초).
+        """
+        self._inner = embedding_strategy
+        self.model_name = model_name
+        self._redis = redis_client
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+
+        self._local: "OrderedDict[str, List[float]]" = OrderedDict()
+        # 동기 경로(embed_query)는 스레드풀에서 호출될 수 있으므로 Lock으로 보호
+        self._local_lock = Lock()
+
+        # 캐시 적중/실패 카운터
+        self.local_hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+
+    def _cache_key(self, text: str) -> str:
+        """모델명과 정규화된 질문의 해시로 캐시 키를 생성합니다."""
+        return f"emb_cache:{self.model_name}:{text_hash(text)}"
+
+    def _get_local(self, key: str) -> Optional[List[float]]:
+        with self._local_lock:
+            vector = self._local.get(key)
+            if vector is not None:
+                self._local.move_to_end(key)  # 최근 사용으로 갱신
+            return vector
+
+    def _put_local(self, key: str, vector: List[float]):
+        with self._local_lock:
+            self._local[key] = vector
+            self._local.move_to_end(key)
+            while len(self._local) > self.max_size:
+                self._local.popitem(last=False)  # 가장 오래 사용되지 않은 항목 제거
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """문서 임베딩은 캐싱하지 않고 내부 전략에 그대로 위임합니다."""
+        return self._inner.embed_documents(texts)
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        """문서 임베딩은 캐싱하지 않고 내부 전략에 그대로 위임합니다."""
+        return await self._inner.aembed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        """
+        동기 경로에서는 로컬 LRU 캐시만 확인한 뒤 내부 전략을 호출합니다.
+        (Redis 클라이언트가 비동기 클라이언트이므로 공유 캐시는 aembed_query에서만 사용합니다.)
+        """
+        key = self._cache_key(text)
+        vector = self._get_local(key)
+        if vector is not None:
+            self.local_hits += 1
+            return vector
+
+        self.misses += 1
+        vector = self._inner.embed_query(text)
+        self._put_local(key, vector)
+        return vector
+
+    async def aembed_query(self, text: str) -> List[float]:
+        """
+        로컬 LRU → Redis 공유 캐시 → 내부 전략 순서로 질문 임베딩을 조회합니다.
+
+        Args:
+            text (str): 임베딩할 질문.
+
+        Returns:
+            List[float]: 질문의 임베딩 벡터.
+        """
+        key = self._cache_key(text)
+        vector = self._get_local(key)
+        if vector is not None:
+            self.local_hits += 1
+            return vector
+
+        if self._redis is not None:
+            try:
+                cached = await self._redis.get(key)
+                if cached is not None:
+                    vector = np.frombuffer(cached, dtype=np.float32).tolist()
+                    self.shared_hits += 1
+                    self._put_local(key, vector)
+                    return vector
+            except Exception as e:
+                logger.info(f"Redis 임베딩 캐시 조회 오류: {e}")
+
+        self.misses += 1
+        vector = await self._inner.aembed_query(text)
+        self._put_local(key, vector)
+
+        if self._redis is not None:
+            try:
+                await self._redis.set(key, np.array(vector, dtype=np.float32).tobytes(), ex=self.ttl_seconds)
+            except Exception as e:
+                logger.info(f"Redis 임베딩 캐시 저장 오류: {e}")
+        return vector
+
+    def get_stats(self) -> Dict[str, int | float]:
+        """
+        캐시 적중/실패 통계를 반환합니다.
+
+        Returns:
+            Dict[str, int | float]: 로컬/공유 캐시 적중 수, 실패 수, 적중률, 현재 로컬 캐시 크기.
+        """
+        total = self.local_hits + self.shared_hits + self.misses
+        return {
+            "local_hits": self.local_hits,
+            "shared_hits": self.shared_hits,
+            "misses": self.misses,
+            "hit_rate": (self.local_hits + self.shared_hits) / total if total else 0.0,
+            "local_size": len(self._local),
+        }
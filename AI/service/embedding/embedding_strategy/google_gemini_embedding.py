@@ -33,6 +33,7 @@ class GoogleGeminiEmbedding(EmbeddingStrategy):
         주어진 텍스트 목록(문서들)을 임베딩 벡터 리스트로 변환합니다.
 
         Google API의 분당 요청 제한(QPM)을 고려하여 일정 크기(batch_size)로 나누어 요청하고 중간에 지연 시간(sleep)을 줍니다.
+        문서 수집 시에는 속도 제한과 재시도를 관리하는 EmbeddingScheduler가 `aembed_documents`를 사용합니다.
 
         Args:
             texts (List[str]): 임베딩을 수행할 텍스트(문서)의 리스트.
@@ -72,4 +73,31 @@ class GoogleGeminiEmbedding(EmbeddingStrategy):
             List[float]: 입력된 텍스트에 대한 임베딩 벡터.
         """
         logger.info(f"--- Google Gemini로 쿼리 임베딩 중: '{text}' ---")
-        return self._engine.embed_query(text)
\ No newline at end of file
+        return self._engine.embed_query(text)
+
+    async def aembed_query(self, text: str) -> List[float]:
+        """
+        단일 문장을 비동기로 임베딩합니다. 채팅 요청 경로에서 이벤트 루프를 막지 않도록 사용합니다.
+
+        Args:
+            text (str): 임베딩을 수행할 단일 문장(사용자의 질문)
+
+        Returns:
+            List[float]: 입력된 텍스트에 대한 임베딩 벡터.
+        """
+        logger.info(f"--- Google Gemini로 쿼리 비동기 임베딩 중: '{text}' ---")
+        return await self._engine.aembed_query(text)
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        """
+        주어진 텍스트 목록을 한 번의 요청으로 비동기 임베딩합니다.
+
+        배치 분할, 요청 속도 제한, 재시도는 호출하는 쪽(EmbeddingScheduler)에서 관리합니다.
+
+        Args:
+            texts (List[str]): 임베딩을 수행할 텍스트(문서)의 리스트.
+
+        Returns:
+            List[List[float]]: 각 텍스트에 대한 임베딩 벡터의 리스트.
+        """
+        return await self._engine.aembed_documents(texts)
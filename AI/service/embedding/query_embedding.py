@@ -0,0 +1,58 @@
+import asyncio
+from typing import List, Optional
+
+import numpy as np
+
+from service.embedding.embedding_strategy.embedding_strategy import EmbeddingStrategy
+
+
+class QueryEmbedding:
+    """
+    한 번의 채팅 요청 안에서 질문 임베딩을 공유하기 위한 요청 단위 컨텍스트입니다.
+
+    캐시 조회, 벡터 검색, 캐시 저장이 모두 같은 질문 벡터를 필요로 하므로,
+    처음 요청될 때 한 번만 임베딩을 계산하고 이후에는 계산된 벡터를 재사용합니다.
+    임베딩은 실제로 필요해질 때까지 계산하지 않으므로(지연 계산) 임베딩이 필요 없는 경로에서는 비용이 들지 않습니다.
+    """
+
+    def __init__(self, text: str, embedding_strategy: EmbeddingStrategy):
+        """
+        QueryEmbedding을 초기화합니다.
+
+        Args:
+            text (str): 임베딩할 사용자의 질문.
+            embedding_strategy (EmbeddingStrategy): 질문을 임베딩할 때 사용할 임베딩 전략.
+        """
+        self.text = text
+        self._embedding_strategy = embedding_strategy
+        self._vector: Optional[List[float]] = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def is_computed(self) -> bool:
+        """임베딩이 이미 계산되었는지 여부를 반환합니다."""
+        return self._vector is not None
+
+    async def aget(self) -> List[float]:
+        """
+        질문 임베딩을 반환합니다. 아직 계산되지 않았다면 한 번만 계산합니다.
+        동시에 여러 곳에서 호출되어도 Lock으로 중복 계산을 막습니다.
+
+        Returns:
+            List[float]: 질문의 임베딩 벡터.
+        """
+        if self._vector is None:
+            async with self._lock:
+                if self._vector is None:
+                    self._vector = await self._embedding_strategy.aembed_query(self.text)
+        return self._vector
+
+    async def aget_bytes(self) -> bytes:
+        """
+        Redis 벡터 검색/저장에 사용할 수 있도록 float32 바이트 형태로 반환합니다.
+
+        Returns:
+            bytes: float32로 직렬화된 임베딩 벡터.
+        """
+        vector = await self.aget()
+        return np.array(vector, dtype=np.float32).tobytes()
@@ -0,0 +1,404 @@
+import asyncio
+import os
+import shutil
+import time
+import uuid
+from contextlib import ExitStack, suppress
+from datetime import datetime, timezone
+from typing import Any, BinaryIO, Callable, Dict, Optional
+
+from fastapi.logger import logger
+from redis.asyncio import Redis
+
+from service.data.data_processor import DataProcessor
+from service.rag_service import IngestionResult, RAGService
+from service.retriever.bm25_manager import BM25Manager
+
+# 자신이 잡은 리스만 연장/해제하도록 값이 일치할 때만 처리하는 Lua 스크립트
+_RENEW_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('expire', KEYS[1], ARGV[2])
+end
+return 0
+"""
+_RELEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+_PARAGRAPH_FILE = "paragraph.txt"
+_QA_FILE = "qa.jsonl"
+
+# 정수로 반환할 작업 상태 필드
+_INT_FIELDS = ("attempts", "total_sources", "processed_sources", "processed_chunks", "added", "unchanged", "removed")
+
+
+class IngestionJobManager:
+    """
+    문서 수집(`RAGService.process`)을 백그라운드 작업으로 실행하고 진행 상황을 Redis에 기록하는 관리자입니다.
+
+    업로드 요청은 파일을 작업 디렉터리에 저장하고 Redis 대기열에 작업 ID를 넣은 뒤 바로 반환합니다.
+    각 워커의 백그라운드 루프는 Redis 리스를 잡은 워커 하나만 대기열의 첫 작업을 실행하므로,
+    여러 워커가 있어도 컬렉션에는 한 번에 하나의 수집만 반영됩니다.
+
+    작업 상태(단계, 처리한 문서/청크 수, 처리 속도, 오류)는 `ingest_job:{id}` 해시에 배치마다 갱신됩니다.
+    실행 중 워커가 종료되면 작업은 대기열에 남고, 리스가 만료된 뒤 다음 워커(재시작 포함)가 이어서 실행합니다.
+    리스를 잃은 워커는 실행 중인 작업을 취소하여 새로 리스를 잡은 워커와 동시에 실행하지 않으며,
+    `max_attempts`번 넘게 시작된 작업은 더 이어서 실행하지 않고 실패로 처리합니다.
+    이어서 실행할 때는 이미 저장된 배치의 청크를 chunk_id 비교로 건너뛰어 다시 임베딩하지 않습니다.
+    (전체 재수집은 작업에 기록된 새 컬렉션 버전에 이어서 저장합니다.)
+
+    전체 재수집은 새 컬렉션 버전과 그 BM25 인덱스를 모두 만든 뒤 벡터 DB와 BM25를 함께 교체하고,
+    현재/직전 버전을 제외한 이전 버전을 정리합니다. 수집 중에도 검색은 이전 버전을 그대로 사용합니다.
+    (작업 디렉터리는 모든 워커가 접근할 수 있는 경로여야 합니다.)
+    """
+
+    def __init__(
+            self,
+            redis_client: Redis,
+            rag_service: RAGService,
+            bm25_manager: BM25Manager,
+            job_dir: str = "data/ingest_jobs",
+            lease_ttl: int = 60,
+            poll_interval: float = 2.0,
+            result_ttl: int = 60 * 60 * 24 * 7,
+            key_prefix: str = "ingest_job",
+            max_attempts: int = 3,
+    ):
+        """
+        IngestionJobManager를 초기화합니다.
+
+        Args:
+            redis_client (Redis): 작업 상태와 대기열을 보관할 비동기 Redis 클라이언트.
+            rag_service (RAGService): 문서 수집 파이프라인을 실행할 서비스.
+            bm25_manager (BM25Manager): 수집이 끝난 뒤 갱신할 BM25 매니저.
+            job_dir (str): 업로드된 파일을 작업별로 보관할 디렉터리.
+            lease_ttl (int): 작업 실행 리스 만료 시간(초). 워커가 종료되면 이 시간 뒤 다른 워커가 작업을 이어받습니다.
+            poll_interval (float): 대기열을 확인하는 주기(초).
+            result_ttl (int): 끝난 작업의 상태를 보관할 시간(초).
+            key_prefix (str): Redis 키 접두사.
+            max_attempts (int): 작업 하나의 최대 실행 횟수. 실행 중 워커가 반복해서 종료되는 작업이 대기열을 막지 않도록 합니다.
+        """
+        self.r = redis_client
+        self.rag_service = rag_service
+        self.bm25_manager = bm25_manager
+        self.job_dir = job_dir
+        self.lease_ttl = lease_ttl
+        self.poll_interval = poll_interval
+        self.result_ttl = result_ttl
+        self.key_prefix = key_prefix
+        self.max_attempts = max_attempts
+        self.queue_key = f"{key_prefix}:queue"
+        self.lease_key = f"{key_prefix}:lease"
+
+        self._worker: Optional[asyncio.Task] = None
+        self._wakeup = asyncio.Event()
+
+    def _job_key(self, job_id: str) -> str:
+        return f"{self.key_prefix}:{job_id}"
+
+    def _job_path(self, job_id: str, file_name: str) -> str:
+        return os.path.join(self.job_dir, job_id, file_name)
+
+    @staticmethod
+    def _now() -> str:
+        return datetime.now(timezone.utc).isoformat()
+
+    async def submit(
+            self,
+            paragraph_file: Optional[BinaryIO],
+            paragraph_file_name: Optional[str],
+            qa_file: Optional[BinaryIO],
+            qa_file_name: Optional[str],
+            incremental: bool = True,
+    ) -> str:
+        """
+        업로드된 파일을 작업 디렉터리에 저장하고 수집 작업을 대기열에 추가합니다.
+
+        Args:
+            paragraph_file (Optional[BinaryIO]): 문단 데이터 파일 (바이너리).
+            paragraph_file_name (Optional[str]): 문단 파일 이름. (문서 source_id에 사용)
+            qa_file (Optional[BinaryIO]): QA 데이터(JSONL) 파일 (바이너리).
+            qa_file_name (Optional[str]): QA 파일 이름. (문서 source_id에 사용)
+            incremental (bool): False이면 새 컬렉션 버전에 전체를 다시 임베딩한 뒤 교체합니다.
+
+        Returns:
+            str: 작업 ID.
+        """
+        job_id = uuid.uuid4().hex
+        await asyncio.to_thread(self._store_files, job_id, paragraph_file, qa_file)
+
+        await self.r.hset(self._job_key(job_id), mapping={
+            "status": "queued",
+            "stage": "queued",
+            "incremental": int(incremental),
+            "paragraph_file_name": paragraph_file_name or "",
+            "qa_file_name": qa_file_name or "",
+            "attempts": 0,
+            "created_at": self._now(),
+        })
+        await self.r.rpush(self.queue_key, job_id)
+        self._wakeup.set()
+        logger.info(f"📥 문서 수집 작업 등록: {job_id}")
+        return job_id
+
+    def _store_files(self, job_id: str, paragraph_file: Optional[BinaryIO], qa_file: Optional[BinaryIO]):
+        os.makedirs(os.path.join(self.job_dir, job_id), exist_ok=True)
+        for source, file_name in ((paragraph_file, _PARAGRAPH_FILE), (qa_file, _QA_FILE)):
+            if source is not None:
+                with open(self._job_path(job_id, file_name), "wb") as f:
+                    shutil.copyfileobj(source, f)
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        작업 상태를 반환합니다.
+
+        Args:
+            job_id (str): 작업 ID.
+
+        Returns:
+            Optional[Dict[str, Any]]: 상태, 단계, 전체/처리한 문서 수, 처리한 청크 수, 추가/유지/삭제된 청크 수,
+                                      초당 처리 청크 수, 오류 메시지 등. 작업이 없거나 만료되었으면 None.
+        """
+        raw = await self.r.hgetall(self._job_key(job_id))
+        if not raw:
+            return None
+        job: Dict[str, Any] = {
+            (key.decode() if isinstance(key, bytes) else key): (value.decode() if isinstance(value, bytes) else value)
+            for key, value in raw.items()
+        }
+        for name in _INT_FIELDS:
+            if name in job:
+                job[name] = int(job[name])
+        if "chunks_per_second" in job:
+            job["chunks_per_second"] = float(job["chunks_per_second"])
+        job["incremental"] = job.get("incremental") == "1"
+        job["job_id"] = job_id
+        return job
+
+    async def start(self):
+        """대기열의 작업을 실행하는 백그라운드 루프를 시작합니다. 이전 실행에서 끝나지 않은 작업도 이어서 실행합니다."""
+        if self._worker is None:
+            self._worker = asyncio.create_task(self._run())
+
+    async def aclose(self):
+        """
+        백그라운드 루프를 종료합니다. (lifespan 종료 시 호출)
+        실행 중이던 작업은 대기열에 남아 다음 시작 시 이어서 실행됩니다.
+        """
+        if self._worker is not None:
+            self._worker.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._worker
+            self._worker = None
+
+    async def _run(self):
+        while True:
+            try:
+                if await self._run_next():
+                    continue
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.info(f"문서 수집 작업 처리 중 오류 발생: {e}")
+            self._wakeup.clear()
+            with suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+
+    async def _run_next(self) -> bool:
+        """
+        리스를 잡고 대기열의 첫 작업을 실행합니다.
+
+        Returns:
+            bool: 작업을 실행했으면 True, 대기열이 비었거나 다른 워커가 실행 중이면 False.
+        """
+        token = uuid.uuid4().hex
+        if not await self.r.set(self.lease_key, token, nx=True, ex=self.lease_ttl):
+            return False
+        execution: Optional[asyncio.Task] = None
+        heartbeat = asyncio.create_task(self._heartbeat(token, lambda: execution))
+        try:
+            job_id = await self.r.lindex(self.queue_key, 0)
+            if job_id is None:
+                return False
+            job_id = job_id.decode() if isinstance(job_id, bytes) else job_id
+            execution = asyncio.create_task(self._execute(job_id))
+            try:
+                await execution
+            except asyncio.CancelledError:
+                # 리스를 잃어 작업만 취소된 경우: 작업은 대기열에 두고 새로 리스를 잡은 워커가 이어서 실행
+                if heartbeat.done() and not heartbeat.cancelled() and not asyncio.current_task().cancelling():
+                    return True
+                raise
+            await self.r.lrem(self.queue_key, 1, job_id)
+            return True
+        finally:
+            heartbeat.cancel()
+            with suppress(asyncio.CancelledError):
+                await heartbeat
+            with suppress(Exception):
+                await self.r.eval(_RELEASE_SCRIPT, 1, self.lease_key, token)
+
+    async def _heartbeat(self, token: str, execution: Callable[[], Optional[asyncio.Task]]):
+        """
+        작업을 실행하는 동안 리스를 주기적으로 연장합니다.
+        리스를 잃으면(다른 워커가 리스를 잡았으면) 실행 중인 작업을 취소하고 종료합니다.
+        """
+        while True:
+            await asyncio.sleep(self.lease_ttl / 3)
+            try:
+                renewed = await self.r.eval(_RENEW_SCRIPT, 1, self.lease_key, token, self.lease_ttl)
+            except Exception as e:
+                logger.info(f"문서 수집 작업 리스 연장 실패: {e}")
+                continue
+            if not renewed:
+                logger.error("🚨 문서 수집 작업 리스를 잃었습니다. 작업을 중단하고 새로 리스를 잡은 워커에 넘깁니다.")
+                task = execution()
+                if task is not None:
+                    task.cancel()
+                return
+
+    async def _execute(self, job_id: str):
+        """
+        작업 하나를 실행하고 결과를 기록합니다.
+        실패하면 오류를 기록하고 작업을 끝냅니다. 종료(취소) 시에는 상태를 그대로 두어 다음 실행에서 이어서 처리합니다.
+        """
+        job_key = self._job_key(job_id)
+        job = await self.get(job_id)
+        if job is None:
+            logger.info(f"상태가 없는 문서 수집 작업을 건너뜁니다: {job_id}")
+            return
+
+        attempts = await self.r.hincrby(job_key, "attempts", 1)
+        if attempts > self.max_attempts:
+            # 실행 중 워커가 반복해서 종료되는 작업: 더 이어서 실행하지 않음 (전체 재수집의 새 버전은 다음 교체 시 정리됨)
+            logger.error(f"🚨 문서 수집 작업이 최대 실행 횟수({self.max_attempts})를 넘어 실패 처리합니다: {job_id}")
+            await self.r.hset(job_key, mapping={
+                "status": "failed",
+                "error": f"최대 실행 횟수({self.max_attempts})를 넘었습니다.",
+                "finished_at": self._now(),
+            })
+            await self._finish(job_id)
+            return
+        resumed = attempts > 1
+        # 전체 재수집을 이어서 실행할 때는 이전 실행이 만든 새 버전에 이어서 저장합니다.
+        resume_version = job.get("staged_version") or None
+
+        paragraph_path = self._job_path(job_id, _PARAGRAPH_FILE)
+        qa_path = self._job_path(job_id, _QA_FILE)
+        has_paragraph = os.path.exists(paragraph_path)
+        has_qa = os.path.exists(qa_path)
+
+        await self.r.hset(job_key, mapping={"status": "running", "stage": "counting", "started_at": self._now()})
+        if resumed:
+            logger.info(f"🔁 문서 수집 작업 재개 ({attempts}번째 실행): {job_id}")
+
+        started = time.monotonic()
+        latest: Optional[IngestionResult] = None  # 실패 시 이미 반영된 변경분을 확인하기 위한 마지막 진행 결과
+
+        async def on_progress(stage: str, result: IngestionResult):
+            nonlocal latest
+            latest = result
+            processed_chunks = result.added_count + result.unchanged
+            elapsed = time.monotonic() - started
+            mapping = {
+                "stage": stage,
+                "processed_sources": result.processed_sources,
+                "processed_chunks": processed_chunks,
+                "added": result.added_count,
+                "unchanged": result.unchanged,
+                "removed": len(result.removed_ids),
+                "chunks_per_second": round(processed_chunks / elapsed, 2) if elapsed > 0 else 0.0,
+                "updated_at": self._now(),
+            }
+            if result.staged_version:
+                mapping["staged_version"] = result.staged_version
+            await self.r.hset(job_key, mapping=mapping)
+
+        try:
+            if not has_paragraph and not has_qa:
+                raise FileNotFoundError(f"작업 파일을 찾을 수 없습니다: {os.path.join(self.job_dir, job_id)}")
+            total_sources = await asyncio.to_thread(self._count_sources, paragraph_path if has_paragraph else None, qa_path if has_qa else None)
+            await self.r.hset(job_key, "total_sources", total_sources)
+
+            with ExitStack() as stack:
+                # newline=""로 줄바꿈을 변환하지 않아 문단 구분 규칙이 업로드 파일 그대로 유지됩니다.
+                paragraph_lines = stack.enter_context(open(paragraph_path, encoding="utf-8", newline="")) if has_paragraph else None
+                qa_lines = stack.enter_context(open(qa_path, encoding="utf-8", newline="")) if has_qa else None
+                result = await self.rag_service.process(
+                    paragraph_lines=paragraph_lines,
+                    paragraph_file_name=job["paragraph_file_name"] or None,
+                    qa_lines=qa_lines,
+                    qa_file_name=job["qa_file_name"] or None,
+                    incremental=job["incremental"],
+                    progress_callback=on_progress,
+                    resume_version=resume_version,
+                )
+
+            await self.r.hset(job_key, "stage", "bm25")
+            if result.staged_version:
+                # 전체 재수집: 새 버전의 BM25 인덱스를 먼저 만든 뒤 벡터 DB와 BM25를 이어서 교체
+                staged_repository = await asyncio.to_thread(self.rag_service.repository.open_version, result.staged_version)
+                index = await self.bm25_manager.build_index(staged_repository)
+                await self.r.hset(job_key, "stage", "activating")
+                previous = await self.rag_service.activate(result.staged_version)
+                await self.bm25_manager.activate(index, result.staged_version)
+                await self._collect_garbage(result.staged_version, previous)
+            elif not resumed:
+                # 처음 실행한 증분 수집은 변경분만 반영
+                await self.bm25_manager.apply_changes(added=result.added, removed_ids=result.removed_ids)
+            else:
+                # 이전 실행이 반영한 변경분은 이번 결과에 없으므로 전체 재색인 후 캐시 버전도 올림
+                await self.bm25_manager.update_retriever()
+                await self.rag_service.bump_versions()
+        except asyncio.CancelledError:
+            logger.info(f"문서 수집 작업 중단, 다음 실행에서 이어서 처리합니다: {job_id}")
+            raise
+        except Exception as e:
+            logger.error(f"🚨 문서 수집 작업 실패: {job_id}: {e}")
+            await self.r.hset(job_key, mapping={"status": "failed", "error": str(e), "finished_at": self._now()})
+            if job["incremental"] and (resumed or (latest is not None and (latest.added_count or latest.removed_ids))):
+                await self._refresh_after_partial_ingest(job_id)
+        else:
+            await self.r.hset(job_key, mapping={"status": "completed", "stage": "done", "finished_at": self._now()})
+            logger.info(f"✅ 문서 수집 작업 완료: {job_id} {result.summary()}")
+
+        await self._finish(job_id)
+
+    async def _finish(self, job_id: str):
+        """끝난 작업의 상태에 보관 기간을 설정하고 업로드 파일을 삭제합니다."""
+        await self.r.expire(self._job_key(job_id), self.result_ttl)
+        await asyncio.to_thread(shutil.rmtree, os.path.join(self.job_dir, job_id), True)
+
+    async def _refresh_after_partial_ingest(self, job_id: str):
+        """
+        증분 수집이 중간에 실패해도 이미 저장된 청크는 검색 중인 컬렉션에 남으므로,
+        BM25 인덱스를 다시 만들고 캐시 버전을 올려 벡터 검색과 BM25/캐시가 어긋나지 않게 합니다.
+        """
+        try:
+            await self.bm25_manager.update_retriever()
+            await self.rag_service.bump_versions()
+        except Exception as e:
+            logger.error(f"🚨 실패한 문서 수집 작업의 부분 반영 처리 실패: {job_id}: {e}")
+
+    async def _collect_garbage(self, active: str, previous: Optional[str]):
+        """현재/직전 버전을 제외한 이전 컬렉션 버전과 BM25 인덱스 파일을 삭제합니다. 실패해도 작업은 성공으로 처리합니다."""
+        try:
+            await self.rag_service.collect_garbage()
+            await asyncio.to_thread(self.bm25_manager.collect_garbage, (active, previous))
+        except Exception as e:
+            logger.info(f"이전 컬렉션 버전 정리 실패 (다음 교체 시 다시 정리됩니다): {e}")
+
+    @staticmethod
+    def _count_sources(paragraph_path: Optional[str], qa_path: Optional[str]) -> int:
+        """진행률 계산을 위해 전체 문단/QA 수를 셉니다. (파일을 한 번 읽기만 하고 파싱/임베딩은 하지 않음)"""
+        total = 0
+        if paragraph_path is not None:
+            with open(paragraph_path, encoding="utf-8", newline="") as f:
+                total += sum(1 for _ in DataProcessor.iter_paragraphs(f))
+        if qa_path is not None:
+            with open(qa_path, encoding="utf-8") as f:
+                total += sum(1 for line in f if line.strip())
+        return total
@@ -15,7 +15,7 @@ class ChatHistory(BaseChatMessageHistory):
 
     """
 
-    def __init__(self, repository: ChatRepository, session_id: str):
+    def __init__(self, repository: ChatRepository, session_id: str, max_turns: int = 20):
         """
         ChatHistory 어댑터를 초기화합니다.
 
@@ -25,9 +25,11 @@ class ChatHistory(BaseChatMessageHistory):
         Args:
             repository (ChatRepository): 데이터베이스와 상호작용하는 채팅 레포지토리 객체.
             session_id (str): 특정 대화 세션을 식별하기 위한 고유 ID.
+            max_turns (int): 가져올 최근 대화(질문-답변 쌍) 수.
         """
         self.repository = repository
         self.session_id = session_id
+        self.max_turns = max_turns
 
     @property
     def messages(self) -> List[BaseMessage]:
@@ -36,17 +38,16 @@ class ChatHistory(BaseChatMessageHistory):
 
         이 프로퍼티는 DB에 저장된 기록을 LangChain이 이해할 수 있는 `HumanMessage`와 `AIMessage` 객체 리스트로 변환하는 역할을 합니다.
 
-        참고: 현재는 해당 세션의 전체 기록을 가져오지만, 추후 성능 최적화를 위해 최근 N개의 대화만 가져오도록 변경될 수 있습니다.
+        전체 기록이 아니라 최근 `max_turns`개의 대화만 가져옵니다.
 
         Returns:
             List[BaseMessage]: 데이터베이스 기록을 변환한 LangChain 메시지 객체의 리스트.
         """
-        
-        db_messages = self.repository.get_history(self.session_id)
+        turns = self.repository.get_recent_history(self.session_id, self.max_turns)
         langchain_messages = []
-        for msg in db_messages:
-            human = msg.get("interaction", {}).get("human")
-            ai = msg.get("interaction", {}).get("ai")
+        for turn in turns:
+            human = turn.get("human")
+            ai = turn.get("ai")
             if human:
                 langchain_messages.append(HumanMessage(content=human))
             if ai:
@@ -0,0 +1,200 @@
+import asyncio
+import uuid
+from collections import defaultdict
+from contextlib import suppress
+from typing import Dict, List, Optional
+
+from fastapi.logger import logger
+from redis.asyncio import Redis
+from redis.exceptions import ResponseError
+
+from database.vector.repository import VectorRepository
+
+# 자신이 잡은 락만 연장/해제하도록 값이 일치할 때만 처리하는 Lua 스크립트
+_RENEW_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('expire', KEYS[1], ARGV[2])
+end
+return 0
+"""
+_RELEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+class FeedbackBuffer:
+    """
+    답변 피드백(좋아요/싫어요)을 Redis 해시에 모았다가 주기적으로 벡터 DB에 일괄 반영하는 버퍼입니다.
+
+    피드백 요청은 참조 문서의 source_id마다 `HINCRBY` 한 번으로 카운터만 올리고 바로 반환합니다.
+    백그라운드 flusher는 해시를 처리용 키로 `RENAME`하여 그 사이 들어온 피드백과 분리한 뒤,
+    모인 증가분을 소스 ID `batch_size`개 단위로 `VectorRepository.aapply_feedback`에 반영합니다. (`$in` 조회 1회 + 일괄 update)
+    반영이 끝난 묶음은 처리용 키에서 바로 지우므로, 처리용 키에는 항상 아직 반영되지 않은 증가분만 남습니다.
+    반영에 실패하거나 워커가 중간에 종료되어도 남은 증가분만 다시 버퍼로 되돌아가 중복 반영되지 않습니다.
+    여러 워커가 같은 문서의 카운터를 동시에 읽고 쓰지 않도록 반영은 Redis 락을 잡은 워커 하나만 수행합니다.
+    """
+
+    def __init__(
+            self,
+            redis_client: Redis,
+            vector_repository: VectorRepository,
+            flush_interval: float = 10.0,
+            key: str = "feedback_buffer",
+            batch_size: int = 100,
+    ):
+        """
+        FeedbackBuffer를 초기화합니다.
+
+        Args:
+            redis_client (Redis): 피드백 카운터를 보관할 비동기 Redis 클라이언트.
+            vector_repository (VectorRepository): 피드백을 반영할 벡터 DB 레포지토리.
+            flush_interval (float): 벡터 DB에 반영하는 주기(초).
+            key (str): 피드백 카운터를 보관할 Redis 해시 키.
+            batch_size (int): 벡터 DB에 한 번에 반영할 소스 ID 수. 반영 진행 상황은 이 단위로 기록됩니다.
+        """
+        self.r = redis_client
+        self.vector_repository = vector_repository
+        self.flush_interval = flush_interval
+        self.key = key
+        self.batch_size = batch_size
+        self.lock_key = f"{key}:lock"
+        self.processing_prefix = f"{key}:flushing:"
+        self.lock_ttl = max(int(flush_interval * 3), 30)
+
+        self._flusher: Optional[asyncio.Task] = None
+
+        # 반영 통계
+        self.recorded = 0
+        self.flushed_sources = 0
+
+    @staticmethod
+    def _field(source_id: str, is_good: bool) -> str:
+        return f"{'likes' if is_good else 'dislikes'}:{source_id}"
+
+    async def record(self, source_ids: List[str], is_good: bool):
+        """
+        참조 문서들의 피드백 카운터를 올립니다. 벡터 DB에는 다음 반영 주기에 적용됩니다.
+
+        Args:
+            source_ids (List[str]): 피드백을 받은 답변이 참조한 문서의 소스 ID 리스트.
+            is_good (bool): 피드백이 긍정적인지 여부 (True: 좋아요, False: 싫어요).
+        """
+        source_ids = [source_id for source_id in source_ids if source_id]
+        if not source_ids:
+            return
+        async with self.r.pipeline(transaction=False) as pipe:
+            for source_id in source_ids:
+                pipe.hincrby(self.key, self._field(source_id, is_good), 1)
+            await pipe.execute()
+        self.recorded += len(source_ids)
+
+    async def flush(self) -> int:
+        """
+        모인 피드백을 벡터 DB에 반영합니다. 반영에 실패하면 아직 반영하지 않은 증가분만 다시 버퍼에 되돌립니다.
+
+        Returns:
+            int: 피드백을 반영한 소스 ID 수. 다른 워커가 반영 중이면 0.
+        """
+        token = uuid.uuid4().hex
+        if not await self.r.set(self.lock_key, token, nx=True, ex=self.lock_ttl):
+            return 0
+        try:
+            await self._recover_orphans()
+
+            # 반영하는 동안 들어오는 피드백은 새 해시에 쌓이도록 현재 해시를 처리용 키로 옮김
+            processing_key = f"{self.processing_prefix}{token}"
+            try:
+                await self.r.rename(self.key, processing_key)
+            except ResponseError:
+                return 0  # 모인 피드백 없음
+
+            counters = await self.r.hgetall(processing_key)
+            fields: Dict[str, List[bytes | str]] = defaultdict(list)
+            deltas: Dict[str, Dict[str, int]] = defaultdict(lambda: {"likes": 0, "dislikes": 0})
+            for field, count in counters.items():
+                kind, source_id = (field.decode() if isinstance(field, bytes) else field).split(":", 1)
+                deltas[source_id][kind] += int(count)
+                fields[source_id].append(field)
+
+            source_ids = list(deltas)
+            applied = 0
+            try:
+                for start in range(0, len(source_ids), self.batch_size):
+                    batch = source_ids[start:start + self.batch_size]
+                    await self.vector_repository.aapply_feedback({source_id: deltas[source_id] for source_id in batch})
+                    # 반영한 묶음은 처리용 키에서 제거 (중간에 실패/종료되어도 남은 증가분만 되돌아감)
+                    await self.r.hdel(processing_key, *(field for source_id in batch for field in fields[source_id]))
+                    applied += len(batch)
+                    # 반영이 길어져 락이 만료되면 다른 워커가 처리용 키를 복구하여 중복 반영할 수 있으므로 묶음마다 락을 연장
+                    if applied < len(source_ids) and not await self.r.eval(_RENEW_SCRIPT, 1, self.lock_key, token, self.lock_ttl):
+                        logger.error(f"🚨 피드백 반영 락을 잃어 중단합니다 ({applied}/{len(source_ids)}개 소스 반영됨). 남은 증가분은 락을 잡은 워커가 복구합니다.")
+                        self.flushed_sources += applied
+                        return applied
+            except Exception as e:
+                logger.info(f"🚨 피드백 반영 실패 ({applied}/{len(source_ids)}개 소스 반영됨), 나머지는 다음 주기에 다시 시도합니다: {e}")
+                await self._restore(processing_key)
+                self.flushed_sources += applied
+                return applied
+
+            await self.r.delete(processing_key)
+            self.flushed_sources += applied
+            logger.info(f"👍 피드백 {applied}개 소스를 벡터 DB에 반영했습니다.")
+            return applied
+        finally:
+            await self.r.eval(_RELEASE_SCRIPT, 1, self.lock_key, token)
+
+    async def _restore(self, processing_key: str):
+        """처리용 키에 남은(아직 반영되지 않은) 증가분을 버퍼 해시에 더하고 처리용 키를 삭제합니다."""
+        counters = await self.r.hgetall(processing_key)
+        async with self.r.pipeline(transaction=True) as pipe:
+            for field, count in counters.items():
+                pipe.hincrby(self.key, field, int(count))
+            pipe.delete(processing_key)
+            await pipe.execute()
+
+    async def _recover_orphans(self):
+        """
+        반영 도중 종료된 워커가 남긴 처리용 키의 증가분을 버퍼로 되돌립니다.
+        락을 잡은 상태에서만 호출하므로 남아 있는 처리용 키는 모두 진행 중이 아닌 키입니다.
+        """
+        async for orphan_key in self.r.scan_iter(match=f"{self.processing_prefix}*"):
+            await self._restore(orphan_key)
+            logger.info(f"♻️ 반영되지 않은 피드백을 버퍼로 복구했습니다: {orphan_key}")
+
+    async def start(self):
+        """주기적으로 피드백을 반영하는 백그라운드 flusher를 시작합니다. (첫 반영에서 이전 실행이 남긴 증가분을 복구)"""
+        if self._flusher is None:
+            self._flusher = asyncio.create_task(self._run())
+
+    async def aclose(self):
+        """flusher를 종료하고 남은 피드백을 반영합니다. (lifespan 종료 시 호출)"""
+        if self._flusher is not None:
+            self._flusher.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._flusher
+            self._flusher = None
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.info(f"종료 시 피드백 반영 실패 (Redis에 남아 다음 시작 후 반영됩니다): {e}")
+
+    async def _run(self):
+        # 시작하자마자 한 번 반영하여 이전 실행이 남긴 처리용 키를 바로 복구
+        while True:
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.info(f"피드백 반영 중 오류 발생: {e}")
+            await asyncio.sleep(self.flush_interval)
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        피드백 버퍼 통계를 반환합니다.
+
+        Returns:
+            Dict[str, int]: 이 워커가 기록한 피드백 수, 반영한 소스 ID 수.
+        """
+        return {"recorded": self.recorded, "flushed_sources": self.flushed_sources}
@@ -0,0 +1,266 @@
+import asyncio
+import os
+from contextlib import suppress
+from typing import Any, Dict, List, Optional, Tuple
+
+from bson import json_util
+from fastapi.logger import logger
+
+from database.chat.repository import ChatRepository
+from service.cache.cache_strategy import CacheStrategy
+from service.embedding.query_embedding import QueryEmbedding
+
+# 큐 항목 종류
+_CHAT = "chat"
+_CACHE = "cache"
+
+
+class WriteBehindQueue:
+    """
+    응답에 필요하지 않은 쓰기(대화 기록 저장, 시맨틱 캐시 저장)를 요청 경로에서 분리하는 write-behind 큐입니다.
+
+    요청은 쓰기 작업을 큐에 넣고 바로 응답하며, 백그라운드 flusher가 모아서 한 번에 저장합니다.
+    - 대화 기록: `insert_many` 한 번으로 일괄 저장합니다. chat_id는 `build_chat`에서 미리 생성되므로 저장 전에 응답할 수 있습니다.
+    - 캐시 저장: 모인 항목을 동시에 저장합니다.
+
+    큐는 크기가 제한되어 있어 저장이 밀리면 요청이 자리가 날 때까지 기다립니다. (backpressure)
+    대화 기록 저장에 실패하면 디스크 스풀 파일에 기록하고, 다음 시작 시(`start`) 다시 저장합니다.
+    캐시 저장은 실패해도 답변을 다시 생성하면 되므로 스풀하지 않습니다.
+    """
+
+    def __init__(
+            self,
+            chat_repository: ChatRepository,
+            cache_strategy: CacheStrategy,
+            max_size: int = 1000,
+            batch_size: int = 100,
+            flush_interval: float = 0.5,
+            spool_path: Optional[str] = None,
+    ):
+        """
+        WriteBehindQueue를 초기화합니다.
+
+        Args:
+            chat_repository (ChatRepository): 대화 기록을 일괄 저장할 레포지토리.
+            cache_strategy (CacheStrategy): 질문-답변을 저장할 캐시.
+            max_size (int): 큐에 쌓아둘 수 있는 최대 쓰기 작업 수. 가득 차면 새 요청은 자리가 날 때까지 기다립니다.
+            batch_size (int): 한 번에 저장할 최대 작업 수.
+            flush_interval (float): 배치를 채우기 위해 기다릴 최대 시간(초).
+            spool_path (Optional[str]): 저장에 실패한 대화 기록을 보관할 파일 경로. 없으면 실패한 기록은 버립니다.
+        """
+        self.chat_repository = chat_repository
+        self.cache_strategy = cache_strategy
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.spool_path = spool_path
+
+        self._queue: asyncio.Queue[Tuple[str, Any]] = asyncio.Queue(maxsize=max_size)
+        self._flusher: Optional[asyncio.Task] = None
+        # 아직 저장되지 않은 대화 기록: chat_id -> (채팅 문서, 저장(또는 스풀) 완료 이벤트)
+        self._pending: Dict[str, Tuple[Dict[str, Any], asyncio.Event]] = {}
+
+        # 저장 통계
+        self.flushed_chats = 0
+        self.flushed_cache = 0
+        self.spooled_chats = 0
+        self.failed_cache = 0
+
+    async def submit_chat(self, chat: Dict[str, Any]) -> str:
+        """
+        대화 기록 저장을 큐에 넣고 미리 생성된 chat_id를 반환합니다.
+
+        Args:
+            chat (Dict[str, Any]): `ChatRepository.build_chat`으로 구성한 채팅 문서.
+
+        Returns:
+            str: 채팅 문서의 ID.
+        """
+        chat_id = str(chat["_id"])
+        self._pending[chat_id] = (chat, asyncio.Event())
+        try:
+            await self._queue.put((_CHAT, chat))
+        except BaseException:
+            # 큐가 가득 찬 동안 요청이 취소되는 등 큐에 넣지 못한 대화는 저장되지 않으므로 대기 목록과 세션 캐시에서 되돌림
+            self._pending.pop(chat_id, None)
+            self.chat_repository.discard_chat(chat)
+            raise
+        return chat_id
+
+    async def submit_cache(self, question: str, answer: str, query_embedding: Optional[QueryEmbedding] = None):
+        """
+        질문-답변 캐시 저장을 큐에 넣습니다.
+
+        Args:
+            question (str): 사용자 질문.
+            answer (str): 생성된 답변.
+            query_embedding (Optional[QueryEmbedding]): 요청에서 이미 계산한 질문 임베딩.
+        """
+        await self._queue.put((_CACHE, (question, answer, query_embedding)))
+
+    async def flush(self, chat_id: Optional[str] = None):
+        """
+        대화 기록이 저장될 때까지 기다립니다. (예: 피드백 전에 해당 대화가 저장되어 있어야 할 때)
+        요청이 계속 들어와도 끝나도록 큐 전체가 아니라 호출 시점에 대기 중인 대화 기록만 기다립니다.
+
+        Args:
+            chat_id (Optional[str]): 기다릴 대화의 ID. 없으면 호출 시점에 대기 중인 모든 대화 기록을 기다립니다.
+        """
+        if self._flusher is None:
+            await self._drain()
+            return
+        if chat_id is not None:
+            entry = self._pending.get(chat_id)
+            events = [entry[1]] if entry is not None else []
+        else:
+            events = [event for _, event in self._pending.values()]
+        for event in events:
+            await event.wait()
+
+    async def start(self):
+        """스풀 파일에 남은 대화 기록을 다시 저장한 뒤 백그라운드 flusher를 시작합니다."""
+        await self._replay_spool()
+        if self._flusher is None:
+            self._flusher = asyncio.create_task(self._run())
+
+    async def aclose(self, timeout: float = 10.0):
+        """
+        큐에 남은 작업을 저장하고 flusher를 종료합니다. (lifespan 종료 시 호출)
+        제한 시간 안에 저장하지 못한 대화 기록은 스풀 파일에 기록합니다.
+        """
+        if self._flusher is not None:
+            with suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._queue.join(), timeout=timeout)
+            self._flusher.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._flusher
+            self._flusher = None
+
+        remaining = self._take_batch(self._queue.qsize())
+        chats = [payload for kind, payload in remaining if kind == _CHAT]
+        if chats:
+            self._spool(chats)
+        self._done(remaining)
+        logger.info(f"--- write-behind 큐 종료 (스풀된 대화 기록 {len(chats)}개) ---")
+
+    async def _run(self):
+        """배치 단위로 큐를 비우는 백그라운드 flusher"""
+        while True:
+            batch = []
+            try:
+                batch.append(await self._queue.get())
+                deadline = asyncio.get_running_loop().time() + self.flush_interval
+                while len(batch) < self.batch_size:
+                    remaining = deadline - asyncio.get_running_loop().time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+                    except asyncio.TimeoutError:
+                        break
+                await self._write_batch(batch)
+            except asyncio.CancelledError:
+                # 배치를 모으거나 저장하는 중에 취소되면 이미 꺼낸 대화 기록은 스풀 파일에 보관 (중복은 재저장 시 무시됨)
+                self._spool([payload for kind, payload in batch if kind == _CHAT])
+                raise
+            finally:
+                self._done(batch)
+
+    async def _drain(self):
+        """flusher 없이 큐에 남은 작업을 바로 저장합니다."""
+        while not self._queue.empty():
+            batch = self._take_batch(self.batch_size)
+            try:
+                await self._write_batch(batch)
+            finally:
+                self._done(batch)
+
+    def _done(self, batch: List[Tuple[str, Any]]):
+        """꺼낸 작업의 처리가 끝났음을 알리고, 해당 대화 기록을 기다리는 `flush`를 깨웁니다."""
+        for kind, payload in batch:
+            self._queue.task_done()
+            if kind == _CHAT:
+                entry = self._pending.pop(str(payload["_id"]), None)
+                if entry is not None:
+                    entry[1].set()
+
+    def _take_batch(self, size: int) -> List[Tuple[str, Any]]:
+        batch = []
+        while len(batch) < size and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        return batch
+
+    async def _write_batch(self, batch: List[Tuple[str, Any]]):
+        """대화 기록은 insert_many 한 번으로, 캐시는 동시에 저장합니다."""
+        chats = [payload for kind, payload in batch if kind == _CHAT]
+        cache_items = [payload for kind, payload in batch if kind == _CACHE]
+        await asyncio.gather(self._write_chats(chats), self._write_cache(cache_items))
+
+    async def _write_chats(self, chats: List[Dict[str, Any]]):
+        if not chats:
+            return
+        try:
+            await self.chat_repository.ainsert_chats(chats)
+            self.flushed_chats += len(chats)
+        except Exception as e:
+            logger.error(f"대화 기록 일괄 저장 실패, 스풀 파일에 보관합니다: {e}")
+            self._spool(chats)
+
+    async def _write_cache(self, cache_items: List[Tuple[str, str, Optional[QueryEmbedding]]]):
+        if not cache_items:
+            return
+        outcomes = await asyncio.gather(
+            *(self.cache_strategy.add_to_cache(question, answer, query_embedding=query_embedding)
+              for question, answer, query_embedding in cache_items),
+            return_exceptions=True,
+        )
+        failures = [outcome for outcome in outcomes if isinstance(outcome, Exception)]
+        self.flushed_cache += len(cache_items) - len(failures)
+        if failures:
+            self.failed_cache += len(failures)
+            logger.info(f"캐시 저장 실패 {len(failures)}개: {failures[0]}")
+
+    def _spool(self, chats: List[Dict[str, Any]]):
+        """저장에 실패한 대화 기록을 스풀 파일에 한 줄씩 추가합니다. (ObjectId, datetime 보존을 위해 Extended JSON 사용)"""
+        if not chats:
+            return
+        if not self.spool_path:
+            logger.error(f"스풀 경로가 없어 대화 기록 {len(chats)}개를 버립니다.")
+            return
+        directory = os.path.dirname(self.spool_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.spool_path, "a", encoding="utf-8") as f:
+            for chat in chats:
+                f.write(json_util.dumps(chat, ensure_ascii=False) + "\n")
+        self.spooled_chats += len(chats)
+
+    async def _replay_spool(self):
+        """스풀 파일의 대화 기록을 다시 저장합니다. 성공하면 스풀 파일을 삭제합니다."""
+        if not self.spool_path or not os.path.exists(self.spool_path):
+            return
+        with open(self.spool_path, encoding="utf-8") as f:
+            chats = [json_util.loads(line) for line in f if line.strip()]
+        if chats:
+            try:
+                for start in range(0, len(chats), self.batch_size):
+                    await self.chat_repository.ainsert_chats(chats[start:start + self.batch_size])
+            except Exception as e:
+                logger.error(f"스풀된 대화 기록 재저장 실패, 다음 시작 시 다시 시도합니다: {e}")
+                return
+        os.remove(self.spool_path)
+        logger.info(f"--- 스풀된 대화 기록 {len(chats)}개 재저장 완료 ---")
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        write-behind 큐 통계를 반환합니다.
+
+        Returns:
+            Dict[str, int]: 대기 중인 작업 수, 저장한 대화 기록/캐시 수, 스풀된 대화 기록 수, 실패한 캐시 저장 수.
+        """
+        return {
+            "pending": self._queue.qsize(),
+            "flushed_chats": self.flushed_chats,
+            "flushed_cache": self.flushed_cache,
+            "spooled_chats": self.spooled_chats,
+            "failed_cache": self.failed_cache,
+        }
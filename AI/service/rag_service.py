@@ -1,11 +1,43 @@
-import json
+import asyncio
+from contextlib import suppress
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import Awaitable, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
 
 from fastapi.logger import logger
+from langchain_core.documents import Document
 
 from database.vector.repository import VectorRepository
+from service.cache.corpus_version import CorpusVersion
 from service.chunk.service import ChunkService
 from service.data.data_processor import DataProcessor
 from service.embedding.service import EmbeddingService
+from service.retriever.index_version import IndexVersion
+
+
+@dataclass
+class IngestionResult:
+    """
+    문서 수집 결과를 담는 객체입니다.
+
+    Attributes:
+        added (List[Document]): 새로 임베딩되어 저장된 청크. (증분 수집에서 BM25 반영용으로만 보관)
+        removed_ids (List[str]): 업로드에서 사라져 삭제된 청크 ID.
+        unchanged (int): 내용이 바뀌지 않아 그대로 유지된 청크 수.
+        added_count (int): 새로 임베딩되어 저장된 청크 수.
+        processed_sources (int): 지금까지 처리한 원본 문서(문단/QA) 수.
+        staged_version (Optional[str]): 전체 재수집에서 새로 만든 컬렉션 버전. (`activate`로 교체하기 전까지 검색에 사용되지 않음)
+    """
+    added: List[Document] = field(default_factory=list)
+    removed_ids: List[str] = field(default_factory=list)
+    unchanged: int = 0
+    added_count: int = 0
+    processed_sources: int = 0
+    staged_version: Optional[str] = None
+
+    def summary(self) -> dict:
+        """API 응답에 사용할 요약 정보를 반환합니다."""
+        return {"added": self.added_count, "removed": len(self.removed_ids), "unchanged": self.unchanged}
 
 
 class RAGService:
@@ -14,12 +46,19 @@ class RAGService:
 
     원본 텍스트와 QA 데이터를 입력받아 파싱, 청킹, 임베딩 단계를 거쳐
     최종적으로 벡터 데이터베이스에 저장하는 전체 과정을 관리합니다.
+
+    입력은 줄 단위로 읽어 일정 개수(batch_size)의 문서씩 파싱/청킹하고, 크기가 제한된 큐를 통해 임베딩/저장 단계로 넘깁니다.
+    다음 배치를 파싱/청킹하는 동안 이전 배치를 임베딩하므로 단계가 겹쳐 실행되며, 메모리 사용량은 코퍼스 크기와 무관하게 일정합니다.
     """
     def __init__(self,
                  chunk_service: ChunkService,
                  embedding_service: EmbeddingService,
                  data_processor: DataProcessor,
                  vector_repository: VectorRepository,
+                 index_version: Optional[IndexVersion] = None,
+                 corpus_version: Optional[CorpusVersion] = None,
+                 batch_size: int = 200,
+                 pipeline_depth: int = 2,
                  ):
         """
         RAGService를 초기화합니다.
@@ -29,67 +68,231 @@ class RAGService:
             embedding_service (EmbeddingService): 텍스트를 벡터로 변환하는 서비스 (현재는 VectorRepository에서 처리).
             data_processor (DataProcessor): 원본 데이터(텍스트, JSONL)를 LangChain Document 객체로 파싱하는 서비스.
             vector_repository (VectorRepository): 청크와 임베딩 벡터를 Vector DB에 저장하는 레포지토리.
+            index_version (Optional[IndexVersion]): Vector DB가 바뀔 때마다 올릴 버전 카운터. (검색 결과 캐시 무효화용)
+            corpus_version (Optional[CorpusVersion]): 문서가 바뀔 때마다 올릴 Redis 코퍼스 버전. (시맨틱 캐시 무효화용)
+            batch_size (int): 한 번에 파싱/청킹하여 임베딩 단계로 넘길 원본 문서(문단/QA) 수.
+            pipeline_depth (int): 임베딩을 기다리며 미리 준비해 둘 최대 배치 수.
 
         """
         self.chunk_service = chunk_service
         self.embedding_service = embedding_service
         self.data_processor = data_processor
         self.repository = vector_repository
+        self.index_version = index_version
+        self.corpus_version = corpus_version
+        self.batch_size = batch_size
+        self.pipeline_depth = pipeline_depth
         logger.info("✅ RAGService 초기화 완료")
 
-    def process(self, paragraph_data: str, paragraph_file_name: str, qa_data: str, qa_file_name: str):
+    async def process(
+            self,
+            paragraph_lines: Optional[Iterable[str]],
+            paragraph_file_name: Optional[str],
+            qa_lines: Optional[Iterable[str]],
+            qa_file_name: Optional[str],
+            incremental: bool = True,
+            progress_callback: Optional[Callable[[str, IngestionResult], Awaitable[None]]] = None,
+            resume_version: Optional[str] = None,
+    ) -> IngestionResult:
         """
+        문단/QA 데이터를 파싱, 청킹, 임베딩하여 벡터 데이터베이스에 저장합니다.
+
+        증분 모드(기본값)에서는 각 청크를 `source_id + 내용` 해시로 식별하여 저장된 청크와 비교하고,
+        새로 생기거나 바뀐 청크만 임베딩하여 저장하며, 업로드에서 사라진 청크는 삭제합니다.
+        바뀌지 않은 청크는 그대로 두므로 likes/dislikes 메타데이터도 유지됩니다.
+        삭제 비교는 이번에 업로드된 데이터 유형(paragraph / qa)에 한정됩니다.
+
+        전체 재수집(incremental=False)은 검색 중인 컬렉션을 지우지 않고 새 버전 컬렉션에 저장한 뒤 청크 수를 검증합니다.
+        새 버전은 `result.staged_version`으로 반환되며, `activate`를 호출하기 전까지 검색에는 이전 버전이 사용됩니다.
 
         Args:
-            paragraph_data (str): 문단 데이터 입니다. 파일에 있는 모든 문자열 자체가 입력됩니다.
-            paragraph_file_name (str): 입력되는 파일의 이름입니다.
-            qa_data (str): QA파일의 질문과 대답의 문자열입니다.
-            qa_file_name (str): QA파일의 파일 이름입니다.
+            paragraph_lines (Optional[Iterable[str]]): 문단 데이터의 줄 단위 입력입니다. (예: 텍스트 파일 객체) 빈 줄로 문단을 구분합니다.
+            paragraph_file_name (Optional[str]): 입력되는 파일의 이름입니다.
+            qa_lines (Optional[Iterable[str]]): QA 데이터(JSONL)의 줄 단위 입력입니다.
+            qa_file_name (Optional[str]): QA파일의 파일 이름입니다.
+            incremental (bool): False이면 새 버전 컬렉션에 전체를 다시 임베딩합니다.
+            progress_callback (Optional[Callable]): 단계가 바뀌거나 배치 저장이 끝날 때마다 (단계 이름, 현재까지의 결과)로 호출됩니다.
+                                                    단계: "staged" | "ingesting" | "removing" | "validating" | "done"
+            resume_version (Optional[str]): 중단된 전체 재수집을 이어서 실행할 때 사용할 버전. 이미 저장된 청크는 다시 임베딩하지 않습니다.
 
         Returns:
+            IngestionResult: 추가된 청크, 삭제된 청크 ID, 변경 없는 청크 수.
+        """
+        result = IngestionResult()
+
+        async def report(stage: str):
+            if progress_callback is not None:
+                await progress_callback(stage, result)
+
+        repository = self.repository
+        if not incremental:
+            # 검색 중인 컬렉션은 그대로 두고 새 버전 컬렉션에 저장합니다.
+            repository = await asyncio.to_thread(self.repository.open_version, resume_version)
+            result.staged_version = repository.version
+            await report("staged")
+
+        source_types = []
+        if paragraph_lines is not None:
+            source_types.append("paragraph")
+        if qa_lines is not None:
+            source_types.append("qa")
+
+        # 1. 증분 비교를 위해 저장된 청크 ID만 먼저 가져옵니다. (문서 내용은 가져오지 않음)
+        stored_ids_by_type: Dict[str, List[str]] = {}
+        if incremental or resume_version:
+            for source_type in source_types:
+                stored_ids_by_type[source_type] = await asyncio.to_thread(repository.get_ids, source_type)
+        stored_ids: Set[str] = {chunk_id for ids in stored_ids_by_type.values() for chunk_id in ids}
+
+        # 2. 파싱/청킹(생산자)과 임베딩/저장(소비자)을 크기가 제한된 큐로 연결하여 겹쳐 실행합니다.
+        logger.info("--- 문서 변환/청킹/저장 시작 ---")
+        produced_types: Set[str] = set()  # 실제로 문서가 있었던 데이터 유형 (빈 파일은 삭제 비교에서 제외)
+        batches = self._iter_source_batches(paragraph_lines, paragraph_file_name, qa_lines, qa_file_name, produced_types)
+        queue: asyncio.Queue[Optional[Tuple[int, List[Document]]]] = asyncio.Queue(maxsize=self.pipeline_depth)
+        seen_ids: Set[str] = set()  # 이번 업로드의 청크 ID (배치 간 중복 제거 및 삭제 대상 계산용)
+        await report("ingesting")
+
+        async def produce():
+            try:
+                while (docs := await asyncio.to_thread(next, batches, None)) is not None:
+                    # 청킹 전략이 분할을 끝내는 대로(프로세스 풀 사용 시 샤드 단위) 임베딩 단계로 넘김
+                    async for chunks in self.chunk_service.astream_split(docs):
+                        chunks = self._assign_new_ids(chunks, seen_ids)
+                        new_chunks = [doc for doc in chunks if doc.metadata["chunk_id"] not in stored_ids]
+                        result.unchanged += len(chunks) - len(new_chunks)
+                        if new_chunks:
+                            await queue.put((0, new_chunks))
+                    await queue.put((len(docs), []))  # 배치의 원본 문서 처리 완료 (진행률용)
+            except asyncio.CancelledError:
+                raise  # 소비자가 실패하여 취소된 경우
+            except Exception:
+                await queue.put(None)  # 파싱 오류 등: 소비자를 멈추고 예외는 아래 `await producer`에서 전달
+                raise
+            await queue.put(None)  # 종료 신호
+
+        async def consume():
+            while (batch := await queue.get()) is not None:
+                source_count, new_chunks = batch
+                if new_chunks:
+                    # EmbeddingScheduler가 속도 제한에 맞춰 배치를 동시에 임베딩한 뒤 저장 -> chroma_vector.py 참고
+                    await repository.aadd_documents(new_chunks)
+                    result.added_count += len(new_chunks)
+                    if incremental:
+                        result.added.extend(new_chunks)  # BM25 증분 반영용
+                    logger.info(f"--- 청크 {result.added_count}개 저장 완료 ---")
+                result.processed_sources += source_count
+                await report("ingesting")
+
+        producer = asyncio.create_task(produce())
+        try:
+            await consume()
+        finally:
+            if not producer.done():
+                producer.cancel()
+            with suppress(asyncio.CancelledError):
+                await producer
+        logger.info(f"--- 청크 문서 저장 완료: 추가 {result.added_count}개, 유지 {result.unchanged}개 ---")
+
+        # 3. 업로드에서 사라진 청크 삭제
+        if incremental:
+            await report("removing")
+            result.removed_ids = [
+                chunk_id
+                for source_type in produced_types
+                for chunk_id in stored_ids_by_type[source_type]
+                if chunk_id not in seen_ids
+            ]
+            if result.removed_ids:
+                await asyncio.to_thread(repository.delete, result.removed_ids)
+            logger.info(f"--- 증분 비교 완료: 추가 {result.added_count}개, 삭제 {len(result.removed_ids)}개, 유지 {result.unchanged}개 ---")
+
+            if result.added_count or result.removed_ids:
+                await self.bump_versions()
+        else:
+            # 4. 새 버전 검증: 이번 업로드의 청크가 모두 저장되었는지 확인 (교체 전에 실패시켜 이전 버전을 계속 사용)
+            await report("validating")
+            stored_count = await asyncio.to_thread(repository.count)
+            if not seen_ids or stored_count != len(seen_ids):
+                raise ValueError(
+                    f"새 컬렉션 버전 '{result.staged_version}' 검증 실패: 저장된 청크 {stored_count}개, 업로드 청크 {len(seen_ids)}개"
+                )
+        logger.info(f"--- 총 처리된 청크 개수: {len(seen_ids)} ---")
+        await report("done")
 
+        return result
+
+    async def activate(self, version: str) -> Optional[str]:
+        """
+        전체 재수집으로 만든 새 버전을 검색에 사용하도록 교체합니다.
+
+        Args:
+            version (str): `process`가 반환한 staged_version.
+
+        Returns:
+            Optional[str]: 교체 전에 사용하던 버전. (롤백용으로 보관됨)
+        """
+        previous = await asyncio.to_thread(self.repository.activate_version, version)
+        await self.bump_versions()
+        return previous
+
+    async def rollback(self) -> str:
         """
+        직전 버전으로 되돌립니다. 이전 버전이 없으면 ValueError를 발생시킵니다.
 
-        # 이미 chroma에 데이터가 존재하는지 확인하고 만약 존재한다면 해당 데이터를 삭제합니다. 그리고 해당 컬렉션까지 재생성합니다.
-        self.repository.reset()
-
-
-        # 1. TXT(자기소개) 데이터와 Q&A(질의응답) 데이터를 받아서 langchain Document 객체로 변환합니다.
-        logger.info("--- 문서 변환 시작 ---")
-        docs = []
-
-        if paragraph_data:
-            # 1. 전달받은 전체 텍스트를 빈 줄('\n\n') 기준으로 나누어 리스트를 만듭니다. (두 줄 이상 띄어져 있으면 다른 내용이라고 간주하는 것)
-            paragraphs_list = [p.strip() for p in paragraph_data.split('\n\n') if p.strip()]
-
-            # 2. 이제 나누어진 '문단 리스트'를 다음 함수로 전달합니다.
-            docs.extend(self.data_processor.process_paragraphs(
-                paragraphs=paragraphs_list,
-                source_identifier=paragraph_file_name
-            ))
-        logger.info(f"--- 문단 데이터 변환 완료 ---")
-        logger.info(f"--- 변환된 문단 데이터 개수: {len(docs)} ---")
-        logger.info(f"--- Q&A 데이터 변환 시작 ---")
-        qa_data = [json.loads(line) for line in qa_data.strip().split('\n')]
-        logger.info(f"--- Q&A 데이터 개수: {len(qa_data)} ---")
-        docs.extend(self.data_processor.process_qa_json(qa_data=qa_data, source_identifier=qa_file_name))
-        logger.info(f"--- 문서 변환 완료 ---")
-        logger.info(f"--- 변환된 문서 개수: {len(docs)} ---")
-        # 2. 문서 청킹
-        logger.info("--- 문서 청킹 시작 ---")
-        documents = self.chunk_service.split_documents(docs)
-        logger.info(f"--- 청킹 완료 ---")
-        logger.info(f"--- 생성된 청크 문서 개수: {len(documents)} ---")
-        ''' 3. 청킹된 문서 임베딩
-        # ChromaDB는 자동 임베딩됨 따라서 주석처리한다.
-        # print("--- 청크 문서 임베딩 시작 ---")
-        # embedded_documents = self.embedding_service.embed_documents([doc.page_content for doc in documents])
-        # print(f"--- 청크 문서 임베딩 완료 ---")
-        # print(f"--- 임베딩된 청크 문서 개수: {len(embedded_documents)} ---")
-        # 4. 임베딩된 문서 저장
-        '''
-        logger.info("--- 청크 문서 저장 시작 ---")
-        # 3.청크 문서 저장 및 임베딩
-        self.repository.add_documents(documents) #이 부분에서 임베딩이 자동으로 처리됨(내부적 처리) -> chroma_vector_store.py에서 처리됨.embedding_function참고
-        logger.info("--- 청크 문서 저장 완료 ---")
-        logger.info(f"--- 총 처리된 문서 개수: {len(docs)} ---")
\ No newline at end of file
+        Returns:
+            str: 다시 사용하게 된 버전.
+        """
+        version = await asyncio.to_thread(self.repository.rollback_version)
+        await self.bump_versions()
+        return version
+
+    async def collect_garbage(self) -> List[str]:
+        """사용 중인 버전과 직전 버전을 제외한 이전 컬렉션 버전을 삭제합니다."""
+        return await asyncio.to_thread(self.repository.collect_garbage)
+
+    async def bump_versions(self):
+        """검색 결과 캐시와 시맨틱 캐시가 바뀐 문서를 반영하도록 버전을 올립니다. (수집이 중간에 실패한 경우에도 호출)"""
+        if self.index_version is not None:
+            self.index_version.bump()  # 이전 인덱스 기준으로 캐싱된 검색 결과 무효화
+        if self.corpus_version is not None:
+            version = await self.corpus_version.bump()  # 이전 문서로 생성된 캐시 답변 무효화
+            logger.info(f"--- 코퍼스 버전 갱신: {version} ---")
+
+    def _iter_source_batches(
+            self,
+            paragraph_lines: Optional[Iterable[str]],
+            paragraph_file_name: Optional[str],
+            qa_lines: Optional[Iterable[str]],
+            qa_file_name: Optional[str],
+            produced_types: Set[str],
+    ) -> Iterator[List[Document]]:
+        """입력을 줄 단위로 읽어 `batch_size`개씩 Document로 변환합니다. (문단 -> QA 순) 문서가 나온 데이터 유형을 `produced_types`에 기록합니다."""
+        if paragraph_lines is not None:
+            paragraphs = self.data_processor.iter_paragraphs(paragraph_lines)
+            index = 0
+            while batch := list(islice(paragraphs, self.batch_size)):
+                produced_types.add("paragraph")
+                yield self.data_processor.process_paragraphs(batch, source_identifier=paragraph_file_name, start_index=index)
+                index += len(batch)
+            logger.info(f"--- 문단 데이터 변환 완료: {index}개 ---")
+
+        if qa_lines is not None:
+            qa_items = self.data_processor.iter_qa_jsonl(qa_lines)
+            index = 0
+            while batch := list(islice(qa_items, self.batch_size)):
+                produced_types.add("qa")
+                yield self.data_processor.process_qa_json(batch, source_identifier=qa_file_name, start_index=index)
+                index += len(batch)
+            logger.info(f"--- Q&A 데이터 변환 완료: {index}개 ---")
+
+    def _assign_new_ids(self, chunks: List[Document], seen_ids: Set[str]) -> List[Document]:
+        """
+        청크에 chunk_id를 부여하고, 앞서 나온 청크와 중복된 청크는 제외합니다.
+
+        Returns:
+            List[Document]: 이번 업로드에서 처음 나온 청크 리스트.
+        """
+        chunks = self.data_processor.assign_chunk_ids(chunks)
+        chunks = [chunk for chunk in chunks if chunk.metadata["chunk_id"] not in seen_ids]
+        seen_ids.update(chunk.metadata["chunk_id"] for chunk in chunks)
+        return chunks
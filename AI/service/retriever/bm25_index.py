@@ -0,0 +1,289 @@
+import json
+import os
+import tempfile
+from collections import Counter
+from typing import Dict, List, Optional, Tuple, Iterable
+
+import numpy as np
+from langchain_core.documents import Document
+
+from service.data.data_processor import DataProcessor
+from service.retriever.tokenizer_strategy.tokenizer_strategy import TokenizerStrategy
+from service.retriever.tokenizer_strategy.whitespace_tokenizer import WhitespaceTokenizer
+
+
+class BM25Index:
+    """
+    문서 단위로 추가/삭제/수정이 가능한 증분형 BM25 역색인입니다.
+
+    전체 문서를 다시 읽어 인덱스를 재생성하는 대신, 문서가 바뀔 때마다 용어 통계(문서 빈도, 문서 길이)를
+    증분으로 갱신합니다.
+
+    검색 시에는 포스팅 리스트를 CSR 형태의 NumPy 희소 행렬(용어 x 문서)로 컴파일해 두고,
+    질문 용어에 해당하는 행만 모아 `np.bincount`로 점수를 합산한 뒤 `np.argpartition`으로 상위 k개를 고릅니다.
+    컴파일된 행렬은 인덱스가 바뀔 때만 다시 만들어집니다.
+
+    인덱스를 교체할 때는 `copy()`로 복제한 뒤 변경하고 통째로 바꿔 끼우는 방식(copy-on-write)을 사용하여,
+    검색 중인 요청이 갱신 도중의 인덱스를 보지 않도록 합니다.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75, tokenizer: Optional[TokenizerStrategy] = None):
+        """
+        BM25Index를 초기화합니다.
+
+        Args:
+            k1 (float): 용어 빈도(TF)의 포화 정도를 조절하는 BM25 파라미터.
+            b (float): 문서 길이 정규화 정도를 조절하는 BM25 파라미터.
+            tokenizer (Optional[TokenizerStrategy]): 문서와 질문을 토큰으로 나누는 토크나이저. 없으면 공백 기준으로 나눕니다.
+        """
+        self.k1 = k1
+        self.b = b
+        self.tokenizer = tokenizer or WhitespaceTokenizer()
+
+        self._docs: Dict[str, Document] = {}              # 문서 ID -> Document
+        self._doc_lengths: Dict[str, int] = {}            # 문서 ID -> 토큰 수
+        self._doc_terms: Dict[str, Counter] = {}          # 문서 ID -> 용어별 빈도
+        self._postings: Dict[str, Dict[str, int]] = {}    # 용어 -> {문서 ID: 빈도}
+        self._total_length = 0
+
+        # 검색용으로 컴파일된 CSR 행렬 (인덱스가 바뀌면 None으로 초기화)
+        self._compiled: Optional["_CompiledMatrix"] = None
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._docs
+
+    @property
+    def average_length(self) -> float:
+        """평균 문서 길이(토큰 수)를 반환합니다."""
+        return self._total_length / len(self._docs) if self._docs else 0.0
+
+    @staticmethod
+    def document_id(doc: Document) -> str:
+        """문서의 고유 ID를 반환합니다. chunk_id가 없으면 source_id + 내용으로 생성합니다."""
+        return DataProcessor.get_chunk_id(doc)
+
+    def copy(self) -> "BM25Index":
+        """
+        인덱스를 복제합니다. Document와 용어 빈도(Counter)는 변경되지 않으므로 공유하고, 컨테이너만 복사합니다.
+        """
+        new_index = BM25Index(k1=self.k1, b=self.b, tokenizer=self.tokenizer)
+        new_index._docs = dict(self._docs)
+        new_index._doc_lengths = dict(self._doc_lengths)
+        new_index._doc_terms = dict(self._doc_terms)
+        new_index._postings = {term: dict(posting) for term, posting in self._postings.items()}
+        new_index._total_length = self._total_length
+        return new_index
+
+    def add(self, doc: Document, doc_id: Optional[str] = None):
+        """
+        문서를 인덱스에 추가합니다. 같은 ID의 문서가 이미 있으면 교체합니다.
+
+        Args:
+            doc (Document): 추가할 문서.
+            doc_id (Optional[str]): 문서 ID. 없으면 `document_id()`로 생성합니다.
+        """
+        doc_id = doc_id or self.document_id(doc)
+        if doc_id in self._docs:
+            self.remove(doc_id)
+
+        terms = Counter(self.tokenizer.tokenize(doc.page_content))
+        self._docs[doc_id] = doc
+        self._doc_terms[doc_id] = terms
+        length = sum(terms.values())
+        self._doc_lengths[doc_id] = length
+        self._total_length += length
+        for term, frequency in terms.items():
+            self._postings.setdefault(term, {})[doc_id] = frequency
+        self._compiled = None
+
+    def remove(self, doc_id: str) -> bool:
+        """
+        문서를 인덱스에서 제거합니다.
+
+        Args:
+            doc_id (str): 제거할 문서 ID.
+
+        Returns:
+            bool: 문서가 존재하여 제거되었는지 여부.
+        """
+        if doc_id not in self._docs:
+            return False
+
+        for term in self._doc_terms.pop(doc_id):
+            posting = self._postings.get(term)
+            if posting is None:
+                continue
+            posting.pop(doc_id, None)
+            if not posting:
+                del self._postings[term]
+        self._total_length -= self._doc_lengths.pop(doc_id)
+        del self._docs[doc_id]
+        self._compiled = None
+        return True
+
+    def update(self, doc: Document, doc_id: Optional[str] = None):
+        """문서를 교체합니다. (`add`와 동일하게 기존 문서를 제거한 뒤 추가합니다.)"""
+        self.add(doc, doc_id)
+
+    def apply(self, added: Iterable[Document] = (), removed_ids: Iterable[str] = ()):
+        """
+        수집 결과(추가/삭제된 청크)를 인덱스에 반영합니다.
+
+        Args:
+            added (Iterable[Document]): 새로 추가되거나 바뀐 문서.
+            removed_ids (Iterable[str]): 삭제된 문서 ID.
+        """
+        for doc_id in removed_ids:
+            self.remove(doc_id)
+        for doc in added:
+            self.add(doc)
+
+    def compile(self) -> "_CompiledMatrix":
+        """
+        포스팅 리스트를 검색용 CSR 행렬로 컴파일합니다. 이미 컴파일되어 있으면 그대로 반환합니다.
+
+        각 (용어, 문서) 칸에는 IDF와 길이 정규화까지 반영된 BM25 가중치를 미리 계산해 두므로,
+        검색 시에는 질문 용어의 행을 더하기만 하면 됩니다.
+        """
+        if self._compiled is not None:
+            return self._compiled
+
+        doc_ids = list(self._docs)
+        doc_positions = {doc_id: position for position, doc_id in enumerate(doc_ids)}
+        doc_count = len(doc_ids)
+        average_length = self.average_length or 1.0
+        doc_lengths = np.array([self._doc_lengths[doc_id] for doc_id in doc_ids], dtype=np.float32)
+        length_norm = self.k1 * (1 - self.b + self.b * doc_lengths / average_length)
+
+        vocabulary: Dict[str, int] = {}
+        indptr = [0]
+        indices: List[int] = []
+        frequencies: List[int] = []
+        for term, posting in self._postings.items():
+            vocabulary[term] = len(vocabulary)
+            indices.extend(doc_positions[doc_id] for doc_id in posting)
+            frequencies.extend(posting.values())
+            indptr.append(len(indices))
+
+        indptr_array = np.array(indptr, dtype=np.int64)
+        indices_array = np.array(indices, dtype=np.int32)
+        tf = np.array(frequencies, dtype=np.float32)
+
+        # BM25 IDF (음수가 되지 않도록 1을 더한 Lucene 방식): 행(용어)마다 하나씩 계산 후 각 칸으로 펼침
+        doc_frequency = np.diff(indptr_array).astype(np.float32)
+        idf = np.log1p((doc_count - doc_frequency + 0.5) / (doc_frequency + 0.5))
+        row_idf = np.repeat(idf, np.diff(indptr_array))
+        weights = row_idf * tf * (self.k1 + 1) / (tf + length_norm[indices_array])
+
+        self._compiled = _CompiledMatrix(
+            doc_ids=doc_ids,
+            vocabulary=vocabulary,
+            indptr=indptr_array,
+            indices=indices_array,
+            weights=weights.astype(np.float32),
+        )
+        return self._compiled
+
+    def search(self, query: str, k: int = 4) -> List[Tuple[Document, float]]:
+        """
+        질문에 대해 BM25 점수가 높은 상위 k개의 문서를 반환합니다.
+
+        Args:
+            query (str): 사용자 질문.
+            k (int): 반환할 문서 개수.
+
+        Returns:
+            List[Tuple[Document, float]]: (문서, BM25 점수) 튜플 리스트. 점수 내림차순.
+        """
+        if not self._docs:
+            return []
+
+        matrix = self.compile()
+        rows = [matrix.vocabulary[term] for term in set(self.tokenizer.tokenize(query)) if term in matrix.vocabulary]
+        if not rows:
+            return []
+
+        # 질문 용어에 해당하는 행(CSR 구간)들을 모아 문서별 점수를 한 번에 합산
+        slices = [slice(matrix.indptr[row], matrix.indptr[row + 1]) for row in rows]
+        indices = np.concatenate([matrix.indices[sl] for sl in slices])
+        weights = np.concatenate([matrix.weights[sl] for sl in slices])
+        scores = np.bincount(indices, weights=weights, minlength=len(matrix.doc_ids))
+
+        # 점수가 있는 문서 중 상위 k개만 부분 정렬(argpartition) 후 정렬
+        candidates = np.flatnonzero(scores > 0)
+        if len(candidates) > k:
+            candidates = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+        top = candidates[np.argsort(-scores[candidates], kind="stable")]
+        return [(self._docs[matrix.doc_ids[position]], float(scores[position])) for position in top]
+
+    def save(self, path: str):
+        """
+        인덱스의 문서를 JSON 파일로 저장합니다. 쓰는 도중 중단되어도 기존 파일이 깨지지 않도록 같은 디렉터리의 고유한 임시 파일에 쓴 뒤 교체합니다.
+
+        Args:
+            path (str): 저장할 파일 경로.
+        """
+        directory = os.path.dirname(path) or "."
+        os.makedirs(directory, exist_ok=True)
+
+        payload = {
+            "k1": self.k1,
+            "b": self.b,
+            "documents": [
+                {"id": doc_id, "page_content": doc.page_content, "metadata": doc.metadata}
+                for doc_id, doc in self._docs.items()
+            ],
+        }
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f"{os.path.basename(path)}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(payload, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+    @classmethod
+    def load(cls, path: str, tokenizer: Optional[TokenizerStrategy] = None) -> "BM25Index":
+        """
+        `save()`로 저장한 파일에서 인덱스를 복원합니다. 벡터 DB 전체 조회 없이 로컬 파일만 읽습니다.
+
+        Args:
+            path (str): 저장된 파일 경로.
+            tokenizer (Optional[TokenizerStrategy]): 문서를 토큰으로 나누는 토크나이저. 저장된 원문으로 다시 색인하므로 저장 시와 달라도 됩니다.
+
+        Returns:
+            BM25Index: 복원된 인덱스.
+        """
+        with open(path, "r", encoding="utf-8") as f:
+            payload = json.load(f)
+
+        index = cls(k1=payload.get("k1", 1.5), b=payload.get("b", 0.75), tokenizer=tokenizer)
+        for item in payload["documents"]:
+            index.add(Document(page_content=item["page_content"], metadata=item["metadata"]), doc_id=item["id"])
+        return index
+
+
+class _CompiledMatrix:
+    """
+    BM25Index의 검색용 CSR(Compressed Sparse Row) 행렬입니다. (행: 용어, 열: 문서)
+
+    Attributes:
+        doc_ids (List[str]): 열 번호 -> 문서 ID.
+        vocabulary (Dict[str, int]): 용어 -> 행 번호.
+        indptr (np.ndarray): 각 행의 시작/끝 위치 (길이 = 용어 수 + 1).
+        indices (np.ndarray): 각 칸의 열(문서) 번호.
+        weights (np.ndarray): 각 칸의 BM25 가중치.
+    """
+
+    __slots__ = ("doc_ids", "vocabulary", "indptr", "indices", "weights")
+
+    def __init__(self, doc_ids: List[str], vocabulary: Dict[str, int], indptr: np.ndarray, indices: np.ndarray, weights: np.ndarray):
+        self.doc_ids = doc_ids
+        self.vocabulary = vocabulary
+        self.indptr = indptr
+        self.indices = indices
+        self.weights = weights
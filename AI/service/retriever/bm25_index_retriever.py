@@ -0,0 +1,21 @@
+from typing import List
+
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+
+from service.retriever.bm25_index import BM25Index
+
+
+class BM25IndexRetriever(BaseRetriever):
+    """
+    증분형 BM25Index를 LangChain Retriever 인터페이스로 감싼 클래스입니다.
+
+    기존 BM25Retriever와 같은 `invoke`/`ainvoke` 인터페이스를 제공하므로 DocumentRetriever에서 그대로 사용할 수 있습니다.
+    """
+
+    index: BM25Index
+    k: int = 4
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        return [doc for doc, score in self.index.search(query, k=self.k)]
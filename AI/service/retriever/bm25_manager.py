@@ -1,31 +1,232 @@
+import asyncio
+import glob
+import os
+from typing import Iterable, List, Optional, Tuple
+
 from fastapi.logger import logger
-from langchain_community.retrievers import BM25Retriever
+from langchain_core.documents import Document
 
 from database.vector.repository import VectorRepository
+from service.retriever.bm25_index import BM25Index
+from service.retriever.bm25_index_retriever import BM25IndexRetriever
+from service.retriever.index_version import IndexVersion
+from service.retriever.tokenizer_strategy.tokenizer_strategy import TokenizerStrategy
 
 
 class BM25Manager:
-    def __init__(self, vector_repository: VectorRepository):
+    """
+    BM25 인덱스와 Retriever를 관리하는 싱글톤 객체입니다.
+
+    인덱스는 증분형(BM25Index)으로 관리되며, 문서 수집 결과(추가/삭제된 청크)를 그대로 반영합니다.
+    변경은 항상 복제본에 적용한 뒤 통째로 교체하므로 검색 중인 요청은 일관된 인덱스를 사용합니다.
+    인덱스는 디스크에 저장되어 재시작 시 벡터 DB 전체 조회 없이 복원됩니다.
+
+    벡터 DB 컬렉션 버전마다 인덱스 파일을 따로 저장합니다. (`bm25_index.{version}.json`)
+    전체 재수집 시에는 새 버전의 인덱스를 미리 만들어 두었다가(`build_index`) 벡터 DB 버전 교체와 함께 `activate`로 교체하며,
+    직전 인덱스는 메모리에 보관하여 롤백 시 바로 되돌립니다.
+    """
+
+    def __init__(
+            self,
+            vector_repository: VectorRepository,
+            index_path: Optional[str] = None,
+            k: int = 4,
+            tokenizer: Optional[TokenizerStrategy] = None,
+            index_version: Optional[IndexVersion] = None,
+    ):
+        """
+        Args:
+            vector_repository (VectorRepository): 전체 재색인 시 문서를 가져올 벡터 레포지토리.
+            index_path (Optional[str]): 인덱스를 저장/복원할 파일 경로. 없으면 디스크에 저장하지 않습니다.
+            k (int): 검색 시 반환할 문서 개수.
+            tokenizer (Optional[TokenizerStrategy]): BM25 색인/검색에 사용할 토크나이저. 없으면 공백 기준으로 나눕니다.
+            index_version (Optional[IndexVersion]): 인덱스가 교체될 때마다 올릴 버전 카운터. (검색 결과 캐시 무효화용)
+        """
         self.vector_repository = vector_repository
-        self._retriever: BM25Retriever | None = None
+        self.tokenizer = tokenizer
+        self.index_path = index_path
+        self.k = k
+        self.index_version = index_version
+        self._index: BM25Index | None = None
+        self._retriever: BM25IndexRetriever | None = None
+        self.version: Optional[str] = None  # 현재 인덱스가 색인한 벡터 DB 컬렉션 버전
+        self._previous: Optional[Tuple[Optional[str], BM25Index]] = None  # 롤백용 직전 (버전, 인덱스)
+        self._lock = asyncio.Lock()  # 동시에 여러 갱신이 들어와도 변경이 유실되지 않도록 직렬화
 
     @property
-    def retriever(self) -> BM25Retriever | None:
+    def retriever(self) -> BM25IndexRetriever | None:
         """생성된 retriever 인스턴스를 반환하는 프로퍼티"""
         return self._retriever
 
-    async def update_retriever(self):
-        """DB 문서를 기반으로 BM25 retriever를 비동기적으로 갱신합니다."""
-        logger.info("🔄 BM25 Retriever 업데이트를 시작합니다...")
-        all_docs = self.vector_repository.get_all_documents()
+    @property
+    def index(self) -> BM25Index | None:
+        """현재 사용 중인 BM25 인덱스를 반환하는 프로퍼티"""
+        return self._index
 
-        if not all_docs:
+    async def _swap(self, index: BM25Index):
+        """
+        새 인덱스로 교체합니다. 참조 교체 한 번으로 이루어지므로 검색 중인 요청에 영향이 없습니다.
+        교체 전에 검색용 행렬을 스레드에서 미리 컴파일하여 첫 검색이 컴파일 비용을 부담하지 않도록 합니다.
+        """
+        await asyncio.to_thread(index.compile)
+        if self.index_version is not None:
+            self.index_version.bump()
+        if len(index) == 0:
             logger.error("⚠️ BM25 Retriever: 색인할 문서가 없어 Retriever를 생성하지 않았습니다.")
+            self._index = index
             self._retriever = None
-            return None
+            return
+        self._index = index
+        self._retriever = BM25IndexRetriever(index=index, k=self.k)
+
+    def _path(self, version: Optional[str]) -> Optional[str]:
+        """버전별 인덱스 파일 경로 (예: data/bm25_index.langchain_v1.json)"""
+        if not self.index_path or version is None:
+            return self.index_path
+        root, ext = os.path.splitext(self.index_path)
+        return f"{root}.{version}{ext}"
+
+    async def _save(self, index: BM25Index, version: Optional[str] = None):
+        """인덱스를 파일로 저장합니다. 먼저 교체된 인덱스가 나중에 덮어쓰지 않도록 `self._lock`을 잡은 채로 호출해야 합니다."""
+        path = self._path(version if version is not None else self.version)
+        if not path:
+            return
+        try:
+            await asyncio.to_thread(index.save, path)
+        except Exception as e:
+            logger.info(f"BM25 인덱스 저장 실패: {e}")
+
+    async def load_or_build(self, version: Optional[str] = None):
+        """
+        디스크에 저장된 인덱스가 있으면 복원하고, 없으면 벡터 DB 전체 조회로 인덱스를 생성합니다. (애플리케이션 시작 시 호출)
+        다른 워커가 벡터 DB 버전을 교체했을 때도 새 버전의 인덱스를 읽기 위해 호출됩니다.
+
+        Args:
+            version (Optional[str]): 색인할 벡터 DB 컬렉션 버전.
+        """
+        path = self._path(version)
+        if path and os.path.exists(path):
+            try:
+                index = await asyncio.to_thread(BM25Index.load, path, self.tokenizer)
+                async with self._lock:
+                    self._keep_previous(version)
+                    self.version = version
+                    await self._swap(index)
+                logger.info(f"✅ BM25 인덱스를 '{path}'에서 {len(index)}개의 문서로 복원했습니다.")
+                return self._retriever
+            except Exception as e:
+                logger.info(f"BM25 인덱스 복원 실패, 전체 재색인을 진행합니다: {e}")
+        async with self._lock:
+            self._keep_previous(version)
+            self.version = version
+        return await self.update_retriever()
+
+    def _keep_previous(self, version: Optional[str]):
+        """다른 버전으로 교체하기 전에 현재 인덱스를 롤백용으로 보관합니다."""
+        if self._index is not None and version != self.version:
+            self._previous = (self.version, self._index)
+
+    async def build_index(self, vector_repository: VectorRepository) -> BM25Index:
+        """
+        주어진 벡터 레포지토리(예: 교체 전의 새 버전)의 문서로 인덱스를 만들고 검색용 행렬까지 컴파일합니다.
+        현재 사용 중인 인덱스는 바뀌지 않습니다.
+
+        Args:
+            vector_repository (VectorRepository): 색인할 문서를 가져올 레포지토리.
+
+        Returns:
+            BM25Index: 교체 준비가 끝난 인덱스.
+        """
+        all_docs = await asyncio.to_thread(vector_repository.get_all_documents)
+        index = BM25Index(tokenizer=self.tokenizer)
+        for doc in all_docs:
+            index.add(doc)
+        await asyncio.to_thread(index.compile)
+        logger.info(f"✅ BM25 인덱스 준비 완료 (버전 {vector_repository.version}, 문서 {len(index)}개)")
+        return index
+
+    async def activate(self, index: BM25Index, version: str):
+        """
+        `build_index`로 만든 인덱스로 교체하고 해당 버전의 파일로 저장합니다. 직전 인덱스는 롤백용으로 보관합니다.
 
-        retriever = BM25Retriever.from_documents(all_docs)
-        retriever.k = 4
-        self._retriever = retriever
-        logger.info(f"✅ BM25 Retriever가 {len(all_docs)}개의 문서로 성공적으로 업데이트되었습니다.")
-        return retriever
+        Args:
+            index (BM25Index): 교체할 인덱스.
+            version (str): 인덱스가 색인한 벡터 DB 컬렉션 버전.
+        """
+        async with self._lock:
+            self._keep_previous(version)
+            self.version = version
+            await self._swap(index)
+            await self._save(index, version)
+        return self._retriever
+
+    async def rollback(self, version: str):
+        """
+        벡터 DB를 직전 버전으로 되돌린 뒤 호출합니다. 메모리에 보관한 직전 인덱스가 같은 버전이면 바로 교체하고,
+        없으면 해당 버전의 파일(또는 벡터 DB)에서 다시 읽습니다.
+
+        Args:
+            version (str): 되돌아간 벡터 DB 컬렉션 버전.
+        """
+        async with self._lock:
+            if self._previous is not None and self._previous[0] == version:
+                current = (self.version, self._index)
+                self.version, index = self._previous
+                self._previous = current if current[1] is not None else None
+                await self._swap(index)
+                logger.info(f"⏪ BM25 인덱스를 버전 '{version}'으로 되돌렸습니다.")
+                return self._retriever
+        return await self.load_or_build(version)
+
+    def collect_garbage(self, keep: Iterable[Optional[str]]) -> List[str]:
+        """
+        유지할 버전을 제외한 버전별 인덱스 파일을 삭제합니다.
+
+        Args:
+            keep (Iterable[Optional[str]]): 파일을 유지할 버전 (현재/직전 버전).
+
+        Returns:
+            List[str]: 삭제한 파일 경로.
+        """
+        if not self.index_path:
+            return []
+        keep_paths = {self._path(version) for version in keep if version}
+        root, ext = os.path.splitext(self.index_path)
+        removed = []
+        for path in glob.glob(f"{glob.escape(root)}.*{ext}"):
+            if path not in keep_paths:
+                os.remove(path)
+                removed.append(path)
+        return removed
+
+    async def update_retriever(self):
+        """DB 문서를 기반으로 BM25 retriever를 비동기적으로 갱신합니다. (전체 재색인)"""
+        logger.info("🔄 BM25 Retriever 업데이트를 시작합니다...")
+        async with self._lock:
+            all_docs = await asyncio.to_thread(self.vector_repository.get_all_documents)
+
+            index = BM25Index(tokenizer=self.tokenizer)
+            for doc in all_docs:
+                index.add(doc)
+            await self._swap(index)
+            await self._save(index)
+
+        if self._retriever is not None:
+            logger.info(f"✅ BM25 Retriever가 {len(all_docs)}개의 문서로 성공적으로 업데이트되었습니다.")
+        return self._retriever
+
+    async def apply_changes(self, added: Iterable[Document] = (), removed_ids: Iterable[str] = ()):
+        """
+        문서 수집 결과(추가/삭제된 청크)만 인덱스에 반영합니다. 전체 문서를 다시 읽지 않습니다.
+
+        Args:
+            added (Iterable[Document]): 새로 추가되거나 바뀐 청크.
+            removed_ids (Iterable[str]): 삭제된 청크 ID.
+        """
+        async with self._lock:
+            index = self._index.copy() if self._index is not None else BM25Index(tokenizer=self.tokenizer)
+            index.apply(added=added, removed_ids=removed_ids)
+            await self._swap(index)
+            await self._save(index)
+        logger.info(f"✅ BM25 인덱스 증분 갱신 완료 (현재 문서 {len(index)}개)")
+        return self._retriever
@@ -1,32 +1,49 @@
-from typing import Optional, Dict, Any, List
+import asyncio
+from typing import Optional, Dict, Any, List, Tuple
 
 from fastapi.logger import logger
-from langchain_community.retrievers import BM25Retriever
 from langchain_core.documents import Document
 from langchain_core.runnables import Runnable, RunnableConfig
 
-from database.vector.repository import VectorRepository
-from service.retriever.bm25_manager import BM25Manager
+from service.embedding.query_embedding import QueryEmbedding
+from service.retriever.fusion_strategy.fusion_strategy import FusionStrategy
+from service.retriever.fusion_strategy.rrf_fusion import RRFFusion
+from service.retriever.retrieval_cache import RetrievalCache
+from service.retriever.source_strategy.retrieval_source import RetrievalSource
 
 
 class DocumentRetriever(Runnable):
     """
-    벡터 검색과 BM25 키워드 검색을 결합하여 문서를 찾는 클래스 객체
+    등록된 여러 검색기(예: 벡터 검색, BM25 키워드 검색)를 결합하여 문서를 찾는 클래스 객체
 
     LangChain Expression Language (LCEL)의 `Runnable` 인터페이스를 구현하여, 다른 LangChain 구성 요소와 파이프라인(`|`)으로 원활하게 연결될 수 있습니다.
-    두 검색 결과는 Reciprocal Rank Fusion (RRF) 알고리즘을 통해 순위를 다시 결정하여 관련이 제일 높은 문서만을 반환합니다.
+    각 검색기의 결과는 FusionStrategy(기본값: Reciprocal Rank Fusion)를 통해 순위를 다시 결정하여 관련이 제일 높은 문서만을 반환합니다.
+    검색기는 RetrievalSource를 상속받아 등록하며, 검색기마다 가져올 문서 수(k)와 가중치를 따로 지정할 수 있습니다.
     """
 
-    def __init__(self, vector_repository: VectorRepository, bm25_manager: BM25Manager):
+    def __init__(
+            self,
+            sources: List[RetrievalSource],
+            fusion_strategy: Optional[FusionStrategy] = None,
+            top_n: int = 3,
+            timeout: Optional[float] = None,
+            cache: Optional[RetrievalCache] = None,
+    ):
         """
         DocumentRetriever를 초기화합니다.
 
         Args:
-            vector_repository (VectorRepository): 벡터 유사도 검색을 수행하는 레포지토리 객체.
-            bm25_retriever (BM25Retriever): BM25 알고리즘을 사용하는 키워드 리트리버 객체.
+            sources (List[RetrievalSource]): 검색에 참여할 검색기 리스트.
+            fusion_strategy (Optional[FusionStrategy]): 검색 결과를 결합할 전략. 없으면 RRF를 사용합니다.
+            top_n (int): 결합 후 LLM에 전달할 상위 문서의 개수.
+            timeout (Optional[float]): `ainvoke`에서 검색기 하나당 기다릴 최대 시간(초). 없으면 제한하지 않습니다.
+            cache (Optional[RetrievalCache]): 검색 결과 캐시. 없으면 매번 검색합니다.
         """
-        self.vector_repository = vector_repository
-        self.bm25_manager = bm25_manager
+        self.sources = sources
+        self.fusion_strategy = fusion_strategy or RRFFusion()
+        self.top_n = top_n
+        self.timeout = timeout
+        self.cache = cache
 
     def invoke(self, input: str, config: Optional[RunnableConfig] = None) -> Dict[str, Any]:
         """
@@ -40,23 +57,115 @@ class DocumentRetriever(Runnable):
             config (Optional[RunnableConfig]): LangChain 실행 시 사용될 수 있는 설정 객체 (현재 미사용).
 
         Returns:
-            Dict[str, Any]: "context"와 "source_docs" 키를 포함하는 딕셔너리.
-                            - context (str): RRF로 결합된 문서 내용을 바탕으로 생성된,
+            Dict[str, Any]: "context", "source_docs", "source_results" 키를 포함하는 딕셔너리.
+                            - context (str): 결합된 문서 내용을 바탕으로 생성된,
                                              LLM에 전달될 최종 컨텍스트 문자열.
-                            - source_docs (List[Document]): RRF로 재순위화된 상위 Document 객체 리스트.
+                            - source_docs (List[Document]): 재순위화된 상위 Document 객체 리스트.
+                            - source_results (Dict[str, List[Tuple[Document, float]]]): 결합 전 검색기별 (문서, 점수) 결과.
         """
+        cached = self._get_cached(input)
+        if cached is not None:
+            return cached
+
+        version = self._index_version()
         # 1. 각 검색기로부터 결과 가져오기
-        # 벡터 검색기
-        cosine_results = self.vector_repository.query(input, top_k=4)
-        # BM25 알고리즘 검색기
-        bm25_results: List[Document] = self.bm25_manager.retriever.invoke(input)
-        logger.info(f"bm_results: {bm25_results}")
+        results = {source.name: source.retrieve(input) for source in self.sources}
+        return self._build_output(input, results, version)
+
+    async def ainvoke(
+            self,
+            input: str,
+            config: Optional[RunnableConfig] = None,
+            query_embedding: Optional[QueryEmbedding] = None,
+            **kwargs: Any
+    ) -> Dict[str, Any]:
+        """
+        `invoke`의 비동기 버전입니다.
 
+        모든 검색기를 동시에 실행하므로 검색 지연 시간은 검색기들의 합이 아니라 가장 느린 검색기의 시간이 됩니다.
+        검색기마다 제한 시간(`timeout`)을 두며, 시간을 넘기거나 오류가 난 검색기는 제외하고 나머지 결과만으로 결합합니다.
+        같은 질문의 검색 결과가 캐시에 있으면 검색기를 실행하지 않고 바로 반환합니다.
 
-        cosine_docs = [doc for doc, score in cosine_results]
+        Args:
+            input (str): 사용자 질문
+            config (Optional[RunnableConfig]): LangChain 실행 시 사용될 수 있는 설정 객체 (현재 미사용).
+            query_embedding (Optional[QueryEmbedding]): 캐시 조회 등에서 이미 계산한 질문 임베딩. 주어지면 벡터 검색에서 재사용합니다.
 
-        # 2. RRF를 사용한 결과 퓨전(Fusion)
-        fused_docs = self._reciprocal_rank_fusion(result_sets=[cosine_docs, bm25_results])
+        Returns:
+            Dict[str, Any]: `invoke`와 동일한 "context", "source_docs", "source_results" 키를 포함하는 딕셔너리.
+        """
+        cached = self._get_cached(input)
+        if cached is not None:
+            return cached
+
+        version = self._index_version()
+        results = await self._gather_sources(input, query_embedding)
+        return self._build_output(input, results, version)
+
+    def _get_cached(self, input: str) -> Optional[Dict[str, Any]]:
+        if self.cache is None:
+            return None
+        cached = self.cache.get(input)
+        if cached is not None:
+            logger.info("✅ 검색 결과 캐시 적중: 벡터/BM25 검색을 건너뜁니다.")
+        return cached
+
+    def _index_version(self) -> Optional[int]:
+        """검색 시작 시점의 인덱스 버전을 반환합니다. 검색 도중 문서가 수집되면 결과가 새 버전으로 캐싱되지 않도록 합니다."""
+        return self.cache.index_version.value if self.cache is not None else None
+
+    async def _gather_sources(
+            self,
+            input: str,
+            query_embedding: Optional[QueryEmbedding]
+    ) -> Dict[str, List[Tuple[Document, float]]]:
+        """
+        모든 검색기를 동시에 실행하고, 제한 시간 안에 성공한 검색기의 결과만 모아 반환합니다.
+
+        Returns:
+            Dict[str, List[Tuple[Document, float]]]: 성공한 검색기 이름 -> 검색 결과. 실패하거나 시간을 넘긴 검색기는 포함되지 않습니다.
+        """
+        outcomes = await asyncio.gather(
+            *(asyncio.wait_for(source.aretrieve(input, query_embedding=query_embedding), timeout=self.timeout)
+              for source in self.sources),
+            return_exceptions=True,
+        )
+
+        results: Dict[str, List[Tuple[Document, float]]] = {}
+        for source, outcome in zip(self.sources, outcomes):
+            if isinstance(outcome, asyncio.TimeoutError):
+                logger.info(f"⚠️ '{source.name}' 검색이 {self.timeout}초 안에 끝나지 않아 결과에서 제외합니다.")
+            elif isinstance(outcome, Exception):
+                logger.info(f"⚠️ '{source.name}' 검색 중 오류가 발생하여 결과에서 제외합니다: {outcome}")
+            elif isinstance(outcome, BaseException):
+                raise outcome
+            else:
+                results[source.name] = outcome
+
+        if not results:
+            logger.error("⚠️ 모든 검색기가 실패하여 컨텍스트 없이 답변을 생성합니다.")
+        return results
+
+    def _build_output(
+            self,
+            input: str,
+            results: Dict[str, List[Tuple[Document, float]]],
+            version: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        검색기들의 결과를 FusionStrategy로 결합하고 LLM에 전달할 컨텍스트를 구성합니다.
+        모든 검색기가 성공한 경우에만 결과를 캐시에 저장합니다. (일부 검색기가 빠진 결과는 캐싱하지 않음)
+        """
+        for name, docs in results.items():
+            logger.info(f"{name}_results: {[doc.page_content[:50] for doc, _ in docs]}")
+
+        # 2. 결과 퓨전(Fusion)
+        weights = {source.name: source.weight for source in self.sources}
+        fused = self.fusion_strategy.fuse(
+            result_sets=[(weights[name], docs) for name, docs in results.items()],
+            top_n=self.top_n,
+        )
+        fused_docs = [doc for doc, _ in fused]
 
         # 3. LLM에 전달할 컨텍스트 문자열 생성
         docs_content = []
@@ -65,80 +174,7 @@ class DocumentRetriever(Runnable):
             docs_content.append(content)
         context_str = "\n\n".join(docs_content)
 
-        return {"context": context_str, "source_docs": fused_docs}
-
-    @staticmethod
-    def _reciprocal_rank_fusion(
-            result_sets: List[List[Document]],
-            k: int = 60,
-            top_n: int = 3
-    ) -> List[Document]:
-        """
-        Reciprocal Rank Fusion (RRF) 알고리즘을 사용하여 여러 검색 결과를 결합합니다.
-
-        이 메서드는 여러 검색 엔진(여기서는 벡터 검색, BM25)의 순위 목록을 하나의 통합된 순위로 만들어 가장 관련성 높은 문서를 상위에 올립니다.
-
-        알고리즘의 핵심은 각 문서의 순위(rank)에 상수 k를 더한 값의 역수 (`1 / (k + rank + 1)`)를 점수로 부여하고, 여러 검색 결과에 걸쳐
-        이 점수를 합산하는 것입니다. 상수 k는 상위 랭크(1위, 2위 등) 간의 점수 차이가 과도하게 벌어지는 것을 완화하여, 여러 검색 결과에서 꾸준히 상위에
-        나타나는 문서들이 더 높은 최종 점수를 얻을 수 있도록 경쟁을 공정하게 만들어주는 역할을 합니다.
-
-        Args:
-            result_sets (List[List[Document]]): 각기 다른 검색기의 결과 Document 리스트들.
-            k (int): 순위에 대한 가중치를 조절하는 상수. 일반적으로 60이 사용됩니다.
-            top_n (int): 최종적으로 반환할 상위 문서의 개수.
-
-        Returns:
-            List[Document]: RRF 점수에 따라 재순위화된 상위 N개의 Document 리스트.
-        """
-        # ---------------------------------------------------------------------
-        # fused_scores: 각 문서 content(내용)를 key로 하고, 누적된 RRF 점수를 저장하는 딕셔너리
-        # all_docs: 각 문서 content → 실제 Document 객체를 저장하는 딕셔너리
-        #   → 두 개를 분리한 이유:
-        #       - fused_scores는 점수 계산용 (float 값만 저장)
-        #       - all_docs는 content로부터 실제 Document를 찾기 위함
-        # ---------------------------------------------------------------------
-        fused_scores: Dict[str, float] = {}
-        all_docs: Dict[str, Document] = {}
-
-        # ---------------------------------------------------------------------
-        # result_sets: 여러 검색기의 결과(Document 리스트들)
-        #   → 예: [ [벡터검색 결과1, 결과2...], [BM25 결과1, 결과2...] ]
-        # 각 검색기 결과를 순회하면서 RRF 점수를 누적
-        # ---------------------------------------------------------------------
-        for docs in result_sets:
-            for rank, doc in enumerate(docs):  # rank: 해당 검색기의 순위 (0부터 시작)
-                content = doc.page_content
-
-                # 최초 등장한 content라면, all_docs에 해당 문서 보관
-                if content not in all_docs:
-                    all_docs[content] = doc
-
-                # 점수 누적 (처음이면 0에서 시작)
-                if content not in fused_scores:
-                    fused_scores[content] = 0
-                # RRF 점수 공식 적용: 1 / (k + rank + 1)
-                #   - rank가 낮을수록(= 상위 문서) 점수가 더 크다
-                #   - 여러 검색 결과에서 반복 등장하면 점수가 합산되어 최종 랭크가 올라감
-                fused_scores[content] += 1 / (k + rank + 1)
-
-        # ---------------------------------------------------------------------
-        # fused_scores를 점수 기준으로 내림차순 정렬
-        #   → fused_scores.keys(): 문서 content 리스트
-        #   → key=lambda x: fused_scores[x]: content별 누적 점수 기준으로 정렬
-        # sorted_content: 점수가 높은 content부터 정렬된 리스트
-        # ---------------------------------------------------------------------
-        sorted_content = sorted(fused_scores.keys(), key=lambda x: fused_scores[x], reverse=True)
-
-        # print("\n--- RRF 최종 순위 및 점수 ---")
-        # for rank, doc in enumerate(final_docs, 1): # 1부터 시작하는 순위
-        # RRF 점수 가져오기
-        # score = fused_scores[doc.page_content]
-        # 출력할 내용 선택
-        # display_content = doc.metadata.get("retrieved_content", doc.page_content)
-        # 순위, 점수, 내용 출력
-        # print(f"[순위 {rank}] (RRF 점수: {score:.4f})")
-        # 내용이 너무 길 경우 일부만 표시
-        # print(f" └ 내용: {display_content[:150].strip()}...")
-        # print("-" * 30)
-
-        return [all_docs[content] for content in sorted_content[:top_n]]
\ No newline at end of file
+        output = {"context": context_str, "source_docs": fused_docs, "source_results": results}
+        if self.cache is not None and len(results) == len(self.sources):
+            self.cache.put(input, output, version=version)
+        return output
@@ -0,0 +1,60 @@
+from abc import ABC, abstractmethod
+from typing import Dict, List, Tuple
+
+from langchain_core.documents import Document
+
+from service.data.data_processor import DataProcessor
+
+
+class FusionStrategy(ABC):
+    """
+    여러 검색기(소스)의 결과를 하나의 순위로 결합하는 전략에 대한 추상 기본 클래스입니다.
+
+    각 전략은 한 소스의 결과에서 문서별 기여 점수를 계산하는 `score`만 구현하면 되며,
+    소스 가중치 적용, 청크 ID 기준 중복 제거, 점수 합산과 정렬은 `fuse`에서 공통으로 처리합니다.
+    """
+
+    @abstractmethod
+    def score(self, results: List[Tuple[Document, float]]) -> List[float]:
+        """
+        한 소스의 검색 결과에서 각 문서가 최종 점수에 기여할 점수를 계산합니다.
+
+        Args:
+            results (List[Tuple[Document, float]]): (문서, 원본 점수) 튜플 리스트. 점수 내림차순.
+
+        Returns:
+            List[float]: 입력 순서와 같은 순서의 기여 점수 리스트.
+        """
+        pass
+
+    def fuse(
+            self,
+            result_sets: List[Tuple[float, List[Tuple[Document, float]]]],
+            top_n: int = 3
+    ) -> List[Tuple[Document, float]]:
+        """
+        여러 소스의 검색 결과를 결합하여 상위 N개의 문서를 반환합니다.
+
+        같은 문서는 본문 전체 대신 청크 ID로 식별하므로, 여러 소스에 등장한 문서의 점수는 하나로 합산됩니다.
+
+        Args:
+            result_sets (List[Tuple[float, List[Tuple[Document, float]]]]): (소스 가중치, 해당 소스의 검색 결과) 리스트.
+            top_n (int): 최종적으로 반환할 상위 문서의 개수.
+
+        Returns:
+            List[Tuple[Document, float]]: (문서, 결합 점수) 튜플 리스트. 결합 점수 내림차순.
+        """
+        fused_scores: Dict[str, float] = {}
+        all_docs: Dict[str, Document] = {}
+
+        for weight, results in result_sets:
+            if not results:
+                continue
+            for (doc, _), score in zip(results, self.score(results)):
+                doc_id = DataProcessor.get_chunk_id(doc)
+                # 최초 등장한 문서를 보관하고, 여러 소스에 등장하면 점수를 누적
+                all_docs.setdefault(doc_id, doc)
+                fused_scores[doc_id] = fused_scores.get(doc_id, 0.0) + weight * score
+
+        sorted_ids = sorted(fused_scores, key=fused_scores.get, reverse=True)
+        return [(all_docs[doc_id], fused_scores[doc_id]) for doc_id in sorted_ids[:top_n]]
@@ -0,0 +1,29 @@
+from typing import List, Tuple
+
+from langchain_core.documents import Document
+
+from service.retriever.fusion_strategy.fusion_strategy import FusionStrategy
+
+
+class RRFFusion(FusionStrategy):
+    """
+    Reciprocal Rank Fusion (RRF) 알고리즘을 사용하여 여러 검색 결과를 결합합니다.
+
+    알고리즘의 핵심은 각 문서의 순위(rank)에 상수 k를 더한 값의 역수 (`1 / (k + rank + 1)`)를 점수로 부여하고, 여러 검색 결과에 걸쳐
+    이 점수를 합산하는 것입니다. 상수 k는 상위 랭크(1위, 2위 등) 간의 점수 차이가 과도하게 벌어지는 것을 완화하여, 여러 검색 결과에서 꾸준히 상위에
+    나타나는 문서들이 더 높은 최종 점수를 얻을 수 있도록 경쟁을 공정하게 만들어주는 역할을 합니다.
+
+    순위만 사용하므로 점수 체계가 서로 다른 검색기(벡터 유사도, BM25)를 결합할 때 가장 안정적입니다.
+    소스 가중치를 곱하면 Weighted RRF가 됩니다.
+    """
+
+    def __init__(self, k: int = 60):
+        """
+        Args:
+            k (int): 순위에 대한 가중치를 조절하는 상수. 일반적으로 60이 사용됩니다.
+        """
+        self.k = k
+
+    def score(self, results: List[Tuple[Document, float]]) -> List[float]:
+        # rank가 낮을수록(= 상위 문서) 점수가 더 크다
+        return [1 / (self.k + rank + 1) for rank in range(len(results))]
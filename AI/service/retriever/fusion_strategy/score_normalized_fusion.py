@@ -0,0 +1,22 @@
+from typing import List, Tuple
+
+from langchain_core.documents import Document
+
+from service.retriever.fusion_strategy.fusion_strategy import FusionStrategy
+
+
+class ScoreNormalizedFusion(FusionStrategy):
+    """
+    각 소스의 점수를 소스 내에서 0~1로 Min-Max 정규화한 뒤 가중치를 곱해 합산합니다.
+
+    순위만 사용하는 RRF와 달리 점수 차이(1위와 2위가 얼마나 차이 나는지)를 반영하면서도,
+    소스 간 점수 범위 차이는 정규화로 제거합니다.
+    """
+
+    def score(self, results: List[Tuple[Document, float]]) -> List[float]:
+        scores = [float(score) for _, score in results]
+        low, high = min(scores), max(scores)
+        if high == low:
+            # 모든 점수가 같으면 차이를 알 수 없으므로 동일하게 최대 점수를 부여
+            return [1.0] * len(scores)
+        return [(score - low) / (high - low) for score in scores]
@@ -0,0 +1,17 @@
+from typing import List, Tuple
+
+from langchain_core.documents import Document
+
+from service.retriever.fusion_strategy.fusion_strategy import FusionStrategy
+
+
+class WeightedSumFusion(FusionStrategy):
+    """
+    각 소스의 원본 점수에 가중치를 곱해 그대로 합산합니다.
+
+    소스 간 점수 범위가 다르면(예: relevance 0~1, BM25 0~수십) 한쪽이 결과를 지배하므로,
+    가중치로 점수 범위를 맞춰 줄 수 있을 때 사용합니다.
+    """
+
+    def score(self, results: List[Tuple[Document, float]]) -> List[float]:
+        return [float(score) for _, score in results]
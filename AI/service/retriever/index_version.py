@@ -0,0 +1,25 @@
+class IndexVersion:
+    """
+    검색 인덱스(벡터 DB, BM25)의 변경 여부를 나타내는 프로세스 내부 버전 카운터입니다.
+
+    문서 수집이나 BM25 인덱스 교체가 일어날 때마다 `bump()`로 버전을 올리며,
+    검색 결과 캐시는 이 버전을 키에 포함하므로 인덱스가 바뀌면 이전 캐시 항목은 자동으로 사용되지 않습니다.
+    """
+
+    def __init__(self):
+        self._value = 0
+
+    @property
+    def value(self) -> int:
+        """현재 인덱스 버전을 반환합니다."""
+        return self._value
+
+    def bump(self) -> int:
+        """
+        인덱스 버전을 1 올립니다.
+
+        Returns:
+            int: 변경된 인덱스 버전.
+        """
+        self._value += 1
+        return self._value
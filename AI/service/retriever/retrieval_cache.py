@@ -0,0 +1,96 @@
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from service.retriever.index_version import IndexVersion
+from utils.text_normalizer import text_hash
+
+
+class RetrievalCache:
+    """
+    하이브리드 검색 결과(`context`, `source_docs`)를 보관하는 프로세스 내부 LRU + TTL 캐시입니다.
+
+    시맨틱 답변 캐시가 적중하지 않더라도 같은(정규화 기준) 질문이 다시 들어오면 벡터/BM25 검색을 건너뛰고
+    LLM 생성만 다시 수행하도록 합니다. 캐시 키에는 IndexVersion이 포함되어 있어 문서 수집 후에는 이전 결과가 사용되지 않습니다.
+    """
+
+    def __init__(self, index_version: IndexVersion, max_size: int = 512, ttl_seconds: float = 600):
+        """
+        RetrievalCache를 초기화합니다.
+
+        Args:
+            index_version (IndexVersion): 캐시 키에 포함할 인덱스 버전 카운터.
+            max_size (int): 보관할 최대 검색 결과 개수. 초과하면 가장 오래 사용되지 않은 항목부터 제거합니다.
+            ttl_seconds (float): 검색 결과의 유효 시간(초).
+        """
+        self.index_version = index_version
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+
+        # 캐시 적중/실패 카운터
+        self.hits = 0
+        self.misses = 0
+
+    def _cache_key(self, query: str, version: Optional[int] = None) -> str:
+        """인덱스 버전과 정규화된 질문의 해시로 캐시 키를 생성합니다."""
+        version = self.index_version.value if version is None else version
+        return f"{version}:{text_hash(query)}"
+
+    def get(self, query: str) -> Optional[Dict[str, Any]]:
+        """
+        캐시된 검색 결과를 조회합니다.
+
+        Args:
+            query (str): 사용자 질문.
+
+        Returns:
+            Optional[Dict[str, Any]]: 캐시된 검색 결과. 없거나 만료되었으면 None.
+        """
+        key = self._cache_key(query)
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)  # 최근 사용으로 갱신
+        self.hits += 1
+        return entry[1]
+
+    def put(self, query: str, output: Dict[str, Any], version: Optional[int] = None):
+        """
+        검색 결과를 캐시에 저장합니다.
+
+        Args:
+            query (str): 사용자 질문.
+            output (Dict[str, Any]): DocumentRetriever의 검색 결과.
+            version (Optional[int]): 검색을 시작할 때의 인덱스 버전. 검색 도중 인덱스가 바뀌었다면
+                                     이전 버전 키로 저장되어 새 버전에서 사용되지 않습니다. 없으면 현재 버전을 사용합니다.
+        """
+        key = self._cache_key(query, version)
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, output)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)  # 가장 오래 사용되지 않은 항목 제거
+
+    def clear(self):
+        """캐시를 모두 비웁니다."""
+        self._entries.clear()
+
+    def get_stats(self) -> Dict[str, int | float]:
+        """
+        캐시 적중/실패 통계를 반환합니다.
+
+        Returns:
+            Dict[str, int | float]: 적중 수, 실패 수, 적중률, 현재 캐시 크기, 현재 인덱스 버전.
+        """
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "size": len(self._entries),
+            "index_version": self.index_version.value,
+        }
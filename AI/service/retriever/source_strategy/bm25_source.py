@@ -0,0 +1,37 @@
+import asyncio
+from typing import List, Optional, Tuple
+
+from langchain_core.documents import Document
+
+from service.embedding.query_embedding import QueryEmbedding
+from service.retriever.bm25_manager import BM25Manager
+from service.retriever.source_strategy.retrieval_source import RetrievalSource
+
+
+class BM25Source(RetrievalSource):
+    """
+    BM25 키워드 검색을 사용하는 소스입니다. 점수는 BM25 점수입니다.
+
+    BM25Manager의 현재 인덱스를 매 검색마다 참조하므로, 문서 수집으로 인덱스가 교체되어도 별도 처리 없이 최신 인덱스를 사용합니다.
+    """
+
+    def __init__(self, bm25_manager: BM25Manager, k: int = 4, weight: float = 1.0, name: str = "bm25"):
+        """
+        Args:
+            bm25_manager (BM25Manager): BM25 인덱스를 관리하는 객체.
+            k (int): 가져올 문서 개수.
+            weight (float): 결과 결합 시 가중치.
+            name (str): 소스 이름.
+        """
+        super().__init__(name=name, k=k, weight=weight)
+        self.bm25_manager = bm25_manager
+
+    def retrieve(self, query: str) -> List[Tuple[Document, float]]:
+        index = self.bm25_manager.index
+        if index is None:
+            return []
+        return index.search(query, k=self.k)
+
+    async def aretrieve(self, query: str, query_embedding: Optional[QueryEmbedding] = None) -> List[Tuple[Document, float]]:
+        # 점수 계산은 CPU 작업이므로 이벤트 루프를 막지 않도록 스레드에서 실행
+        return await asyncio.to_thread(self.retrieve, query)
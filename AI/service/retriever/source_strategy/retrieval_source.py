@@ -0,0 +1,53 @@
+from abc import ABC, abstractmethod
+from typing import List, Optional, Tuple
+
+from langchain_core.documents import Document
+
+from service.embedding.query_embedding import QueryEmbedding
+
+
+class RetrievalSource(ABC):
+    """
+    하이브리드 검색에 참여하는 검색기(소스)에 대한 추상 기본 클래스입니다.
+
+    DocumentRetriever는 등록된 모든 소스를 동시에 실행한 뒤 FusionStrategy로 결과를 결합하므로,
+    새로운 검색기를 추가할 때는 이 클래스를 상속받아 등록하기만 하면 됩니다.
+    """
+
+    def __init__(self, name: str, k: int = 4, weight: float = 1.0):
+        """
+        Args:
+            name (str): 소스 이름. 로그와 검색 결과 구분에 사용됩니다.
+            k (int): 이 소스에서 가져올 문서 개수.
+            weight (float): 결과 결합(Fusion) 시 이 소스에 부여할 가중치.
+        """
+        self.name = name
+        self.k = k
+        self.weight = weight
+
+    @abstractmethod
+    def retrieve(self, query: str) -> List[Tuple[Document, float]]:
+        """
+        질문과 관련된 문서를 검색합니다.
+
+        Args:
+            query (str): 사용자 질문.
+
+        Returns:
+            List[Tuple[Document, float]]: (문서, 점수) 튜플 리스트. 점수가 높을수록 관련도가 높으며, 점수 내림차순으로 정렬됩니다.
+        """
+        pass
+
+    @abstractmethod
+    async def aretrieve(self, query: str, query_embedding: Optional[QueryEmbedding] = None) -> List[Tuple[Document, float]]:
+        """
+        `retrieve`의 비동기 버전입니다.
+
+        Args:
+            query (str): 사용자 질문.
+            query_embedding (Optional[QueryEmbedding]): 이미 계산된 질문 임베딩. 임베딩을 사용하는 소스에서만 재사용합니다.
+
+        Returns:
+            List[Tuple[Document, float]]: (문서, 점수) 튜플 리스트. 점수 내림차순.
+        """
+        pass
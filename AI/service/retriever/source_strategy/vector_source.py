@@ -0,0 +1,30 @@
+from typing import List, Optional, Tuple
+
+from langchain_core.documents import Document
+
+from database.vector.repository import VectorRepository
+from service.embedding.query_embedding import QueryEmbedding
+from service.retriever.source_strategy.retrieval_source import RetrievalSource
+
+
+class VectorSource(RetrievalSource):
+    """
+    벡터 DB의 유사도 검색을 사용하는 소스입니다. 점수는 벡터 DB의 relevance 점수(클수록 유사)입니다.
+    """
+
+    def __init__(self, vector_repository: VectorRepository, k: int = 4, weight: float = 1.0, name: str = "vector"):
+        """
+        Args:
+            vector_repository (VectorRepository): 벡터 유사도 검색을 수행하는 레포지토리 객체.
+            k (int): 가져올 문서 개수.
+            weight (float): 결과 결합 시 가중치.
+            name (str): 소스 이름.
+        """
+        super().__init__(name=name, k=k, weight=weight)
+        self.vector_repository = vector_repository
+
+    def retrieve(self, query: str) -> List[Tuple[Document, float]]:
+        return self.vector_repository.query(query, top_k=self.k)
+
+    async def aretrieve(self, query: str, query_embedding: Optional[QueryEmbedding] = None) -> List[Tuple[Document, float]]:
+        return await self.vector_repository.aquery(query, top_k=self.k, query_embedding=query_embedding)
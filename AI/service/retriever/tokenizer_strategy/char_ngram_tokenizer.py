@@ -0,0 +1,40 @@
+import re
+import unicodedata
+from typing import List
+
+from service.retriever.tokenizer_strategy.tokenizer_strategy import TokenizerStrategy
+
+# 문자(한글, 영문, 숫자)가 아닌 구분자 기준으로 단어를 나눕니다.
+_WORD_PATTERN = re.compile(r"\w+")
+
+
+class CharNgramTokenizer(TokenizerStrategy):
+    """
+    한국어에 적합한 문자 n-gram 토크나이저입니다.
+
+    한국어는 '하림님은', '하림님이'처럼 조사가 붙은 형태로 띄어쓰기가 되므로 공백 기준으로 나누면
+    같은 단어가 서로 다른 용어로 취급되어 재현율이 떨어지고 어휘 수가 불필요하게 커집니다.
+    이 토크나이저는 각 단어를 n글자 단위로 잘라('하림', '림님', '님은') 조사가 붙어 있어도 공통 부분이 일치하도록 합니다.
+    n보다 짧은 단어는 그대로 하나의 토큰으로 사용합니다.
+    """
+
+    def __init__(self, n: int = 2, include_words: bool = False):
+        """
+        Args:
+            n (int): n-gram의 글자 수.
+            include_words (bool): True이면 n-gram과 함께 원래 단어도 토큰에 포함하여 완전히 일치하는 단어에 가중치를 더합니다.
+        """
+        self.n = n
+        self.include_words = include_words
+
+    def tokenize(self, text: str) -> List[str]:
+        text = unicodedata.normalize("NFKC", text).lower()
+        tokens = []
+        for word in _WORD_PATTERN.findall(text):
+            if len(word) <= self.n:
+                tokens.append(word)
+                continue
+            tokens.extend(word[i:i + self.n] for i in range(len(word) - self.n + 1))
+            if self.include_words:
+                tokens.append(word)
+        return tokens
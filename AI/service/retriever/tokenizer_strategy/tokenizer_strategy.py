@@ -0,0 +1,15 @@
+from abc import ABC, abstractmethod
+from typing import List
+
+
+class TokenizerStrategy(ABC):
+    """
+    BM25 색인/검색에 사용할 토크나이저 전략에 대한 추상 기본 클래스입니다.
+
+    문서와 질문은 반드시 같은 토크나이저로 분리되어야 용어가 일치합니다.
+    """
+
+    @abstractmethod
+    def tokenize(self, text: str) -> List[str]:
+        """주어진 텍스트를 BM25 용어(토큰) 리스트로 분리합니다."""
+        pass
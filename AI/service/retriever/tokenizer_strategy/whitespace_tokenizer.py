@@ -0,0 +1,14 @@
+from typing import List
+
+from service.retriever.tokenizer_strategy.tokenizer_strategy import TokenizerStrategy
+
+
+class WhitespaceTokenizer(TokenizerStrategy):
+    """
+    공백 기준으로 텍스트를 분리하는 토크나이저입니다.
+
+    LangChain BM25Retriever의 기본 전처리(`text.split()`)와 동일하게 동작합니다.
+    """
+
+    def tokenize(self, text: str) -> List[str]:
+        return text.split()
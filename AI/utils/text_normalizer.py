@@ -0,0 +1,54 @@
+import hashlib
+import re
+import unicodedata
+
+_WHITESPACE_PATTERN = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """
+    캐시 키 생성을 위해 텍스트를 정규화합니다.
+
+    유니코드 NFKC 정규화 후 앞뒤 공백을 제거하고, 연속된 공백을 하나로 합칩니다.
+    의미가 바뀌지 않는 수준의 차이(전각/반각, 공백 개수 등)만 제거합니다.
+
+    Args:
+        text (str): 정규화할 원본 텍스트.
+
+    Returns:
+        str: 정규화된 텍스트.
+    """
+    text = unicodedata.normalize("NFKC", text)
+    return _WHITESPACE_PATTERN.sub(" ", text).strip()
+
+
+def normalize_question(text: str) -> str:
+    """
+    완전 일치 캐시 키 생성을 위해 질문을 정규화합니다.
+
+    `normalize_text`에 더해 대소문자를 통일(casefold)하고 문장 부호를 제거하여,
+    "포트폴리오 알려줘!"와 "포트폴리오 알려줘"처럼 문장 부호나 대소문자만 다른 질문을 같은 질문으로 봅니다.
+
+    Args:
+        text (str): 정규화할 질문.
+
+    Returns:
+        str: 정규화된 질문.
+    """
+    text = unicodedata.normalize("NFKC", text).casefold()
+    # 유니코드 문장 부호(P*)는 공백으로 바꾼 뒤 공백을 합친다.
+    text = "".join(" " if unicodedata.category(char).startswith("P") else char for char in text)
+    return _WHITESPACE_PATTERN.sub(" ", text).strip()
+
+
+def text_hash(text: str) -> str:
+    """
+    정규화된 텍스트의 SHA-256 해시값을 반환합니다.
+
+    Args:
+        text (str): 해시할 텍스트.
+
+    Returns:
+        str: 16진수 문자열 형태의 해시값.
+    """
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()